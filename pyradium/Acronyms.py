@@ -22,10 +22,11 @@
 import json
 import collections
 from pyradium.Exceptions import MalformedJSONInputException
+from .BaseDirective import BaseDirective
 
 ResolvedAcronym = collections.namedtuple("ResolvedAcronym", [ "acronym_id", "acronym", "text", "uri" ])
 
-class AcronymDirective():
+class AcronymDirective(BaseDirective):
 	def __init__(self, node):
 		self._src = node.getAttribute("src")
 
@@ -33,6 +34,10 @@ class AcronymDirective():
 	def src(self):
 		return self._src
 
+	@property
+	def fingerprint(self):
+		return ("acronyms", self.src)
+
 	def render(self, rendered_presentation):
 		filename = rendered_presentation.renderer.lookup_include(self._src)
 		acronyms = rendered_presentation.renderer.get_custom_renderer("acronym")
@@ -0,0 +1,72 @@
+#	pyradium - HTML presentation/slide show generator
+#	Copyright (C) 2026-2026 Johannes Bauer
+#
+#	This file is part of pyradium.
+#
+#	pyradium is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	pyradium is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with pyradium; if not, write to the Free Software
+#	Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+
+import sys
+import datetime
+from .BaseAction import BaseAction
+from .CacheManager import CacheManager
+from .GlobalConfig import GlobalConfig
+
+class ActionCache(BaseAction):
+	@staticmethod
+	def _fmt_size(size):
+		for (unit, divisor) in (("GiB", 1024 ** 3), ("MiB", 1024 ** 2), ("kiB", 1024)):
+			if size >= divisor:
+				return f"{size / divisor:.1f} {unit}"
+		return f"{size} B"
+
+	def _run_stats(self, cache_manager):
+		stats = cache_manager.statistics(oldest_count = self._args.oldest)
+		print(f"Cache directory: {cache_manager.directory}")
+		print()
+		print(f"{'Renderer':<15s} {'Entries':>8s} {'Size':>11s} {'Hits':>8s} {'Misses':>8s} {'Hit ratio':>9s}")
+		for (renderer_name, renderer_stats) in stats["renderers"].items():
+			hit_ratio = "-" if (renderer_stats["hit_ratio"] is None) else f"{100 * renderer_stats['hit_ratio']:.1f}%"
+			print(f"{renderer_name:<15s} {renderer_stats['entries']:>8d} {self._fmt_size(renderer_stats['bytes']):>11s} {renderer_stats['hits']:>8d} {renderer_stats['misses']:>8d} {hit_ratio:>9s}")
+		print(f"{'Total':<15s} {stats['total_entries']:>8d} {self._fmt_size(stats['total_bytes']):>11s}")
+
+		if len(stats["oldest"]) > 0:
+			print()
+			print("Least recently used entries:")
+			for entry in stats["oldest"]:
+				last_access = datetime.datetime.fromtimestamp(entry.last_access).strftime("%Y-%m-%d %H:%M")
+				print(f"    {last_access}  {entry.renderer_name:<12s} {entry.keyhash}")
+		return 0
+
+	def _run_gc(self, cache_manager):
+		config = GlobalConfig.read()
+		max_size = self._args.max_size if (self._args.max_size is not None) else config.get("cache", "max_size")
+		max_age = self._args.max_age if (self._args.max_age is not None) else config.get("cache", "max_age")
+		max_size = None if (max_size is None) else CacheManager.parse_size(max_size)
+		max_age_secs = None if (max_age is None) else CacheManager.parse_age(max_age)
+
+		result = cache_manager.gc(max_size = max_size, max_age_secs = max_age_secs, dry_run = self._args.dry_run)
+		print(f"{'Would remove' if self._args.dry_run else 'Removed'} {result.removed_entries} entries and {result.removed_blobs} blobs, freeing {self._fmt_size(result.freed_bytes)}; {self._fmt_size(result.remaining_bytes)} remain in the cache.")
+		if (max_size is None) and (max_age_secs is None):
+			print("Note: neither a maximum size nor a maximum age was given, only unreferenced blobs were considered for removal.", file = sys.stderr)
+		return 0
+
+	def run(self):
+		cache_manager = CacheManager()
+		if self._args.subcommand == "stats":
+			return self._run_stats(cache_manager)
+		else:
+			return self._run_gc(cache_manager)
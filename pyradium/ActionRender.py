@@ -22,39 +22,54 @@
 import os
 import sys
 import time
-import subprocess
 import json
 import logging
 import traceback
 from .BaseAction import BaseAction
-from .Presentation import Presentation
 from .RenderingParameters import RenderingParameters
-from .Renderer import Renderer
-from .Exceptions import XMLFileNotFoundException, CallingProcessException, PyRadiumException, DeploymentException
-from .Enums import PresentationFeature
+from .RenderSession import RenderSession
+from .FileWatcher import FileWatcher
+from .Exceptions import XMLFileNotFoundException, PyRadiumException, DeploymentException, ConfigurationException
+from .Enums import PresentationFeature, ImageFormat
 from .Deployment import Deployment
+from .CacheManager import CacheManager
+from .GlobalConfig import GlobalConfig
+from .renderer import BaseRenderer
 
 _log = logging.getLogger(__spec__.name)
 
 class ActionRender(BaseAction):
 	_DEFAULT_PRESENTATION_FEATURES = set([ PresentationFeature.Interactive, PresentationFeature.Timer, PresentationFeature.Pause ])
 
-	def _wait_for_change(self, renderer):
-		cmd = [ "inotifywait" ]
-		cmd += [ "-q", "-r" ]
-		cmd += [ "--exclude", r"\..*\.sw[a-z]" ]
-		cmd += [ "-e", "modify", "-e", "close_write", "-e", "create" ]
-
+	def _wait_for_change(self, watcher, renderer):
 		sources = [ ]
 		sources += renderer.presentation.sources
 		sources += renderer.rendering_params.template_dirs
 		sources += renderer.rendering_params.include_dirs
 		sources += self._args.re_render_watch
-		sources = [ source for source in sources if os.path.exists(source) ]
-		cmd += sources
-		proc = subprocess.run(cmd, check = False)
-		if proc.returncode not in [ 0, 1 ]:
-			raise CallingProcessException("inotifywait returned with returncode %d." % (proc.returncode))
+		watcher.watch(sources)
+		changed_paths = watcher.wait()
+		_log.debug("Changed files: %s", ", ".join(sorted(changed_paths)))
+		return changed_paths
+
+	def _cache_maintenance(self, run_gc):
+		# Runs after rendering, so a broken cache configuration or a file
+		# system error must neither fail a successful render nor end the
+		# re-render loop
+		try:
+			cache_manager = CacheManager()
+			cache_manager.record_statistics(BaseRenderer.instances())
+			if not run_gc:
+				return
+
+			config = GlobalConfig.read()
+			max_size = config.get("cache", "max_size")
+			max_age = config.get("cache", "max_age")
+			if (max_size is not None) or (max_age is not None):
+				result = cache_manager.gc(max_size = None if (max_size is None) else CacheManager.parse_size(max_size), max_age_secs = None if (max_age is None) else CacheManager.parse_age(max_age))
+				_log.debug("Cache garbage collection removed %d entries and %d blobs, freed %d bytes.", result.removed_entries, result.removed_blobs, result.freed_bytes)
+		except (ConfigurationException, OSError) as e:
+			_log.warning("Cache maintenance failed: [%s] %s", e.__class__.__name__, str(e))
 
 	def _get_presentation_features(self):
 		presentation_features = set(self._DEFAULT_PRESENTATION_FEATURES)
@@ -70,6 +85,9 @@ class ActionRender(BaseAction):
 		if (PresentationFeature.Timer in presentation_features) and (PresentationFeature.Interactive not in presentation_features):
 			_log.warning("The 'timer' feature implies the 'interactive' feature, which has been selected as well.")
 			presentation_features.add(PresentationFeature.Interactive)
+		if (PresentationFeature.LazySlides in presentation_features) and (PresentationFeature.Interactive not in presentation_features):
+			_log.warning("The 'lazy' feature implies the 'interactive' feature, which has been selected as well.")
+			presentation_features.add(PresentationFeature.Interactive)
 		return presentation_features
 
 	def run(self):
@@ -98,32 +116,64 @@ class ActionRender(BaseAction):
 		else:
 			(resource_dir, resource_uri) = (self._args.outdir, "")
 
-		renderer = None
+		if self._args.re_render_loop:
+			# Arm the watcher before the first render so no change is missed
+			watcher = FileWatcher.create()
+			watcher.exclude(self._args.outdir)
+			watcher.exclude(resource_dir)
+			watcher.watch([ self._args.infile ] + self._args.re_render_watch)
+		else:
+			watcher = None
+
+		session = None
+		changed_paths = None
+		first_run = True
 		while True:
 			force_wait_secs = None
 			try:
 				render_success = False
 				t0 = time.time()
-				rendering_parameters = RenderingParameters(
-						template_style = self._args.template_style,
-						template_style_opts = self._args.style_option,
-						honor_pauses = not self._args.remove_pauses,
-						collapse_animation = self._args.collapse_animation,
-						extra_template_dirs = self._args.template_dir,
-						include_dirs = [ os.path.dirname(self._args.infile) or "." ] + self._args.include_dir,
-						index_filename = self._args.index_filename,
-						resource_uri = resource_uri,
-						geometry = self._args.geometry,
-						image_max_dimension = self._args.image_max_dimension,
-						presentation_features = presentation_features,
-						injected_metadata = injected_metadata,
-						trustworthy_source = self._args.trustworthy_source,
-						allow_missing_svg_fonts = self._args.allow_missing_svg_fonts)
-				presentation = Presentation.load_from_file(self._args.infile, rendering_parameters)
-				renderer = Renderer(presentation, rendering_parameters)
-				rendered_presentation = renderer.render(resource_directory = resource_dir, deploy_directory = self._args.outdir)
+				if session is None:
+					rendering_parameters = RenderingParameters(
+							template_style = self._args.template_style,
+							template_style_opts = self._args.style_option,
+							honor_pauses = not self._args.remove_pauses,
+							collapse_animation = self._args.collapse_animation,
+							extra_template_dirs = self._args.template_dir,
+							include_dirs = [ os.path.dirname(self._args.infile) or "." ] + self._args.include_dir,
+							index_filename = self._args.index_filename,
+							resource_uri = resource_uri,
+							geometry = self._args.geometry,
+							image_max_dimension = self._args.image_max_dimension,
+							image_srcset = self._args.image_srcset,
+							eager_image_slides = self._args.eager_image_slides,
+							image_format = ImageFormat(self._args.image_format),
+							image_format_fallback = self._args.image_format_fallback,
+							optimize_png = self._args.optimize_png,
+							presentation_features = presentation_features,
+							injected_metadata = injected_metadata,
+							trustworthy_source = self._args.trustworthy_source,
+							allow_missing_svg_fonts = self._args.allow_missing_svg_fonts,
+							render_jobs = self._args.jobs,
+							template_jobs = self._args.template_jobs,
+							stream_index = self._args.stream_index,
+							link_cached_assets = self._args.link_cache,
+							xml_parser = self._args.xml_parser)
+					session = RenderSession(self._args.infile, rendering_parameters, deploy_directory = self._args.outdir, resource_directory = resource_dir)
+				rendered_presentation = session.render(changed_paths = changed_paths)
+				presentation = session.renderer.presentation
 				t1 = time.time()
-				_log.info("Successfully rendered presentation into directory \"%s\", took %.1f seconds", self._args.outdir, t1 - t0)
+				if session.last_render_incremental:
+					_log.info("Successfully re-rendered changed slides into directory \"%s\", took %.1f seconds", self._args.outdir, t1 - t0)
+				else:
+					_log.info("Successfully rendered presentation into directory \"%s\", took %.1f seconds", self._args.outdir, t1 - t0)
+				_log.debug("Output files: %d written, %d linked from cache, %d unchanged", rendered_presentation.output_statistics["written"], rendered_presentation.output_statistics["linked"], rendered_presentation.output_statistics["unchanged"])
+				if rendered_presentation.output_statistics["reencoded_images"] > 0:
+					(original_size, reencoded_size) = (rendered_presentation.output_statistics["reencoded_original_bytes"], rendered_presentation.output_statistics["reencoded_bytes"])
+					_log.info("Re-encoded %d images from %.1f MiB to %.1f MiB, saving %.0f%%", rendered_presentation.output_statistics["reencoded_images"], original_size / 1024 / 1024, reencoded_size / 1024 / 1024, 100 * (original_size - reencoded_size) / original_size)
+				if rendered_presentation.output_statistics["optimized_pngs"] > 0:
+					(original_size, optimized_size) = (rendered_presentation.output_statistics["optimized_png_original_bytes"], rendered_presentation.output_statistics["optimized_png_bytes"])
+					_log.info("Optimized %d PNG images from %.1f MiB to %.1f MiB, saving %.0f%%", rendered_presentation.output_statistics["optimized_pngs"], original_size / 1024 / 1024, optimized_size / 1024 / 1024, 100 * (original_size - optimized_size) / original_size)
 
 				if self._args.deploy_presentation:
 					if "deployment" not in presentation.variables:
@@ -145,12 +195,17 @@ class ActionRender(BaseAction):
 				_log.error("Rendering failed: [%s] %s", e.__class__.__name__, str(e))
 				if _log.isEnabledFor(logging.DEBUG):
 					print(traceback.format_exc())
+			self._cache_maintenance(run_gc = first_run)
+			first_run = False
 			if not self._args.re_render_loop:
 				break
-			if (renderer is None) or (force_wait_secs is not None):
+			if (session is None) or (session.renderer is None) or (force_wait_secs is not None):
 				sleep_duration_secs = force_wait_secs or 5
 				_log.warning("Unable to watch files for change since parsing the source was impossible; sleeping for %d seconds instead.", sleep_duration_secs)
 				time.sleep(sleep_duration_secs)
+				changed_paths = None
 			else:
-				self._wait_for_change(renderer)
+				changed_paths = self._wait_for_change(watcher, session.renderer)
+		if watcher is not None:
+			watcher.close()
 		return 0 if render_success else 1
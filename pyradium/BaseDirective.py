@@ -20,4 +20,14 @@
 #	Johannes Bauer <JohannesBauer@gmx.de>
 
 class BaseDirective():
-	pass
+	@property
+	def fingerprint(self):
+		# Identifies the source of the directive; if it is unchanged, the
+		# directive renders identically (given identical dependencies)
+		raise NotImplementedError(f"{self.__class__.__name__}.fingerprint")
+
+	@property
+	def layout_fingerprint(self):
+		# Identifies everything about the directive that has an effect on
+		# other slides (e.g., TOC, numbering or timing)
+		return self.fingerprint
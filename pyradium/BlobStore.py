@@ -0,0 +1,75 @@
+#	pyradium - HTML presentation/slide show generator
+#	Copyright (C) 2026-2026 Johannes Bauer
+#
+#	This file is part of pyradium.
+#
+#	pyradium is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	pyradium is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with pyradium; if not, write to the Free Software
+#	Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+
+import os
+import hashlib
+import contextlib
+from .Tools import FileTools
+
+class BlobStore():
+	def __init__(self, directory):
+		self._directory = directory
+		if not self._directory.endswith("/"):
+			self._directory += "/"
+
+	@property
+	def directory(self):
+		return self._directory
+
+	@staticmethod
+	def hash_data(data: bytes):
+		return hashlib.sha256(data).hexdigest()
+
+	def filename(self, blobhash: str):
+		return f"{self._directory}{blobhash[:2]}/{blobhash}"
+
+	def contains(self, blobhash: str):
+		return os.path.isfile(self.filename(blobhash))
+
+	def store(self, data: bytes):
+		blobhash = self.hash_data(data)
+		filename = self.filename(blobhash)
+		if not os.path.isfile(filename):
+			with contextlib.suppress(FileExistsError):
+				os.makedirs(os.path.dirname(filename))
+			tmp_filename = FileTools.base_random_file_on(filename)
+			with open(tmp_filename, "wb") as f:
+				f.write(data)
+			os.replace(tmp_filename, filename)
+		return blobhash
+
+	def load(self, blobhash: str):
+		try:
+			with open(self.filename(blobhash), "rb") as f:
+				return f.read()
+		except FileNotFoundError:
+			return None
+
+
+	def __iter__(self):
+		if not os.path.isdir(self._directory):
+			return
+		for prefix in sorted(os.listdir(self._directory)):
+			prefix_directory = self._directory + prefix
+			if (len(prefix) == 2) and os.path.isdir(prefix_directory):
+				for blobhash in sorted(os.listdir(prefix_directory)):
+					if not blobhash.startswith("."):
+						yield blobhash
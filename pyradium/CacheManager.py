@@ -0,0 +1,216 @@
+#	pyradium - HTML presentation/slide show generator
+#	Copyright (C) 2026-2026 Johannes Bauer
+#
+#	This file is part of pyradium.
+#
+#	pyradium is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	pyradium is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with pyradium; if not, write to the Free Software
+#	Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+
+import os
+import re
+import json
+import time
+import contextlib
+import collections
+from .BlobStore import BlobStore
+from .RendererCache import RendererCache
+from .ExtendedJSONEncoder import ExtendedJSONObjects
+from .Tools import FileTools
+from .FriendlyArgumentParser import baseint_unit
+from .Exceptions import ConfigurationException
+
+class CacheManager():
+	CacheEntry = collections.namedtuple("CacheEntry", [ "renderer_name", "keyhash", "filename", "last_access", "size", "blobs" ])
+	GCResult = collections.namedtuple("GCResult", [ "removed_entries", "removed_blobs", "freed_bytes", "remaining_bytes" ])
+	_NON_RENDERER_DIRECTORIES = set([ "blobs", "mako" ])
+	_STATISTICS_FILENAME = "statistics.json"
+	_BLOB_GRACE_PERIOD_SECS = 3600
+	_AGE_RE = re.compile(r"\s*(?P<value>\d+(\.\d+)?)\s*(?P<unit>[smhdw]?)\s*")
+	_AGE_UNITS = { "": 1, "s": 1, "m": 60, "h": 3600, "d": 86400, "w": 7 * 86400 }
+
+	def __init__(self, cache_directory = None):
+		if cache_directory is None:
+			cache_directory = RendererCache.default_directory()
+		elif not cache_directory.endswith("/"):
+			cache_directory += "/"
+		self._directory = cache_directory
+		self._blob_store = BlobStore(self._directory + "blobs/")
+
+	@classmethod
+	def parse_size(cls, text):
+		if isinstance(text, int):
+			return text
+		try:
+			return baseint_unit(text)
+		except ValueError as e:
+			raise ConfigurationException(f"Not a valid size specification: {text}") from e
+
+	@classmethod
+	def parse_age(cls, text):
+		if isinstance(text, int):
+			return text
+		match = cls._AGE_RE.fullmatch(text)
+		if match is None:
+			raise ConfigurationException(f"Not a valid age specification: {text}")
+		return round(float(match["value"]) * cls._AGE_UNITS[match["unit"]])
+
+	@property
+	def directory(self):
+		return self._directory
+
+	def _renderer_names(self):
+		if not os.path.isdir(self._directory):
+			return
+		for name in sorted(os.listdir(self._directory)):
+			if (name not in self._NON_RENDERER_DIRECTORIES) and (not name.startswith(".")) and os.path.isdir(self._directory + name):
+				yield name
+
+	@classmethod
+	def _blob_references(cls, obj):
+		if isinstance(obj, dict):
+			if obj.get("__internal_object__") == ExtendedJSONObjects.BlobReference.value:
+				yield obj["blob"]
+			else:
+				for value in obj.values():
+					yield from cls._blob_references(value)
+		elif isinstance(obj, list):
+			for value in obj:
+				yield from cls._blob_references(value)
+
+	def entries(self):
+		for renderer_name in self._renderer_names():
+			renderer_directory = self._directory + renderer_name + "/"
+			for filename in os.listdir(renderer_directory):
+				if filename.startswith(".") or (not filename.endswith(".json")):
+					continue
+				full_filename = renderer_directory + filename
+				try:
+					stat = os.stat(full_filename)
+					with open(full_filename) as f:
+						blobs = frozenset(self._blob_references(json.load(f).get("object")))
+				except (FileNotFoundError, json.decoder.JSONDecodeError):
+					continue
+				yield self.CacheEntry(renderer_name = renderer_name, keyhash = filename[:-5], filename = full_filename, last_access = stat.st_mtime, size = stat.st_size, blobs = blobs)
+
+	def _blob_sizes(self):
+		blob_sizes = { }
+		for blobhash in self._blob_store:
+			with contextlib.suppress(FileNotFoundError):
+				blob_sizes[blobhash] = os.stat(self._blob_store.filename(blobhash)).st_size
+		return blob_sizes
+
+	def _read_statistics(self):
+		try:
+			with open(self._directory + self._STATISTICS_FILENAME) as f:
+				return json.load(f)
+		except (FileNotFoundError, json.decoder.JSONDecodeError):
+			return { "renderers": { } }
+
+	def record_statistics(self, renderers):
+		statistics = self._read_statistics()
+		changed = False
+		for renderer in renderers:
+			if not isinstance(renderer, RendererCache):
+				continue
+			counts = renderer.pop_statistics()
+			if (counts["hits"] == 0) and (counts["misses"] == 0):
+				continue
+			renderer_statistics = statistics["renderers"].setdefault(renderer.name, { "hits": 0, "misses": 0 })
+			renderer_statistics["hits"] += counts["hits"]
+			renderer_statistics["misses"] += counts["misses"]
+			changed = True
+		if changed:
+			filename = self._directory + self._STATISTICS_FILENAME
+			with contextlib.suppress(FileExistsError):
+				os.makedirs(self._directory)
+			tmp_filename = FileTools.base_random_file_on(filename)
+			with open(tmp_filename, "w") as f:
+				json.dump(statistics, f)
+			os.replace(tmp_filename, filename)
+
+	def statistics(self, oldest_count = 5):
+		entries = list(self.entries())
+		blob_sizes = self._blob_sizes()
+		recorded = self._read_statistics()["renderers"]
+
+		renderers = { }
+		for renderer_name in sorted(set(entry.renderer_name for entry in entries) | set(recorded)):
+			renderer_entries = [ entry for entry in entries if entry.renderer_name == renderer_name ]
+			renderer_blobs = set().union(*(entry.blobs for entry in renderer_entries))
+			counts = recorded.get(renderer_name, { "hits": 0, "misses": 0 })
+			lookups = counts["hits"] + counts["misses"]
+			renderers[renderer_name] = {
+				"entries":		len(renderer_entries),
+				"bytes":		sum(entry.size for entry in renderer_entries) + sum(blob_sizes.get(blobhash, 0) for blobhash in renderer_blobs),
+				"hits":			counts["hits"],
+				"misses":		counts["misses"],
+				"hit_ratio":	(counts["hits"] / lookups) if (lookups > 0) else None,
+			}
+
+		return {
+			"renderers":		renderers,
+			"total_entries":	len(entries),
+			"total_bytes":		sum(entry.size for entry in entries) + sum(blob_sizes.values()),
+			"oldest":			sorted(entries, key = lambda entry: entry.last_access)[:oldest_count],
+		}
+
+	def gc(self, max_size = None, max_age_secs = None, dry_run = False):
+		now = time.time()
+		entries = sorted(self.entries(), key = lambda entry: entry.last_access)
+		blob_sizes = self._blob_sizes()
+		blob_refcount = collections.Counter()
+		for entry in entries:
+			blob_refcount.update(entry.blobs)
+
+		(removed_entries, removed_blobs, freed_bytes) = (0, 0, 0)
+		remaining_bytes = sum(entry.size for entry in entries) + sum(blob_sizes.values())
+		def remove_file(filename, size):
+			nonlocal freed_bytes, remaining_bytes
+			if not dry_run:
+				with contextlib.suppress(FileNotFoundError):
+					os.unlink(filename)
+			freed_bytes += size
+			remaining_bytes -= size
+
+		def remove_blob(blobhash):
+			nonlocal removed_blobs
+			remove_file(self._blob_store.filename(blobhash), blob_sizes.pop(blobhash))
+			removed_blobs += 1
+
+		# Blobs which are not referenced by any entry are left over from
+		# aborted runs; do not touch very recent ones since their entry might
+		# be in the process of being written.
+		for blobhash in list(blob_sizes):
+			if blob_refcount[blobhash] == 0:
+				with contextlib.suppress(FileNotFoundError):
+					if os.stat(self._blob_store.filename(blobhash)).st_mtime < now - self._BLOB_GRACE_PERIOD_SECS:
+						remove_blob(blobhash)
+
+		for entry in entries:
+			expired = (max_age_secs is not None) and (entry.last_access < now - max_age_secs)
+			oversized = (max_size is not None) and (remaining_bytes > max_size)
+			if not (expired or oversized):
+				# Entries are sorted by last access, all following ones are
+				# younger and fit into the size budget
+				break
+			remove_file(entry.filename, entry.size)
+			removed_entries += 1
+			for blobhash in entry.blobs:
+				blob_refcount[blobhash] -= 1
+				if (blob_refcount[blobhash] == 0) and (blobhash in blob_sizes):
+					remove_blob(blobhash)
+
+		return self.GCResult(removed_entries = removed_entries, removed_blobs = removed_blobs, freed_bytes = freed_bytes, remaining_bytes = remaining_bytes)
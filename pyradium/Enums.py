@@ -29,3 +29,9 @@ class PresentationFeature(enum.Enum):
 	Acronyms = "acronyms"
 	Pause = "pause"
 	MathJax = "mathjax"
+	LazySlides = "lazy"
+
+class ImageFormat(enum.Enum):
+	Original = "original"
+	WebP = "webp"
+	AVIF = "avif"
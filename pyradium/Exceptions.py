@@ -42,6 +42,8 @@ class UsageException(SlideException): pass
 
 class XMLHookRegistryException(PyRadiumException): pass
 class RendererRegistryException(PyRadiumException): pass
+class XMLParserRegistryException(PyRadiumException): pass
+class DocumentTypeDeclarationException(PyRadiumException): pass
 
 class InvalidTransformationException(PyRadiumException): pass
 class SVGValidationError(PyRadiumException): pass
@@ -55,6 +57,7 @@ class FailedToLookupFileException(PyRadiumException): pass
 class InvalidTeXException(PyRadiumException): pass
 class UnknownSlideTypeException(PyRadiumException): pass
 class ImageRenderingException(PyRadiumException): pass
+class InkscapeShellException(ImageRenderingException): pass
 class CodeHighlightingException(PyRadiumException): pass
 class UnknownParameterException(PyRadiumException): pass
 class MissingParameterException(PyRadiumException): pass
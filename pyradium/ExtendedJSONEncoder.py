@@ -27,6 +27,7 @@ import base64
 class ExtendedJSONObjects(enum.Enum):
 	UncompressedBytes = "6bbc5f9e-6aba-40f4-878c-1ce5f5f50055"
 	ZLibCompressedBytes = "f12d83b4-b2dd-4968-8f14-e063970c66fd"
+	BlobReference = "0c6f7d5e-2b1a-4c55-9b0e-5d3c8f6a1e27"
 
 class ExtendedJSONEncoder(json.JSONEncoder):
 	def default(self, obj):
@@ -62,6 +63,9 @@ class ExtendedJSONEncoder(json.JSONEncoder):
 				return base64.b64decode(obj["data"])
 			elif obj_type == ExtendedJSONObjects.ZLibCompressedBytes:
 				return zlib.decompress(base64.b64decode(obj["data"]))
+			elif obj_type == ExtendedJSONObjects.BlobReference:
+				# Resolved by whoever knows the blob store
+				return obj
 			else:
 				raise NotImplementedError(obj_type)
 		else:
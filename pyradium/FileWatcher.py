@@ -0,0 +1,280 @@
+#	pyradium - HTML presentation/slide show generator
+#	Copyright (C) 2026-2026 Johannes Bauer
+#
+#	This file is part of pyradium.
+#
+#	pyradium is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	pyradium is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with pyradium; if not, write to the Free Software
+#	Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+
+import os
+import re
+import time
+import errno
+import struct
+import select
+import logging
+import ctypes
+import ctypes.util
+
+_log = logging.getLogger(__spec__.name)
+
+class FileWatcher():
+	# Stays armed between calls to wait(), so changes that happen while the
+	# caller is busy (e.g., rendering) are not lost. Editors like VIM write
+	# swap files which are ignored.
+	_EXCLUDE_RE = re.compile(r"\..*\.sw[a-z]")
+
+	def __init__(self, debounce_secs = 0.2):
+		self._debounce_secs = debounce_secs
+		self._excluded_directories = [ ]
+		self._watched_paths = set()
+
+	@classmethod
+	def create(cls, debounce_secs = 0.2):
+		try:
+			return InotifyFileWatcher(debounce_secs = debounce_secs)
+		except OSError as e:
+			_log.debug("inotify unavailable (%s), falling back to polling for file changes.", str(e))
+			return PollingFileWatcher(debounce_secs = debounce_secs)
+
+	def exclude(self, path):
+		# Changes below the path (e.g., the output directory) are ignored
+		self._excluded_directories.append(os.path.realpath(path))
+
+	def _is_relevant(self, path):
+		if self._EXCLUDE_RE.fullmatch(os.path.basename(path)):
+			return False
+		return not any((path == excluded) or path.startswith(excluded + "/") for excluded in self._excluded_directories)
+
+	def watch(self, paths):
+		# Watch files and, recursively, directories; already watched paths are
+		# ignored, non-existent paths are skipped.
+		for path in paths:
+			real_path = os.path.realpath(path)
+			if real_path in self._watched_paths:
+				continue
+			if os.path.isdir(real_path):
+				self._watch_directory(real_path)
+			elif os.path.isfile(real_path):
+				self._watch_file(os.path.dirname(real_path), os.path.basename(real_path))
+			else:
+				continue
+			self._watched_paths.add(real_path)
+
+	def _watch_directory(self, path):
+		raise NotImplementedError(f"{self.__class__.__name__}._watch_directory")
+
+	def _watch_file(self, dirname, filename):
+		raise NotImplementedError(f"{self.__class__.__name__}._watch_file")
+
+	def _poll(self, timeout_secs):
+		# Returns set of changed paths, blocks at most timeout_secs (or
+		# indefinitely if None)
+		raise NotImplementedError(f"{self.__class__.__name__}._poll")
+
+	def wait(self, timeout_secs = None):
+		# Block until something changes, then wait until the changes have
+		# settled (editors often issue a burst of writes). Returns the set of
+		# changed paths or an empty set on timeout.
+		changed_paths = set()
+		t_end = None if (timeout_secs is None) else (time.monotonic() + timeout_secs)
+		while len(changed_paths) == 0:
+			remaining_secs = None if (t_end is None) else (t_end - time.monotonic())
+			if (remaining_secs is not None) and (remaining_secs <= 0):
+				return changed_paths
+			changed_paths |= set(path for path in self._poll(remaining_secs) if self._is_relevant(path))
+		while True:
+			more_changes = set(path for path in self._poll(self._debounce_secs) if self._is_relevant(path))
+			if len(more_changes) == 0:
+				break
+			changed_paths |= more_changes
+		return changed_paths
+
+	def close(self):
+		pass
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, *args):
+		self.close()
+
+class InotifyFileWatcher(FileWatcher):
+	_IN_MODIFY = 0x2
+	_IN_CLOSE_WRITE = 0x8
+	_IN_MOVED_FROM = 0x40
+	_IN_MOVED_TO = 0x80
+	_IN_CREATE = 0x100
+	_IN_DELETE = 0x200
+	_IN_Q_OVERFLOW = 0x4000
+	_IN_IGNORED = 0x8000
+	_IN_ONLYDIR = 0x1000000
+	_IN_ISDIR = 0x40000000
+	_IN_NONBLOCK = os.O_NONBLOCK
+	_IN_CLOEXEC = os.O_CLOEXEC
+	_WATCH_MASK = _IN_MODIFY | _IN_CLOSE_WRITE | _IN_MOVED_FROM | _IN_MOVED_TO | _IN_CREATE | _IN_DELETE | _IN_ONLYDIR
+	_EVENT_HEADER = struct.Struct("iIII")
+
+	def __init__(self, debounce_secs = 0.2):
+		super().__init__(debounce_secs = debounce_secs)
+		libc_name = ctypes.util.find_library("c")
+		if libc_name is None:
+			raise OSError(errno.ENOSYS, "no C library found")
+		self._libc = ctypes.CDLL(libc_name, use_errno = True)
+		if not hasattr(self._libc, "inotify_init1"):
+			raise OSError(errno.ENOSYS, "C library does not support inotify")
+		self._fd = self._libc.inotify_init1(self._IN_NONBLOCK | self._IN_CLOEXEC)
+		if self._fd < 0:
+			raise OSError(ctypes.get_errno(), os.strerror(ctypes.get_errno()))
+
+		# Watch descriptor to (directory name, recursive, set of filenames)
+		self._watches = { }
+		self._wd_by_dirname = { }
+		self._all_paths = set()
+
+	def _add_watch(self, dirname):
+		wd = self._wd_by_dirname.get(dirname)
+		if wd is not None:
+			return wd
+		wd = self._libc.inotify_add_watch(self._fd, os.fsencode(dirname), self._WATCH_MASK)
+		if wd < 0:
+			_log.warning("Cannot watch %s for changes: %s", dirname, os.strerror(ctypes.get_errno()))
+			return None
+		self._wd_by_dirname[dirname] = wd
+		self._watches[wd] = [ dirname, False, set() ]
+		return wd
+
+	def _watch_directory(self, path):
+		# Returns all files found so that the ones created before the watch
+		# was in place can be reported as well
+		found_paths = set()
+		for (dirname, subdirs, filenames) in os.walk(path):
+			wd = self._add_watch(dirname)
+			if wd is not None:
+				self._watches[wd][1] = True
+				self._all_paths.add(dirname)
+			found_paths |= set(dirname + "/" + filename for filename in filenames)
+		return found_paths
+
+	def _watch_file(self, dirname, filename):
+		wd = self._add_watch(dirname)
+		if wd is not None:
+			self._watches[wd][2].add(filename)
+			self._all_paths.add(dirname + "/" + filename)
+
+	def _read_events(self):
+		try:
+			data = os.read(self._fd, 65536)
+		except BlockingIOError:
+			return
+		offset = 0
+		while offset < len(data):
+			(wd, mask, cookie, name_length) = self._EVENT_HEADER.unpack_from(data, offset)
+			offset += self._EVENT_HEADER.size
+			name = os.fsdecode(data[offset : offset + name_length].rstrip(b"\x00"))
+			offset += name_length
+			yield (wd, mask, name)
+
+	def _handle_event(self, wd, mask, name):
+		if mask & self._IN_Q_OVERFLOW:
+			# Events were lost, we must assume everything changed
+			_log.debug("inotify event queue overflowed.")
+			return set(self._all_paths)
+		if (mask & self._IN_IGNORED) or (wd not in self._watches):
+			# Watched directory was removed
+			(dirname, recursive, filenames) = self._watches.pop(wd, (None, None, None))
+			if dirname is not None:
+				self._wd_by_dirname.pop(dirname, None)
+				# If the directory is recreated, watch() needs to add it again
+				unwatched_paths = set([ dirname ]) | set(dirname + "/" + filename for filename in filenames)
+				self._watched_paths -= unwatched_paths
+				self._all_paths -= unwatched_paths
+			return set()
+
+		(dirname, recursive, filenames) = self._watches[wd]
+		path = dirname + "/" + name
+		if recursive:
+			if (mask & self._IN_ISDIR) and (mask & (self._IN_CREATE | self._IN_MOVED_TO)):
+				return set([ path ]) | self._watch_directory(path)
+			return set([ path ])
+		elif name in filenames:
+			return set([ path ])
+		else:
+			return set()
+
+	def _poll(self, timeout_secs):
+		(readable, _, _) = select.select([ self._fd ], [ ], [ ], timeout_secs)
+		changed_paths = set()
+		if len(readable) > 0:
+			for (wd, mask, name) in self._read_events():
+				changed_paths |= self._handle_event(wd, mask, name)
+		return changed_paths
+
+	def close(self):
+		if self._fd >= 0:
+			os.close(self._fd)
+			self._fd = -1
+
+class PollingFileWatcher(FileWatcher):
+	def __init__(self, debounce_secs = 0.2, poll_interval_secs = 0.5):
+		super().__init__(debounce_secs = debounce_secs)
+		self._poll_interval_secs = poll_interval_secs
+		self._directories = set()
+		self._files = set()
+		self._signatures = { }
+
+	@staticmethod
+	def _file_signature(filename):
+		try:
+			statres = os.stat(filename)
+		except FileNotFoundError:
+			return None
+		return (statres.st_mtime_ns, statres.st_size)
+
+	def _walk_signatures(self, directory):
+		signatures = { }
+		for (dirname, subdirs, filenames) in os.walk(directory):
+			for filename in filenames:
+				full_filename = dirname + "/" + filename
+				signatures[full_filename] = self._file_signature(full_filename)
+		return signatures
+
+	def _watch_directory(self, path):
+		self._directories.add(path)
+		self._signatures.update(self._walk_signatures(path))
+
+	def _watch_file(self, dirname, filename):
+		path = dirname + "/" + filename
+		self._files.add(path)
+		self._signatures[path] = self._file_signature(path)
+
+	def _snapshot(self):
+		signatures = { filename: self._file_signature(filename) for filename in self._files }
+		for directory in self._directories:
+			signatures.update(self._walk_signatures(directory))
+		return signatures
+
+	def _poll(self, timeout_secs):
+		t_end = None if (timeout_secs is None) else (time.monotonic() + timeout_secs)
+		while True:
+			sleep_secs = self._poll_interval_secs if (t_end is None) else min(self._poll_interval_secs, t_end - time.monotonic())
+			if sleep_secs > 0:
+				time.sleep(sleep_secs)
+			signatures = self._snapshot()
+			changed_paths = set(filename for filename in (signatures.keys() | self._signatures.keys()) if signatures.get(filename) != self._signatures.get(filename))
+			self._signatures = signatures
+			if (len(changed_paths) > 0) or ((t_end is not None) and (time.monotonic() >= t_end)):
+				return changed_paths
@@ -84,12 +84,19 @@ class FrozenTOC():
 		else:
 			return self._entries[self._current_index]
 
+	@property
+	def current_index(self):
+		return self._current_index
+
 	def advance(self):
 		self._current_index += 1
 
 	def reset_index(self):
 		self._current_index = -1
 
+	def seek(self, index):
+		self._current_index = index
+
 	def _seperator(self, depth):
 		return self._separators.get(depth, ".")
 
@@ -0,0 +1,68 @@
+#	pyradium - HTML presentation/slide show generator
+#	Copyright (C) 2026-2026 Johannes Bauer
+#
+#	This file is part of pyradium.
+#
+#	pyradium is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	pyradium is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with pyradium; if not, write to the Free Software
+#	Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+
+import os
+import logging
+
+_log = logging.getLogger(__spec__.name)
+
+class IncludeCache():
+	# Keeps the parsed sub-presentations of <include> directives between loads
+	# of a presentation (e.g., in the re-render loop) so that only included
+	# files which changed are parsed again. The directives of a cached
+	# sub-presentation are shared by all presentations that include it and
+	# must therefore not be modified while rendering.
+	def __init__(self):
+		self._entries = { }
+		self._hits = 0
+		self._misses = 0
+
+	@property
+	def hits(self):
+		return self._hits
+
+	@property
+	def misses(self):
+		return self._misses
+
+	@staticmethod
+	def _file_signature(filename):
+		try:
+			statres = os.stat(filename)
+		except FileNotFoundError:
+			return None
+		return (statres.st_mtime_ns, statres.st_size)
+
+	def get(self, filename, xml_parser, load_function):
+		# The signature is determined before loading: should the file change
+		# while it is parsed, it is simply parsed again on the next lookup
+		key = (os.path.realpath(filename), xml_parser)
+		signature = self._file_signature(filename)
+		entry = self._entries.get(key)
+		if (entry is not None) and (signature is not None) and (entry[0] == signature):
+			self._hits += 1
+			_log.trace("Reusing parsed include file %s", filename)
+			return entry[1]
+
+		self._misses += 1
+		presentation = load_function()
+		self._entries[key] = (signature, presentation)
+		return presentation
@@ -0,0 +1,174 @@
+#	pyradium - HTML presentation/slide show generator
+#	Copyright (C) 2026-2026 Johannes Bauer
+#
+#	This file is part of pyradium.
+#
+#	pyradium is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	pyradium is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with pyradium; if not, write to the Free Software
+#	Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+
+import os
+import time
+import select
+import logging
+import threading
+import subprocess
+from .Exceptions import InkscapeShellException
+
+_log = logging.getLogger(__spec__.name)
+
+class InkscapeShell():
+	# One long-running "inkscape --shell" process (Inkscape 1.x) which is fed
+	# export actions. Each command is answered by a prompt once it has been
+	# executed.
+	_PROMPT = b"> "
+
+	def __init__(self, executable = "inkscape", timeout_secs = 60):
+		self._timeout_secs = timeout_secs
+		try:
+			self._proc = subprocess.Popen([ executable, "--shell" ], stdin = subprocess.PIPE, stdout = subprocess.PIPE, stderr = _log.subproc_target)
+		except OSError as e:
+			raise InkscapeShellException(f"Unable to start Inkscape shell using {executable}: {str(e)}") from e
+		self._read_until_prompt()
+		_log.trace("Started Inkscape shell with PID %d", self._proc.pid)
+
+	@property
+	def alive(self):
+		return self._proc.poll() is None
+
+	def _read_until_prompt(self):
+		output = bytearray()
+		end_time = time.monotonic() + self._timeout_secs
+		fd = self._proc.stdout.fileno()
+		while not ((output == self._PROMPT) or output.endswith(b"\n" + self._PROMPT)):
+			remaining = end_time - time.monotonic()
+			if remaining <= 0:
+				self.close()
+				raise InkscapeShellException(f"Inkscape shell did not respond within {self._timeout_secs} seconds.")
+			(readable, _, _) = select.select([ fd ], [ ], [ ], remaining)
+			if len(readable) == 0:
+				continue
+			chunk = os.read(fd, 4096)
+			if len(chunk) == 0:
+				self.close()
+				raise InkscapeShellException(f"Inkscape shell terminated unexpectedly: {output.decode('utf-8', errors = 'replace')}")
+			output += chunk
+		return output[: -len(self._PROMPT)].decode("utf-8", errors = "replace")
+
+	def execute(self, actions):
+		command = "; ".join(actions) + "\n"
+		try:
+			self._proc.stdin.write(command.encode("utf-8"))
+			self._proc.stdin.flush()
+		except OSError as e:
+			self.close()
+			raise InkscapeShellException(f"Unable to send command to Inkscape shell: {str(e)}") from e
+		return self._read_until_prompt()
+
+	def export_png(self, svg_filename, png_filename, width = None, height = None):
+		# Export settings persist across commands, so always set both
+		# dimensions (zero meaning "not specified")
+		if os.path.exists(png_filename):
+			os.unlink(png_filename)
+		output = self.execute([ f"file-open:{svg_filename}", f"export-filename:{png_filename}", f"export-width:{width or 0}", f"export-height:{height or 0}", "export-do", "file-close" ])
+		if (not os.path.exists(png_filename)) or (os.stat(png_filename).st_size == 0):
+			raise InkscapeShellException(f"Inkscape shell did not export {svg_filename} to {png_filename}: {output.strip()}")
+
+	def close(self):
+		if self._proc.poll() is None:
+			try:
+				self._proc.stdin.write(b"quit\n")
+				self._proc.stdin.close()
+				self._proc.wait(timeout = 5)
+			except (OSError, subprocess.TimeoutExpired):
+				self._proc.kill()
+				self._proc.wait()
+		self._proc.stdout.close()
+
+class InkscapeShellPool():
+	# Shells are started on demand when no idle one is available, so the
+	# number of shells follows the number of concurrently rendering threads
+	# (bounded by max_shells).
+	def __init__(self, max_shells = None, executable = "inkscape", enabled = True):
+		self._max_shells = max_shells or os.cpu_count() or 1
+		self._executable = executable
+		self._condition = threading.Condition()
+		self._idle_shells = [ ]
+		self._shell_count = 0
+		self._export_count = 0
+		self._available = enabled
+
+	@property
+	def available(self):
+		# False when disabled or once a shell could not be started (e.g.,
+		# Inkscape missing or too old to support shell mode)
+		return self._available
+
+	@property
+	def max_shells(self):
+		return self._max_shells
+
+	@property
+	def shell_count(self):
+		return self._shell_count
+
+	@property
+	def export_count(self):
+		return self._export_count
+
+	def _acquire(self):
+		with self._condition:
+			while (len(self._idle_shells) == 0) and (self._shell_count >= self._max_shells):
+				self._condition.wait()
+			if len(self._idle_shells) > 0:
+				return self._idle_shells.pop()
+			self._shell_count += 1
+		try:
+			return InkscapeShell(executable = self._executable)
+		except InkscapeShellException:
+			self._available = False
+			self._release(None)
+			raise
+
+	def _release(self, shell):
+		with self._condition:
+			if (shell is not None) and shell.alive:
+				self._idle_shells.append(shell)
+			else:
+				self._shell_count -= 1
+			self._condition.notify()
+
+	def export_png(self, svg_filename, png_filename, width = None, height = None):
+		shell = self._acquire()
+		try:
+			shell.export_png(svg_filename, png_filename, width = width, height = height)
+			self._export_count += 1
+		finally:
+			self._release(shell)
+
+	def close(self):
+		with self._condition:
+			if self._shell_count > 0:
+				_log.debug("Closing %d Inkscape shell(s) after %d exports.", self._shell_count, self._export_count)
+			for shell in self._idle_shells:
+				shell.close()
+			self._shell_count -= len(self._idle_shells)
+			self._idle_shells = [ ]
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, *args):
+		self.close()
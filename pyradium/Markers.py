@@ -36,5 +36,9 @@ class MarkerDirective(BaseDirective):
 	def name(self):
 		return self._name
 
+	@property
+	def fingerprint(self):
+		return ("marker", self.name)
+
 	def render(self, rendered_presentation):
 		rendered_presentation.markers[self.name] = rendered_presentation.current_slide_number
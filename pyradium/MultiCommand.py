@@ -24,6 +24,7 @@
 #	File UUID 4c6b89d0-ec0c-4b19-80d1-4daba7d80967
 
 import sys
+import importlib
 import collections
 import textwrap
 
@@ -34,6 +35,23 @@ class MultiCommand():
 	RegisteredCommand = collections.namedtuple("RegisteredCommand", [ "name", "description", "parsergenerator", "action", "aliases", "visible" ])
 	ParseResult = collections.namedtuple("ParseResults", [ "cmd", "args" ])
 
+	class LazyAction():
+		# Action that is only imported when its command is actually run, so
+		# that registering many commands does not import all of their
+		# dependencies at startup
+		def __init__(self, module_name, attribute_name):
+			self._module_name = module_name
+			self._attribute_name = attribute_name
+
+		def resolve(self):
+			return getattr(importlib.import_module(self._module_name), self._attribute_name)
+
+		def __call__(self, *args, **kwargs):
+			return self.resolve()(*args, **kwargs)
+
+		def __repr__(self):
+			return f"LazyAction<{self._module_name}.{self._attribute_name}>"
+
 	def __init__(self, description = None, trailing_text = None, run_method = False):
 		self._description = description
 		self._trailing_text = trailing_text
@@ -52,6 +70,9 @@ class MultiCommand():
 
 		aliases = kwargs.get("aliases", [ ])
 		action = kwargs.get("action")
+		if isinstance(action, str):
+			# "module.name:attribute" is imported lazily on first use
+			action = self.LazyAction(*action.split(":", maxsplit = 1))
 		for alias in aliases:
 			if (alias in self._commands) or (alias in self._aliases):
 				raise Exception(f"Alias '{alias}' already registered.")
@@ -19,19 +19,59 @@
 #
 #	Johannes Bauer <JohannesBauer@gmx.de>
 
+from pyradium.xmlhooks.XMLHookRegistry import XMLHookRegistry
 from .Tools import XMLTools
 from .Exceptions import DuplicateOrderException
 
+class PausedContainer():
+	# View of a mangled content container as it is shown up to (but
+	# excluding) the pause with the given order ID. Only the nodes that
+	# contain pauses are serialized explicitly; everything else is output as
+	# is. A max_order_id of None shows everything.
+	def __init__(self, container_node, max_order_id = None, pause_ancestors = None):
+		self._container_node = container_node
+		self._max_order_id = max_order_id
+		self._pause_ancestors = pause_ancestors if (pause_ancestors is not None) else set()
+
+	def _visible_children(self, node):
+		for child in node.childNodes:
+			if (child.nodeType == child.ELEMENT_NODE) and (child.tagName == "s:pause"):
+				if (self._max_order_id is not None) and (int(child.getAttribute("order")) >= self._max_order_id):
+					break
+				continue
+			yield child
+
+	def _toxml(self, node):
+		if node not in self._pause_ancestors:
+			return node.toxml()
+		inner_xml = self._inner_toxml(node)
+		shallow_node = node.cloneNode(deep = False)
+		if inner_xml == "":
+			return shallow_node.toxml()
+		# Let minidom serialize the tag itself so that the output is
+		# identical to serializing a truncated copy of the node
+		shallow_node.appendChild(node.ownerDocument.createTextNode("\0"))
+		(start_tag, end_tag) = shallow_node.toxml().split("\0")
+		return start_tag + inner_xml + end_tag
+
+	def _inner_toxml(self, node):
+		return "".join(self._toxml(child) for child in self._visible_children(node))
+
+	def inner_toxml(self):
+		return self._inner_toxml(self._container_node)
+
 class PauseRenderer():
 	def __init__(self, content_containers, honor_pauses = True):
 		self._content_containers = content_containers
 		self._honor_pauses = honor_pauses
 		self._used_order_ids = set()
 
-	def _clone_containers(self):
-		return { name: XMLTools.clone(container_node) for (name, container_node) in self._content_containers.items() }
+	def _clone_containers(self, containers = None):
+		if containers is None:
+			containers = self._content_containers
+		return { name: XMLTools.clone(container_node) for (name, container_node) in containers.items() }
 
-	def _enumerate_pause_nodes_of(self, root_node):
+	def _enumerate_pause_nodes_of(self, root_node, assign_order):
 		for pause_node in XMLTools.findall_recurse(root_node, "s:pause"):
 			if not pause_node.hasAttribute("order"):
 				if len(self._used_order_ids) == 0:
@@ -43,40 +83,48 @@ class PauseRenderer():
 			if assigned_order_id in self._used_order_ids:
 				raise DuplicateOrderException("Duplicate order ID: %d" % (assigned_order_id))
 			self._used_order_ids.add(assigned_order_id)
-			pause_node.setAttribute("order", str(assigned_order_id))
-
-	def _enumerate_pause_nodes(self):
-		for (name, container_node) in sorted(self._content_containers.items()):
-			self._enumerate_pause_nodes_of(container_node)
-
-	def _debug_result(self, rendered_containers):
-		if len(rendered_containers) <= 1:
-			return
-		print("%d rendered containers:" % (len(rendered_containers)))
-		for (index, rendered_container) in enumerate(rendered_containers):
-			for (name, container_node) in sorted(rendered_container.items()):
-				print("%s.%d:" % (name, index))
-				print(XMLTools.inner_toxml(container_node))
-				print()
-		print("=" * 120)
-
-	def render(self):
-		if self._honor_pauses:
-			self._enumerate_pause_nodes()
-
-			rendered_containers = [ self._clone_containers() for _ in range(len(self._used_order_ids) + 1) ]
-			sorted_order_ids = list(sorted(self._used_order_ids))
-
-			for (max_order_id, rendered_container) in zip(sorted_order_ids, rendered_containers):
-				for container_node in rendered_container.values():
-					for pause_node in XMLTools.findall_recurse(container_node, "s:pause"):
-						order = int(pause_node.getAttribute("order"))
-						if order >= max_order_id:
-							XMLTools.remove_siblings_after(pause_node)
-						else:
-							XMLTools.remove_node(pause_node)
-		else:
-			rendered_containers = [ self._clone_containers() ]
+			if assign_order:
+				pause_node.setAttribute("order", str(assigned_order_id))
+
+	def _enumerate_pause_nodes(self, containers, assign_order = True):
+		# The content containers themselves are never modified (the slide
+		# may be rendered again), order IDs are only assigned in copies
+		for (name, container_node) in sorted(containers.items()):
+			self._enumerate_pause_nodes_of(container_node, assign_order)
+
+	def _pause_inside_hook(self, container_node):
+		# Hooks consume or rearrange their content, so pauses inside of them
+		# need to be applied before mangling
+		for pause_node in XMLTools.findall_recurse(container_node, "s:pause"):
+			node = pause_node.parentNode
+			while node is not container_node:
+				if node.nodeName.startswith("s:"):
+					return True
+				node = node.parentNode
+		return False
+
+	def _pause_ancestors(self, container_node):
+		ancestors = set()
+		for pause_node in XMLTools.findall_recurse(container_node, "s:pause"):
+			node = pause_node.parentNode
+			while (node is not container_node) and (node not in ancestors):
+				ancestors.add(node)
+				node = node.parentNode
+		return ancestors
+
+	def _render_per_pause(self, rendered_presentation, containers):
+		# Every sub-slide is truncated and mangled separately
+		rendered_containers = [ self._clone_containers(containers) for _ in range(len(self._used_order_ids) + 1) ]
+		sorted_order_ids = list(sorted(self._used_order_ids))
+
+		for (max_order_id, rendered_container) in zip(sorted_order_ids, rendered_containers):
+			for container_node in rendered_container.values():
+				for pause_node in XMLTools.findall_recurse(container_node, "s:pause"):
+					order = int(pause_node.getAttribute("order"))
+					if order >= max_order_id:
+						XMLTools.remove_siblings_after(pause_node)
+					else:
+						XMLTools.remove_node(pause_node)
 
 		# Remove all pause nodes from last container (the one which renders the
 		# whole slide)
@@ -84,5 +132,31 @@ class PauseRenderer():
 			for pause_node in XMLTools.findall_recurse(container_node, "s:pause"):
 				XMLTools.remove_node(pause_node)
 
-#		self._debug_result(rendered_containers)
-		return rendered_containers
+		for rendered_container in rendered_containers:
+			for container_node in rendered_container.values():
+				XMLHookRegistry.mangle(rendered_presentation, container_node)
+		return [ { name: PausedContainer(container_node) for (name, container_node) in rendered_container.items() } for rendered_container in rendered_containers ]
+
+	def layout(self, rendered_presentation):
+		# Returns the number of sub-slides without mangling anything
+		if self._honor_pauses:
+			self._enumerate_pause_nodes(self._content_containers, assign_order = False)
+		for container_node in self._content_containers.values():
+			XMLHookRegistry.layout(rendered_presentation, container_node)
+		return (len(self._used_order_ids) + 1) if self._honor_pauses else 1
+
+	def render(self, rendered_presentation):
+		# Mangles the content containers and returns, for every sub-slide, a
+		# dictionary of PausedContainers
+		containers = self._clone_containers()
+		if self._honor_pauses:
+			self._enumerate_pause_nodes(containers)
+		if self._honor_pauses and any(self._pause_inside_hook(container_node) for container_node in containers.values()):
+			return self._render_per_pause(rendered_presentation, containers)
+
+		# All sub-slides are views of the same container, mangled only once
+		for container_node in containers.values():
+			XMLHookRegistry.mangle(rendered_presentation, container_node)
+		pause_ancestors = { name: self._pause_ancestors(container_node) for (name, container_node) in containers.items() }
+		max_order_ids = (list(sorted(self._used_order_ids)) if self._honor_pauses else [ ]) + [ None ]
+		return [ { name: PausedContainer(container_node, max_order_id = max_order_id, pause_ancestors = pause_ancestors[name]) for (name, container_node) in containers.items() } for max_order_id in max_order_ids ]
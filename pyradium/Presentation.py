@@ -23,16 +23,16 @@ import json
 import hashlib
 import subprocess
 import logging
-import xml.dom.minidom
 import pyradium
 from pyradium.Agenda import Agenda
-from .Tools import XMLTools
+from .Tools import XMLTools, HashTools
+from .XMLParser import BaseXMLParser
 from .TOC import TOCElement, TOCDirective
 from .Slide import RenderSlideDirective
 from .VariableSubstitution import VariableSubstitutionContainer
 from .Acronyms import AcronymDirective
 from .Markers import MarkerDirective
-from .Exceptions import XMLFileNotFoundException, MalformedXMLInputException, JSONFileNotFoundException, MalformedJSONInputException
+from .Exceptions import MalformedXMLInputException, JSONFileNotFoundException, MalformedJSONInputException
 
 _log = logging.getLogger(__spec__.name)
 
@@ -41,11 +41,12 @@ class Presentation():
 		"https://github.com/johndoe31415/pyradium":		"s",
 	}
 
-	def __init__(self, meta, content, sources, variables):
+	def __init__(self, meta, content, sources, variables, fingerprint = None):
 		self._meta = meta
 		self._content = content
 		self._sources = sources
 		self._variables = variables
+		self._fingerprint = fingerprint
 		self._validate_metadata()
 
 	@property
@@ -64,6 +65,11 @@ class Presentation():
 	def variables(self):
 		return self._variables
 
+	@property
+	def fingerprint(self):
+		# Covers the metadata and variables, but not the content directives
+		return self._fingerprint
+
 	@classmethod
 	def _merge_metadata(cls, meta_dict, injected_dict):
 		if not isinstance(injected_dict, dict):
@@ -72,14 +78,8 @@ class Presentation():
 		return meta_dict
 
 	@classmethod
-	def parse_xml(cls, filename):
-		try:
-			dom = xml.dom.minidom.parse(filename)
-		except FileNotFoundError as e:
-			raise XMLFileNotFoundException(f"Cannot parse {filename}: {str(e)}") from e
-		except xml.parsers.expat.ExpatError as e:
-			raise MalformedXMLInputException(f"Cannot parse {filename}: {str(e)}") from e
-		XMLTools.normalize_ns(dom.documentElement, cls._NAMESPACES)
+	def parse_xml(cls, filename, xml_parser = None):
+		dom = BaseXMLParser.get(xml_parser).parse(filename, cls._NAMESPACES)
 		presentation = XMLTools.child_tagname(dom, "presentation")
 		if presentation is None:
 			raise MalformedXMLInputException("No 'presentation' node is present as top node of the XML input document.")
@@ -131,9 +131,12 @@ class Presentation():
 		return { key: node.getAttribute(key) for key in [ "name", "time", "subset" ] }
 
 	@classmethod
-	def load_from_file(cls, filename, rendering_parameters = None):
-		(dom, presentation) = cls.parse_xml(filename)
+	def load_from_file(cls, filename, rendering_parameters = None, xml_parser = None, include_cache = None):
+		if rendering_parameters is not None:
+			xml_parser = rendering_parameters.xml_parser
+		(dom, presentation) = cls.parse_xml(filename, xml_parser = xml_parser)
 		meta = None
+		meta_xml = None
 		content = [ ]
 		variables = { }
 		sources = [ filename ]
@@ -142,6 +145,7 @@ class Presentation():
 				continue
 
 			if child.tagName == "meta":
+				meta_xml = child.toxml()
 				meta = XMLTools.xml_to_dict(XMLTools.child_tagname(dom, ("presentation", "meta")), multikeys = [ "variables", "timer-preset" ], handlers = {
 					"timer-preset":		cls._xml_to_dict_timer_preset,
 				})
@@ -156,7 +160,10 @@ class Presentation():
 				src = child.getAttribute("src")
 				if rendering_parameters is not None:
 					sub_presentation_filename = rendering_parameters.include_dirs.lookup(src)
-					sub_presentation = cls.load_from_file(sub_presentation_filename)
+					if include_cache is None:
+						sub_presentation = cls.load_from_file(sub_presentation_filename, xml_parser = xml_parser)
+					else:
+						sub_presentation = include_cache.get(sub_presentation_filename, xml_parser, lambda: cls.load_from_file(sub_presentation_filename, xml_parser = xml_parser))
 					content += sub_presentation.content
 					sources += sub_presentation.sources
 				else:
@@ -175,6 +182,7 @@ class Presentation():
 			variables = VariableSubstitutionContainer.merge_dicts(variables, rendering_parameters.injected_metadata)
 
 		_log.trace("Presentation variables: %s", str(variables))
+		fingerprint = HashTools.hash_data(json.dumps([ meta_xml, variables ], sort_keys = True, default = str).encode("utf-8"))
 		variables = VariableSubstitutionContainer(variables, environment = VariableSubstitutionContainer.default_environment())
 
 		# Then format the metadata strings using the format variables
@@ -182,7 +190,7 @@ class Presentation():
 			environment = VariableSubstitutionContainer.default_environment()
 			environment["v"] = variables
 			meta = VariableSubstitutionContainer(meta, environment = environment, self_varname = "m").evaluate_all()
-		return cls(meta, content, sources, variables)
+		return cls(meta, content, sources, variables, fingerprint = fingerprint)
 
 	def _validate_metadata(self):
 		if self._meta is None:
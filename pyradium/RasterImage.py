@@ -0,0 +1,354 @@
+#	pyradium - HTML presentation/slide show generator
+#	Copyright (C) 2026-2026 Johannes Bauer
+#
+#	This file is part of pyradium.
+#
+#	pyradium is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	pyradium is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with pyradium; if not, write to the Free Software
+#	Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+
+import zlib
+import struct
+from .Exceptions import MalformedImageException
+
+try:
+	import numpy
+except ImportError:
+	numpy = None
+
+class RasterImage():
+	# Minimal in-process handling of 8 bit per channel, non-interlaced PNG
+	# images (e.g., as emitted by Ghostscript's pngalpha device) so that
+	# cropping does not require spawning ImageMagick.
+	_PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+	_CHANNELS_BY_COLOR_TYPE = {
+		0:	1,		# Grayscale
+		2:	3,		# RGB
+		4:	2,		# Grayscale + alpha
+		6:	4,		# RGBA
+	}
+	_COLOR_TYPE_BY_CHANNELS = { channels: color_type for (color_type, channels) in _CHANNELS_BY_COLOR_TYPE.items() }
+
+	def __init__(self, width, height, channels, rows):
+		assert(len(rows) == height)
+		self._width = width
+		self._height = height
+		self._channels = channels
+		self._rows = rows
+
+	@property
+	def width(self):
+		return self._width
+
+	@property
+	def height(self):
+		return self._height
+
+	@property
+	def channels(self):
+		return self._channels
+
+	@property
+	def has_alpha(self):
+		return self._channels in (2, 4)
+
+	@property
+	def rows(self):
+		return self._rows
+
+	@staticmethod
+	def _leading_zero_count(data):
+		return len(data) - len(data.lstrip(b"\x00"))
+
+	@classmethod
+	def _paeth_unfilter(cls, row, prev, bpp, start):
+		for i in range(start, len(row)):
+			if i >= bpp:
+				a = row[i - bpp]
+				c = prev[i - bpp]
+			else:
+				a = 0
+				c = 0
+			b = prev[i]
+			p = a + b - c
+			pa = abs(p - a)
+			pb = abs(p - b)
+			pc = abs(p - c)
+			if (pa <= pb) and (pa <= pc):
+				predictor = a
+			elif pb <= pc:
+				predictor = b
+			else:
+				predictor = c
+			row[i] = (row[i] + predictor) & 0xff
+
+	@classmethod
+	def _unfilter_row(cls, filter_type, raw, prev, bpp):
+		if filter_type == 0:
+			return bytes(raw)
+		elif filter_type == 2:
+			# Up: bytewise addition without carry, done on the whole row at once
+			mask = int.from_bytes(b"\x7f" * len(raw), "big")
+			(a, b) = (int.from_bytes(raw, "big"), int.from_bytes(prev, "big"))
+			result = ((a & mask) + (b & mask)) ^ ((a ^ b) & ~mask)
+			return result.to_bytes(len(raw), "big")
+		elif filter_type not in (1, 3, 4):
+			raise MalformedImageException(f"Unsupported PNG filter type {filter_type}.")
+
+		# For Sub, Average and Paeth, all output bytes before the first non-zero
+		# byte of either the current or the previous row are zero. This skips
+		# most of the transparent background of rendered images.
+		start = min(cls._leading_zero_count(raw), cls._leading_zero_count(prev) if (filter_type != 1) else len(raw))
+		start -= start % bpp
+		if start == len(raw):
+			return bytes(raw)
+
+		if filter_type == 1:
+			# Sub
+			if numpy is not None:
+				return numpy.cumsum(numpy.frombuffer(raw, dtype = numpy.uint8).reshape(-1, bpp), axis = 0, dtype = numpy.uint8).tobytes()
+			row = bytearray(raw)
+			for i in range(max(start, bpp), len(row)):
+				row[i] = (row[i] + row[i - bpp]) & 0xff
+			return bytes(row)
+		elif filter_type == 3:
+			# Average
+			row = bytearray(raw)
+			for i in range(start, len(row)):
+				left = row[i - bpp] if (i >= bpp) else 0
+				row[i] = (row[i] + ((left + prev[i]) >> 1)) & 0xff
+			return bytes(row)
+		else:
+			row = bytearray(raw)
+			cls._paeth_unfilter(row, prev, bpp, start)
+			return bytes(row)
+
+	@classmethod
+	def png_chunks(cls, data: bytes):
+		# Yields (chunk type, chunk data) tuples up to the IEND chunk
+		if not data.startswith(cls._PNG_SIGNATURE):
+			raise MalformedImageException("Not a PNG image.")
+		offset = len(cls._PNG_SIGNATURE)
+		while offset + 8 <= len(data):
+			(length, chunk_type) = struct.unpack_from(">L4s", data, offset)
+			yield (chunk_type, data[offset + 8 : offset + 8 + length])
+			offset += 12 + length
+			if chunk_type == b"IEND":
+				break
+
+	@classmethod
+	def from_png_data(cls, data: bytes):
+		header = None
+		idat = [ ]
+		for (chunk_type, chunk_data) in cls.png_chunks(data):
+			if chunk_type == b"IHDR":
+				header = struct.unpack(">LLBBBBB", chunk_data)
+			elif chunk_type == b"IDAT":
+				idat.append(chunk_data)
+		if header is None:
+			raise MalformedImageException("PNG image has no IHDR chunk.")
+
+		(width, height, bit_depth, color_type, compression, filter_method, interlace) = header
+		if (bit_depth != 8) or (color_type not in cls._CHANNELS_BY_COLOR_TYPE) or (interlace != 0):
+			raise MalformedImageException(f"Unsupported PNG format (bit depth {bit_depth}, color type {color_type}, interlace {interlace}).")
+		channels = cls._CHANNELS_BY_COLOR_TYPE[color_type]
+		stride = width * channels
+		try:
+			raw_data = zlib.decompress(b"".join(idat))
+		except zlib.error as e:
+			raise MalformedImageException(f"PNG image data is corrupt: {str(e)}") from e
+		if len(raw_data) != (stride + 1) * height:
+			raise MalformedImageException(f"PNG image data has unexpected length {len(raw_data)} for {width} x {height} pixels.")
+
+		rows = [ ]
+		prev = bytes(stride)
+		for y in range(height):
+			row_offset = y * (stride + 1)
+			prev = cls._unfilter_row(raw_data[row_offset], raw_data[row_offset + 1 : row_offset + 1 + stride], prev, channels)
+			rows.append(prev)
+		return cls(width, height, channels, rows)
+
+	@classmethod
+	def from_png_file(cls, filename):
+		with open(filename, "rb") as f:
+			return cls.from_png_data(f.read())
+
+	def _alpha_of_row(self, row):
+		if self._channels == 4:
+			return row[3::4]
+		else:
+			return row[1::2]
+
+	def alpha_bounding_box(self, x = 0, y = 0, width = None, height = None):
+		# Returns the (x0, y0, x1, y1) bounding box (x1 and y1 exclusive) of
+		# all non-transparent pixels within the given region or None if the
+		# region is entirely transparent.
+		width = (self._width - x) if (width is None) else width
+		height = (self._height - y) if (height is None) else height
+		if not self.has_alpha:
+			return (x, y, x + width, y + height) if ((width > 0) and (height > 0)) else None
+		(x0, y0, x1, y1) = (None, None, None, None)
+		for row_y in range(y, y + height):
+			alpha = self._alpha_of_row(self._rows[row_y])[x : x + width]
+			stripped = alpha.lstrip(b"\x00")
+			if len(stripped) == 0:
+				continue
+			left = x + len(alpha) - len(stripped)
+			right = x + len(stripped.rstrip(b"\x00")) + (left - x)
+			if y0 is None:
+				(x0, y0, x1) = (left, row_y, right)
+			else:
+				(x0, x1) = (min(x0, left), max(x1, right))
+			y1 = row_y + 1
+		if y0 is None:
+			return None
+		return (x0, y0, x1, y1)
+
+	def crop(self, x, y, width, height):
+		assert((x >= 0) and (y >= 0) and (x + width <= self._width) and (y + height <= self._height))
+		(begin, end) = (x * self._channels, (x + width) * self._channels)
+		return RasterImage(width, height, self._channels, [ row[begin : end] for row in self._rows[y : y + height] ])
+
+	def trim(self):
+		bbox = self.alpha_bounding_box()
+		if bbox is None:
+			raise MalformedImageException("Cannot trim an entirely transparent image.")
+		(x0, y0, x1, y1) = bbox
+		return self.crop(x0, y0, x1 - x0, y1 - y0)
+
+	@staticmethod
+	def _png_chunk(chunk_type, data):
+		return struct.pack(">L", len(data)) + chunk_type + data + struct.pack(">L", zlib.crc32(chunk_type + data))
+
+	def to_png_data(self, compression_level = 9):
+		header = struct.pack(">LLBBBBB", self._width, self._height, 8, self._COLOR_TYPE_BY_CHANNELS[self._channels], 0, 0, 0)
+		raw_data = b"".join(b"\x00" + row for row in self._rows)
+		return self._PNG_SIGNATURE + self._png_chunk(b"IHDR", header) + self._png_chunk(b"IDAT", zlib.compress(raw_data, compression_level)) + self._png_chunk(b"IEND", b"")
+
+	@property
+	def opaque(self):
+		if not self.has_alpha:
+			return True
+		opaque_alpha = b"\xff" * self._width
+		return all(self._alpha_of_row(row) == opaque_alpha for row in self._rows)
+
+	@property
+	def grayscale(self):
+		if self._channels < 3:
+			return True
+		return all(row[0::self._channels] == row[1::self._channels] == row[2::self._channels] for row in self._rows)
+
+	def reduce_channels(self):
+		# Drops the alpha channel of opaque images and the color channels of
+		# gray images, neither of which changes any pixel
+		channel_indices = ([ 0 ] if self.grayscale else [ 0, 1, 2 ]) + ([ ] if self.opaque else [ self._channels - 1 ])
+		if len(channel_indices) == self._channels:
+			return self
+		rows = [ ]
+		for row in self._rows:
+			reduced_row = bytearray(self._width * len(channel_indices))
+			for (target_index, source_index) in enumerate(channel_indices):
+				reduced_row[target_index :: len(channel_indices)] = row[source_index :: self._channels]
+			rows.append(bytes(reduced_row))
+		return RasterImage(self._width, self._height, len(channel_indices), rows)
+
+	def palette(self, max_colors = 256):
+		# Returns the distinct pixel values in order of their first occurrence
+		# or None if there are more than max_colors of them
+		colors = { }
+		seen_rows = set()
+		for row in self._rows:
+			if row in seen_rows:
+				continue
+			seen_rows.add(row)
+			for offset in range(0, len(row), self._channels):
+				pixel = row[offset : offset + self._channels]
+				if pixel not in colors:
+					if len(colors) == max_colors:
+						return None
+					colors[pixel] = len(colors)
+		return list(colors)
+
+	@staticmethod
+	def _bytewise_sub(x, y):
+		# Bytewise subtraction without borrow, done on the whole row at once
+		high = int.from_bytes(b"\x80" * len(x), "big")
+		mask = (1 << (8 * len(x))) - 1
+		(a, b) = (int.from_bytes(x, "big"), int.from_bytes(y, "big"))
+		result = ((a | high) - (b & ~high & mask)) ^ ((a ^ ~b) & high)
+		return (result & mask).to_bytes(len(x), "big")
+
+	@classmethod
+	def _filter_rows(cls, rows, bpp):
+		# Chooses between the None, Sub and Up filter for every row; the row
+		# whose filtered data compresses best on its own is taken
+		filtered_rows = [ ]
+		prev = bytes(len(rows[0])) if (len(rows) > 0) else b""
+		for row in rows:
+			candidates = [ b"\x00" + row, b"\x01" + cls._bytewise_sub(row, bytes(bpp) + row[:-bpp]), b"\x02" + cls._bytewise_sub(row, prev) ]
+			filtered_rows.append(min(candidates, key = lambda candidate: len(zlib.compress(candidate, 1))))
+			prev = row
+		return b"".join(filtered_rows)
+
+	@staticmethod
+	def _compress(raw_data):
+		compressed = [ ]
+		for strategy in (zlib.Z_DEFAULT_STRATEGY, zlib.Z_FILTERED):
+			compressor = zlib.compressobj(9, zlib.DEFLATED, 15, 9, strategy)
+			compressed.append(compressor.compress(raw_data) + compressor.flush())
+		return min(compressed, key = len)
+
+	def _to_indexed_png_data(self, palette):
+		# Transparent palette entries come first so that the tRNS chunk does
+		# not need to list the opaque ones
+		if self.has_alpha:
+			palette = sorted(palette, key = lambda pixel: pixel[-1] == 255)
+		color_index = { pixel: index for (index, pixel) in enumerate(palette) }
+		bit_depth = next(bit_depth for bit_depth in (1, 2, 4, 8) if len(palette) <= (1 << bit_depth))
+		pixels_per_byte = 8 // bit_depth
+
+		# Rendered images often contain many identical rows
+		indexed_rows = { }
+		for row in set(self._rows):
+			indices = bytes(map(color_index.__getitem__, (row[offset : offset + self._channels] for offset in range(0, len(row), self._channels))))
+			if bit_depth < 8:
+				packed_row = bytearray()
+				for offset in range(0, len(indices), pixels_per_byte):
+					value = 0
+					for index in indices[offset : offset + pixels_per_byte]:
+						value = (value << bit_depth) | index
+					packed_row.append(value << (bit_depth * (pixels_per_byte - len(indices[offset : offset + pixels_per_byte]))))
+				indices = bytes(packed_row)
+			indexed_rows[row] = indices
+		rows = [ indexed_rows[row] for row in self._rows ]
+
+		header = struct.pack(">LLBBBBB", self._width, self._height, bit_depth, 3, 0, 0, 0)
+		plte = b"".join((pixel[:3] if (self._channels >= 3) else (pixel[:1] * 3)) for pixel in palette)
+		trns = bytes(pixel[-1] for pixel in palette if pixel[-1] != 255) if self.has_alpha else b""
+		raw_data = b"".join(b"\x00" + row for row in rows)
+		chunks = [ (b"IHDR", header), (b"PLTE", plte) ] + ([ (b"tRNS", trns) ] if (len(trns) > 0) else [ ]) + [ (b"IDAT", self._compress(raw_data)), (b"IEND", b"") ]
+		return self._PNG_SIGNATURE + b"".join(self._png_chunk(chunk_type, data) for (chunk_type, data) in chunks)
+
+	def to_optimized_png_data(self):
+		# Smallest lossless encoding without any ancillary chunks: removes
+		# unneeded channels, tries a palette and chooses row filters
+		image = self.reduce_channels()
+		header = struct.pack(">LLBBBBB", image.width, image.height, 8, self._COLOR_TYPE_BY_CHANNELS[image.channels], 0, 0, 0)
+		encodings = [ self._PNG_SIGNATURE + self._png_chunk(b"IHDR", header) + self._png_chunk(b"IDAT", self._compress(self._filter_rows(image.rows, image.channels))) + self._png_chunk(b"IEND", b"") ]
+		palette = image.palette()
+		if palette is not None:
+			encodings.append(image._to_indexed_png_data(palette))
+		return min(encodings, key = len)
+
@@ -0,0 +1,95 @@
+#	pyradium - HTML presentation/slide show generator
+#	Copyright (C) 2026-2026 Johannes Bauer
+#
+#	This file is part of pyradium.
+#
+#	pyradium is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	pyradium is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with pyradium; if not, write to the Free Software
+#	Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+
+import logging
+import collections
+import concurrent.futures
+from .RendererCache import RendererCache
+from .Exceptions import PyRadiumException
+
+_log = logging.getLogger(__spec__.name)
+
+class RenderPool():
+	def __init__(self, renderer, max_workers):
+		self._renderer = renderer
+		self._max_workers = max_workers
+
+	def _cache_misses(self, jobs):
+		misses = { }
+		for (renderer_name, property_dict) in jobs:
+			if not property_dict.get("cache", True):
+				continue
+			renderer = self._renderer.get_custom_renderer(renderer_name)
+			if not isinstance(renderer, RendererCache):
+				continue
+			try:
+				keyhash = renderer.keyhash(property_dict)
+			except (PyRadiumException, OSError) as e:
+				_log.trace("Cannot compute cache key for %s job: [%s] %s", renderer_name, e.__class__.__name__, str(e))
+				continue
+			if ((renderer_name, keyhash) not in misses) and (not renderer.is_cached(keyhash)):
+				misses[(renderer_name, keyhash)] = (renderer, property_dict)
+		return list(misses.values())
+
+	def _render(self, renderer, property_dict):
+		try:
+			renderer.render(property_dict)
+			return True
+		except Exception as e:
+			# Ignore the failure here, the slide pass will run into the same
+			# problem again and report it in its proper context.
+			_log.debug("Prerendering of %s object failed: [%s] %s", renderer.name, e.__class__.__name__, str(e))
+			return False
+
+	def _render_batch(self, renderer, property_dicts):
+		try:
+			results = renderer.render_batch(property_dicts)
+		except Exception as e:
+			_log.debug("Prerendering of batch of %d %s objects failed: [%s] %s", len(property_dicts), renderer.name, e.__class__.__name__, str(e))
+			return [ False ] * len(property_dicts)
+		return [ result is not None for result in results ]
+
+	def _work_items(self, misses):
+		# Objects of batchable renderers are grouped into one batch per worker,
+		# all others are rendered one by one
+		work_items = [ ]
+		batches = collections.defaultdict(list)
+		for (renderer, property_dict) in misses:
+			if renderer.batchable:
+				batches[renderer].append(property_dict)
+			else:
+				work_items.append(lambda renderer = renderer, property_dict = property_dict: [ self._render(renderer, property_dict) ])
+		for (renderer, property_dicts) in batches.items():
+			batch_size = (len(property_dicts) + self._max_workers - 1) // self._max_workers
+			for offset in range(0, len(property_dicts), batch_size):
+				work_items.append(lambda renderer = renderer, property_dicts = property_dicts[offset : offset + batch_size]: self._render_batch(renderer, property_dicts))
+		return work_items
+
+	def prerender(self, jobs):
+		misses = self._cache_misses(jobs)
+		if len(misses) == 0:
+			_log.debug("All %d renderer jobs are already cached.", len(jobs))
+			return
+		work_items = self._work_items(misses)
+		_log.debug("Prerendering %d of %d renderer jobs in %d work items using %d workers.", len(misses), len(jobs), len(work_items), self._max_workers)
+		with concurrent.futures.ThreadPoolExecutor(max_workers = self._max_workers) as executor:
+			results = [ result for work_item_results in executor.map(lambda work_item: work_item(), work_items) for result in work_item_results ]
+		_log.debug("Prerendered %d objects, %d failed.", results.count(True), results.count(False))
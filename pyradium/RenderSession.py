@@ -0,0 +1,153 @@
+#	pyradium - HTML presentation/slide show generator
+#	Copyright (C) 2026-2026 Johannes Bauer
+#
+#	This file is part of pyradium.
+#
+#	pyradium is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	pyradium is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with pyradium; if not, write to the Free Software
+#	Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+
+import os
+import logging
+from .Presentation import Presentation
+from .IncludeCache import IncludeCache
+from .Renderer import Renderer
+from .renderer import BaseRenderer
+from .Slide import RenderSlideDirective
+
+_log = logging.getLogger(__spec__.name)
+
+class RenderSession():
+	# Keeps a rendered presentation around between renders (e.g., in the
+	# re-render loop) so that after a change only the affected slides need to
+	# be rendered again. Whenever a change could affect other slides (TOC,
+	# slide numbering, timing, metadata, templates), the whole presentation
+	# is rendered from scratch.
+	def __init__(self, infile, rendering_parameters, deploy_directory, resource_directory = None):
+		self._infile = infile
+		self._rendering_parameters = rendering_parameters
+		self._deploy_directory = deploy_directory
+		self._resource_directory = resource_directory
+		self._renderer = None
+		self._rendered_presentation = None
+		self._last_render_incremental = False
+		self._presentation_fingerprint = None
+		self._fingerprints = None
+		self._layout_fingerprints = None
+		self._dependencies = None
+		self._directive_dependencies = None
+		self._templates = None
+		self._include_cache = IncludeCache()
+
+	@property
+	def renderer(self):
+		return self._renderer
+
+	@property
+	def rendered_presentation(self):
+		return self._rendered_presentation
+
+	@property
+	def last_render_incremental(self):
+		return self._last_render_incremental
+
+	@staticmethod
+	def _file_signature(filename):
+		try:
+			statres = os.stat(filename)
+		except FileNotFoundError:
+			return None
+		return (statres.st_mtime_ns, statres.st_size)
+
+	def _template_signatures(self):
+		signatures = { }
+		for template_dir in self._rendering_parameters.template_dirs:
+			for (dirname, subdirs, filenames) in os.walk(template_dir):
+				for filename in filenames:
+					full_filename = dirname + "/" + filename
+					signatures[full_filename] = self._file_signature(full_filename)
+		return signatures
+
+	def _remember(self, presentation, template_signatures):
+		self._presentation_fingerprint = presentation.fingerprint
+		self._fingerprints = [ directive.fingerprint for directive in presentation ]
+		self._layout_fingerprints = [ directive.layout_fingerprint for directive in presentation ]
+		self._directive_dependencies = [ frozenset(os.path.realpath(filename) for filename in directive_record.dependencies) for directive_record in self._renderer.directive_records ]
+		self._dependencies = { }
+		for dependencies in self._directive_dependencies:
+			for filename in dependencies:
+				self._dependencies[filename] = self._file_signature(filename)
+		self._templates = template_signatures
+
+	def _changed_directives(self, presentation, template_signatures, changed_paths):
+		# Returns the indices of all directives that need to be re-rendered or
+		# None if the whole presentation needs to be rendered again
+		if template_signatures != self._templates:
+			_log.debug("Template files changed, rendering everything.")
+			return None
+		if presentation.fingerprint != self._presentation_fingerprint:
+			_log.debug("Presentation metadata or variables changed, rendering everything.")
+			return None
+		layout_fingerprints = [ directive.layout_fingerprint for directive in presentation ]
+		if layout_fingerprints != self._layout_fingerprints:
+			_log.debug("Presentation structure changed, rendering everything.")
+			return None
+
+		changed_files = set(filename for (filename, signature) in self._dependencies.items() if self._file_signature(filename) != signature)
+		if changed_paths is not None:
+			changed_files |= set(os.path.realpath(path) for path in changed_paths)
+		changed_indices = [ ]
+		for (index, (directive, fingerprint, dependencies)) in enumerate(zip(presentation, self._fingerprints, self._directive_dependencies)):
+			if (directive.fingerprint != fingerprint) or (not dependencies.isdisjoint(changed_files)):
+				if not isinstance(directive, RenderSlideDirective):
+					_log.debug("Non-slide directive %s changed, rendering everything.", str(directive))
+					return None
+				changed_indices.append(index)
+		return changed_indices
+
+	def _render_incrementally(self, presentation, template_signatures, changed_paths):
+		changed_indices = self._changed_directives(presentation, template_signatures, changed_paths)
+		if changed_indices is None:
+			return False
+		rendered_presentation = self._rendered_presentation
+
+		# Should re-rendering fail, the previous state is unusable
+		self._rendered_presentation = None
+		if not self._renderer.rerender(rendered_presentation, presentation, changed_indices):
+			return False
+		_log.debug("Incrementally re-rendered %d of %d directives.", len(changed_indices), len(self._fingerprints))
+		self._rendered_presentation = rendered_presentation
+		return True
+
+	def render(self, changed_paths = None):
+		# changed_paths optionally gives the files known to have changed since
+		# the last render, in addition to what is detected by their mtime
+		template_signatures = self._template_signatures()
+		(include_hits, include_misses) = (self._include_cache.hits, self._include_cache.misses)
+		presentation = Presentation.load_from_file(self._infile, self._rendering_parameters, include_cache = self._include_cache)
+		if self._include_cache.hits > include_hits:
+			_log.debug("Reused %d unchanged include files, parsed %d.", self._include_cache.hits - include_hits, self._include_cache.misses - include_misses)
+		try:
+			self._last_render_incremental = (self._rendered_presentation is not None) and self._render_incrementally(presentation, template_signatures, changed_paths)
+			if not self._last_render_incremental:
+				self._rendered_presentation = None
+				self._renderer = Renderer(presentation, self._rendering_parameters)
+				self._rendered_presentation = self._renderer.render(deploy_directory = self._deploy_directory, resource_directory = self._resource_directory)
+		finally:
+			# Helper processes of renderers only live for one render
+			for renderer in BaseRenderer.instances():
+				renderer.close()
+		self._remember(presentation, template_signatures)
+		return self._rendered_presentation
@@ -19,8 +19,6 @@
 #
 #	Johannes Bauer <JohannesBauer@gmx.de>
 
-from .Tools import XMLTools
-
 class RenderableSlide():
 	def __init__(self, slide_type, content_containers, slide_vars):
 		self._slide_type = slide_type
@@ -37,7 +35,10 @@ class RenderableSlide():
 	def has(self, name):
 		return name in self._slide_vars
 
+	def replace_vars(self, **slide_vars):
+		return RenderableSlide(slide_type = self._slide_type, content_containers = self._content_containers, slide_vars = dict(self._slide_vars, **slide_vars))
+
 	def content(self, key = None):
 		if key is None:
 			key = "default"
-		return XMLTools.inner_toxml(self._content_containers.get(key))
+		return self._content_containers.get(key).inner_toxml()
@@ -20,19 +20,28 @@
 #	Johannes Bauer <JohannesBauer@gmx.de>
 
 import os
-import shutil
+import tempfile
 import contextlib
+import collections
 from .GenericTOC import GenericTOC
 from .OrderedSet import OrderedSet
 from .Schedule import PresentationSchedule, TimeSpecification
 from .Enums import PresentationFeature
+from .BlobStore import BlobStore
+from .RendererCache import RendererCache
+from .Tools import FileTools
 
 class RenderedPresentation():
+	RenderState = collections.namedtuple("RenderState", [ "slide_number", "uid", "toc_index" ])
+	_SLIDE_MARKERS = ("\0pyradium_slide_0\0", "\0pyradium_slide_1\0")
+
 	def __init__(self, renderer, deploy_directory, resource_directory):
 		self._renderer = renderer
 		self._deploy_directory = deploy_directory
 		self._resource_directory = resource_directory
 		self._rendered_slides = [ ]
+		self._slide_stream = None
+		self._streamed_slide_lengths = [ ]
 		self._css = { }
 		self._js = OrderedSet()
 		self._toc = GenericTOC()
@@ -42,7 +51,13 @@ class RenderedPresentation():
 		self._total_slide_count = 0
 		self._uid = 0
 		self._features = set()
+		self._layout_only = False
 		self._markers = { }
+		self._output_statistics = collections.Counter()
+		if self._renderer.rendering_params.link_cached_assets:
+			self._blob_store = BlobStore(RendererCache.default_directory() + "blobs/")
+		else:
+			self._blob_store = None
 
 		time_range = self._renderer.presentation.meta.get("presentation-time")
 		if time_range is None:
@@ -67,6 +82,14 @@ class RenderedPresentation():
 	def total_slide_count(self):
 		return self._total_slide_count
 
+	def image_loading(self, slide_number = None):
+		# Value of the "loading" attribute of images on the given (by default,
+		# the current) slide; images that are visible right after opening the
+		# presentation should not wait for layout to determine they're needed
+		if slide_number is None:
+			slide_number = self._current_slide_number
+		return "eager" if (slide_number <= self._renderer.rendering_params.eager_image_slides) else "lazy"
+
 	def advance_slide(self):
 		self._current_slide_number += 1
 		self._total_slide_count = max(self._total_slide_count, self._current_slide_number)
@@ -74,6 +97,17 @@ class RenderedPresentation():
 		if self.schedule is not None:
 			self.schedule.have_slide(self.current_slide_number)
 
+	@property
+	def state(self):
+		toc_index = self._frozen_toc.current_index if (self._frozen_toc is not None) else None
+		return self.RenderState(slide_number = self._current_slide_number, uid = self._uid, toc_index = toc_index)
+
+	def restore_state(self, state):
+		self._current_slide_number = state.slide_number
+		self._uid = state.uid
+		if self._frozen_toc is not None:
+			self._frozen_toc.seek(state.toc_index)
+
 	def finalize_toc(self):
 		self._frozen_toc = self._toc.finalize()
 		self._toc = GenericTOC()
@@ -83,8 +117,27 @@ class RenderedPresentation():
 	def renderer(self):
 		return self._renderer
 
+	@property
+	def layout_only(self):
+		# In layout passes, only the slide count, TOC, features and schedule
+		# are determined but no slide content is produced
+		return self._layout_only
+
+	@layout_only.setter
+	def layout_only(self, value: bool):
+		self._layout_only = value
+
+	@property
+	def streams_slides(self):
+		return self._renderer.rendering_params.stream_index
+
 	@property
 	def rendered_slides(self):
+		if self.streams_slides:
+			# Markers in place of the first two slides; the index file is
+			# split at them and the streamed slides are inserted by
+			# add_streamed_slides_file()
+			return iter(self._SLIDE_MARKERS[ : len(self._streamed_slide_lengths)])
 		return iter(self._rendered_slides)
 
 	@property
@@ -138,35 +191,128 @@ class RenderedPresentation():
 		return self._markers
 
 	def append_slide(self, rendered_slide):
-		self._rendered_slides.append(rendered_slide)
+		if self.streams_slides:
+			rendered_slide = rendered_slide.encode("utf-8")
+			self._slide_stream.write(rendered_slide)
+			self._streamed_slide_lengths.append(len(rendered_slide))
+		else:
+			self._rendered_slides.append(rendered_slide)
+
+	def reset_slides(self):
+		self._rendered_slides = [ ]
+		if self.streams_slides:
+			# Slides are kept in an anonymous file on the same file system as
+			# the output (instead of, e.g., a memory-backed /tmp)
+			self.close_slide_stream()
+			os.makedirs(self._deploy_directory, exist_ok = True)
+			self._slide_stream = tempfile.TemporaryFile(dir = self._deploy_directory)
+			self._streamed_slide_lengths = [ ]
+
+	def close_slide_stream(self):
+		if self._slide_stream is not None:
+			self._slide_stream.close()
+			self._slide_stream = None
+
+	@property
+	def output_statistics(self):
+		return self._output_statistics
 
-	def add_file(self, destination_relpath, content, target_directory = "/", to_deployment_dir = False):
+	def _output_filename(self, relpath, to_deployment_dir = False):
+		directory = self._deploy_directory if to_deployment_dir else self._resource_directory
+		filename = directory + relpath
+		with contextlib.suppress(FileExistsError):
+			os.makedirs(os.path.dirname(filename))
+		return filename
+
+	def _link_from_blob_store(self, filename, content):
+		blob_filename = self._blob_store.filename(BlobStore.hash_data(content))
+		if not os.path.isfile(blob_filename):
+			return False
+		with contextlib.suppress(FileNotFoundError):
+			if os.path.samefile(blob_filename, filename):
+				self._output_statistics["unchanged"] += 1
+				return True
+		try:
+			FileTools.link_replace(blob_filename, filename)
+		except OSError:
+			# E.g., cache and output directory reside on different file systems
+			return False
+		self._output_statistics["linked"] += 1
+		return True
+
+	def _optimize_png(self, content):
+		optimized_content = self._renderer.get_custom_renderer("pngopt").render({ "png_data": content }).data["png_data"]
+		self._output_statistics["optimized_pngs"] += 1
+		self._output_statistics["optimized_png_original_bytes"] += len(content)
+		self._output_statistics["optimized_png_bytes"] += len(optimized_content)
+		return optimized_content
+
+	def add_file(self, destination_relpath, content, target_directory = "/", to_deployment_dir = False, overwrite = False):
 		assert(target_directory.startswith("/"))
 		assert(target_directory.endswith("/"))
-		if destination_relpath in self._added_files:
+		if (not overwrite) and (destination_relpath in self._added_files):
 			return
 		self._added_files.add(destination_relpath)
-		directory = self._deploy_directory if to_deployment_dir else self._resource_directory
-		filename = directory + target_directory + destination_relpath
-		dirname = os.path.dirname(filename)
-		with contextlib.suppress(FileExistsError):
-			os.makedirs(dirname)
-		with open(filename, "w" if isinstance(content, str) else "wb") as f:
-			f.write(content)
+		filename = self._output_filename(target_directory + destination_relpath, to_deployment_dir = to_deployment_dir)
+		if isinstance(content, str):
+			content = content.encode("utf-8")
+		else:
+			if self._renderer.rendering_params.optimize_png and destination_relpath.endswith(".png"):
+				content = self._optimize_png(content)
+			if (self._blob_store is not None) and self._link_from_blob_store(filename, content):
+				return
+		if FileTools.write_if_changed(filename, content):
+			self._output_statistics["written"] += 1
+		else:
+			self._output_statistics["unchanged"] += 1
+
+	def add_streamed_slides_file(self, destination_relpath, content, target_directory = "/", to_deployment_dir = False):
+		# Writes a file that was rendered with the markers of rendered_slides
+		# in place of the slides, inserting the streamed slides one at a time
+		assert(target_directory.startswith("/"))
+		assert(target_directory.endswith("/"))
+		self._added_files.add(destination_relpath)
+		filename = self._output_filename(target_directory + destination_relpath, to_deployment_dir = to_deployment_dir)
+		content = content.encode("utf-8")
+		(header, separator, footer) = (content, b"", b"")
+		if len(self._streamed_slide_lengths) >= 1:
+			(header, footer) = content.split(self._SLIDE_MARKERS[0].encode("utf-8"))
+		if len(self._streamed_slide_lengths) >= 2:
+			(separator, footer) = footer.split(self._SLIDE_MARKERS[1].encode("utf-8"))
+
+		tmp_filename = FileTools.base_random_file_on(filename)
+		with open(tmp_filename, "wb") as f:
+			f.write(header)
+			self._slide_stream.seek(0)
+			for (slide_index, slide_length) in enumerate(self._streamed_slide_lengths):
+				if slide_index > 0:
+					f.write(separator)
+				f.write(self._slide_stream.read(slide_length))
+			f.write(footer)
+		if FileTools.replace_if_changed(tmp_filename, filename):
+			self._output_statistics["written"] += 1
+		else:
+			self._output_statistics["unchanged"] += 1
 
 	def copy_file(self, rel_filename, target_directory = "/"):
 		if rel_filename in self._added_files:
 			return
+		self._added_files.add(rel_filename)
 		source_filename = self.renderer.lookup_template_file(rel_filename)
-		with open(source_filename, "rb") as f:
-			self.add_file(rel_filename, f.read(), target_directory)
+		if FileTools.copy_if_changed(source_filename, self._output_filename(target_directory + rel_filename)):
+			self._output_statistics["written"] += 1
+		else:
+			self._output_statistics["unchanged"] += 1
 
 	def copy_abs_file(self, src_abs_filename, dest_rel_filename):
 		dest_filename = f"{self._deploy_directory}/{dest_rel_filename}"
 		dest_directory = os.path.dirname(dest_filename)
 		with contextlib.suppress(FileExistsError):
 			os.makedirs(dest_directory)
-		shutil.copy(src_abs_filename, dest_filename)
+		if FileTools.copy_if_changed(src_abs_filename, dest_filename):
+			self._output_statistics["written"] += 1
+		else:
+			self._output_statistics["unchanged"] += 1
 
 	def handle_dependencies(self, dependencies):
 		if dependencies is None:
@@ -19,18 +19,25 @@
 #
 #	Johannes Bauer <JohannesBauer@gmx.de>
 
+import os
 import json
 import logging
+import contextlib
+import collections
 import mako.lookup
 import mako.exceptions
 import markupsafe
 import pyradium
 from pyradium.Controller import ControllerManager
 from pyradium.renderer import BaseRenderer
+from pyradium.xmlhooks.XMLHookRegistry import XMLHookRegistry
 from .Acronyms import Acronyms
 from .RenderedPresentation import RenderedPresentation
 from .Exceptions import TemplateErrorException, MalformedStyleConfigurationException, UnknownSlideTypeException
 from .Slide import RenderSlideDirective
+from .RenderPool import RenderPool
+from .TemplatePool import TemplatePool
+from .TemplateModuleCache import TemplateModuleCache
 from .Enums import PresentationFeature
 from .Tools import JSONTools
 from .StyleParameters import StyleParameters
@@ -49,16 +56,27 @@ class CustomRenderers():
 		return BaseRenderer.instanciate(name)
 
 class Renderer():
+	DirectiveRecord = collections.namedtuple("DirectiveRecord", [ "begin_state", "end_state", "rendered_slides", "dependencies" ])
+	_LOOKUP_OPTIONS = {
+		"strict_undefined":		True,
+		"input_encoding":		"utf-8",
+		"default_filters":		[ "h" ],
+	}
+
 	def __init__(self, presentation, rendering_params):
 		self._rendered_slides = [ ]
+		self._directive_records = None
+		self._included_files = [ ]
 		self._presentation = presentation
 		self._rendering_params = rendering_params
 		self._custom_renderers = CustomRenderers()
-		self._lookup = mako.lookup.TemplateLookup(list(self._get_mako_lookup_directories()), strict_undefined = True, input_encoding = "utf-8", default_filters = [ "h" ])
+		self._template_module_cache = TemplateModuleCache(self._LOOKUP_OPTIONS)
+		self._lookup = mako.lookup.TemplateLookup(list(self._get_mako_lookup_directories()), modulename_callable = self._template_module_cache.modulename_callable, **self._LOOKUP_OPTIONS)
 		self._template_config_filename = self.lookup_styled_template_file("configuration.json")
 		with open(self._template_config_filename) as f:
 			self._template_config = json.load(f)
 		self._plausibilize_template_config()
+		self._template_module_cache.warmup(self._lookup, self._get_template_uris())
 		self._ctrlr_mgr = ControllerManager(self)
 		self._style_parameters = self._parse_style_parameters()
 
@@ -80,6 +98,32 @@ class Renderer():
 	def presentation(self):
 		return self._presentation
 
+	@property
+	def directive_records(self):
+		return self._directive_records
+
+	@classmethod
+	def _get_rendered_css_uris(cls, config):
+		if isinstance(config, dict):
+			if config.get("render") and ("name" in config):
+				yield config["name"]
+			for value in config.values():
+				yield from cls._get_rendered_css_uris(value)
+		elif isinstance(config, list):
+			for value in config:
+				yield from cls._get_rendered_css_uris(value)
+
+	def _get_template_uris(self):
+		# All templates that rendering with the current style might need: the
+		# slide templates of the style, the base templates and the CSS files
+		# which are rendered through Mako
+		uris = set(self._get_rendered_css_uris(self._template_config))
+		for dirname in self._rendering_params.template_dirs:
+			for (subdirectory, uri_prefix) in ((self._rendering_params.template_style, ""), ("base", "base/")):
+				with contextlib.suppress(FileNotFoundError, NotADirectoryError):
+					uris |= set(uri_prefix + filename for filename in os.listdir(dirname + "/" + subdirectory) if filename.endswith(".html"))
+		return uris
+
 	def _get_mako_lookup_directories(self):
 		for dirname in self._rendering_params.template_dirs:
 			yield dirname
@@ -107,7 +151,9 @@ class Renderer():
 		return self._rendering_params.template_dirs.lookup(self._rendering_params.template_style + "/" + filename)
 
 	def lookup_include(self, filename):
-		return self._rendering_params.include_dirs.lookup(filename)
+		included_file = self._rendering_params.include_dirs.lookup(filename)
+		self._included_files.append(included_file)
+		return included_file
 
 	def _determine_slide_types(self):
 		slide_types = set()
@@ -116,13 +162,25 @@ class Renderer():
 				slide_types.add(directive.slide_type)
 		return slide_types
 
-	def _compute_renderable_slides(self, rendered_presentation):
-		renderable_slides = [ ]
+	def _collect_renderer_jobs(self, rendered_presentation):
+		jobs = [ ]
 		for directive in self._presentation:
-			generator = directive.render(rendered_presentation)
-			if generator is not None:
-				renderable_slides += generator
-		return renderable_slides
+			if isinstance(directive, RenderSlideDirective):
+				jobs += XMLHookRegistry.collect_renderer_jobs(rendered_presentation, directive.xmlnode)
+		return jobs
+
+	def _compute_layout(self, rendered_presentation):
+		# Included files are recorded to determine the dependencies of the
+		# final pass; the layout passes only need to start from scratch
+		self._included_files = [ ]
+		rendered_presentation.layout_only = True
+		try:
+			for directive in self._presentation:
+				generator = directive.render(rendered_presentation)
+				if generator is not None:
+					collections.deque(generator, maxlen = 0)
+		finally:
+			rendered_presentation.layout_only = False
 
 	def render_file(self, template_filename, rendered_presentation = None, additional_template_args = None):
 		def _template_error(text):
@@ -153,6 +211,129 @@ class Renderer():
 		result = template.render(**template_args)
 		return result
 
+	def render_slide(self, rendered_presentation, renderable_slide):
+		additional_template_args = {
+			"slide":			renderable_slide,
+		}
+		template_filename = "slide_%s.html" % (renderable_slide.slide_type)
+		return self.render_file(template_filename, rendered_presentation = rendered_presentation, additional_template_args = additional_template_args)
+
+	def _render_final_directive(self, rendered_presentation, directive):
+		# Final pass of a single directive, recording everything that is
+		# needed to later re-render it in isolation
+		begin_state = rendered_presentation.state
+		included_file_count = len(self._included_files)
+		rendered_slides = [ ]
+		generator = directive.render(rendered_presentation)
+		if generator is not None:
+			for renderable_slide in generator:
+				rendered_slides.append(self.render_slide(rendered_presentation, renderable_slide))
+		if rendered_presentation.streams_slides:
+			# Streamed slides are not kept around and cannot be re-rendered
+			for rendered_slide in rendered_slides:
+				rendered_presentation.append_slide(rendered_slide)
+			rendered_slides = None
+		dependencies = frozenset(self._included_files[included_file_count : ])
+		return self.DirectiveRecord(begin_state = begin_state, end_state = rendered_presentation.state, rendered_slides = rendered_slides, dependencies = dependencies)
+
+	def _collect_final_directive(self, rendered_presentation, directive):
+		# Like _render_final_directive(), but instead of rendering the slide
+		# templates only collects the slides along with the state they were
+		# emitted in
+		begin_state = rendered_presentation.state
+		included_file_count = len(self._included_files)
+		slides = [ ]
+		generator = directive.render(rendered_presentation)
+		if generator is not None:
+			for renderable_slide in generator:
+				slides.append((renderable_slide, rendered_presentation.state))
+		dependencies = frozenset(self._included_files[included_file_count : ])
+		return self.DirectiveRecord(begin_state = begin_state, end_state = rendered_presentation.state, rendered_slides = slides, dependencies = dependencies)
+
+	def _render_final_pass_parallel(self, rendered_presentation):
+		# Final pass in which all directives are processed first and then the
+		# slide templates are rendered in parallel. Returns None if that is
+		# not possible, leaving the rendered presentation untouched.
+		initial_state = rendered_presentation.state
+		included_file_count = len(self._included_files)
+		collected_records = [ ]
+		for directive in self._presentation:
+			collected_record = self._collect_final_directive(rendered_presentation, directive)
+			if collected_record.end_state.uid != collected_record.begin_state.uid:
+				# Unique IDs need to be handed out in the order of a sequential
+				# final pass, which only works if slide templates are the
+				# only ones to request them
+				_log.debug("Directive %s requested unique IDs outside of slide templates, rendering slide templates sequentially.", str(directive))
+				rendered_presentation.restore_state(initial_state)
+				del self._included_files[included_file_count : ]
+				return None
+			collected_records.append(collected_record)
+
+		template_pool = TemplatePool(self, max_workers = self.rendering_params.template_jobs)
+		slides = [ slide for collected_record in collected_records for slide in collected_record.rendered_slides ]
+		results = iter(template_pool.render(rendered_presentation, slides) if (len(slides) > 0) else [ ])
+
+		directive_records = [ ]
+		uid = initial_state.uid
+		for collected_record in collected_records:
+			begin_state = collected_record.begin_state._replace(uid = uid)
+			rendered_presentation.restore_state(begin_state)
+			rendered_slides = [ template_pool.resolve_unique_ids(rendered_presentation, *next(results)) for _ in collected_record.rendered_slides ]
+			uid = rendered_presentation.state.uid
+			if rendered_presentation.streams_slides:
+				for rendered_slide in rendered_slides:
+					rendered_presentation.append_slide(rendered_slide)
+				rendered_slides = None
+			directive_records.append(collected_record._replace(begin_state = begin_state, end_state = collected_record.end_state._replace(uid = uid), rendered_slides = rendered_slides))
+		if len(directive_records) > 0:
+			rendered_presentation.restore_state(directive_records[-1].end_state)
+		return directive_records
+
+	def _finish_rendering(self, rendered_presentation):
+		if rendered_presentation.streams_slides:
+			# The slides have already been streamed during the final pass
+			rendered_index = self.render_file("base/index.html", rendered_presentation = rendered_presentation)
+			rendered_presentation.add_streamed_slides_file(self.rendering_params.index_filename, rendered_index, to_deployment_dir = True)
+			rendered_presentation.close_slide_stream()
+		else:
+			rendered_presentation.reset_slides()
+			for directive_record in self._directive_records:
+				for rendered_slide in directive_record.rendered_slides:
+					rendered_presentation.append_slide(rendered_slide)
+			rendered_index = self.render_file("base/index.html", rendered_presentation = rendered_presentation)
+			rendered_presentation.add_file(self.rendering_params.index_filename, rendered_index, to_deployment_dir = True, overwrite = True)
+
+	def rerender(self, rendered_presentation, presentation, changed_indices):
+		# Re-render only the given directives of an already fully rendered
+		# presentation whose layout is unchanged. Returns False if the
+		# re-rendered directives turn out to affect other slides, in which
+		# case a full render is necessary.
+		if rendered_presentation.streams_slides:
+			_log.debug("Slides are streamed and not retained, cannot re-render incrementally.")
+			return False
+		self._presentation = presentation
+		self._included_files = [ ]
+		rendered_presentation.output_statistics.clear()
+		features = set(rendered_presentation.features)
+		for index in changed_indices:
+			previous_record = self._directive_records[index]
+			rendered_presentation.restore_state(previous_record.begin_state)
+			directive_record = self._render_final_directive(rendered_presentation, presentation.content[index])
+			if (directive_record.end_state.slide_number != previous_record.end_state.slide_number) or (directive_record.end_state.toc_index != previous_record.end_state.toc_index):
+				_log.debug("Directive %d changed the slide numbering, cannot re-render incrementally.", index)
+				return False
+			if directive_record.end_state.uid > previous_record.end_state.uid:
+				_log.debug("Directive %d requires more unique IDs than before, cannot re-render incrementally.", index)
+				return False
+			self._directive_records[index] = directive_record._replace(end_state = previous_record.end_state)
+		if rendered_presentation.features != features:
+			_log.debug("Feature set changed, cannot re-render incrementally.")
+			return False
+		if len(self._directive_records) > 0:
+			rendered_presentation.restore_state(self._directive_records[-1].end_state)
+		self._finish_rendering(rendered_presentation)
+		return True
+
 	def render(self, deploy_directory, resource_directory = None):
 		if resource_directory is None:
 			resource_directory = deploy_directory
@@ -162,8 +343,13 @@ class Renderer():
 			rendered_presentation.add_feature(feature)
 		_log.trace("Initial feature set: %s", ", ".join(sorted(feature.name for feature in rendered_presentation.features)))
 
+		# Render all cacheable external objects (images, formulas, etc.) in
+		# parallel and, where the renderer supports it, in batches first. The
+		# slide passes then find them in the cache.
+		RenderPool(self, max_workers = self.rendering_params.render_jobs).prerender(self._collect_renderer_jobs(rendered_presentation))
+
 		# Run it first to build the initial TOC and determine feature set
-		self._compute_renderable_slides(rendered_presentation)
+		self._compute_layout(rendered_presentation)
 
 		_log.debug("Finalized feature set: %s", ", ".join(sorted(feature.name for feature in rendered_presentation.features)))
 
@@ -193,22 +379,20 @@ class Renderer():
 		# schedule for second run as well.
 		rendered_presentation.finalize_toc()
 		rendered_presentation.init_schedule()
-		self._compute_renderable_slides(rendered_presentation)
+		self._compute_layout(rendered_presentation)
 		rendered_presentation.finalize_toc()
 
 		# Compute the schedule before the last run
 		rendered_presentation.schedule.compute()
 
 		# Third and final slide run
-		for renderable_slide in self._compute_renderable_slides(rendered_presentation):
-			additional_template_args = {
-				"slide":			renderable_slide,
-			}
-			template_filename = "slide_%s.html" % (renderable_slide.slide_type)
-			rendered_slide = self.render_file(template_filename, rendered_presentation = rendered_presentation, additional_template_args = additional_template_args)
-			rendered_presentation.append_slide(rendered_slide)
-
-		rendered_index = self.render_file("base/index.html", rendered_presentation = rendered_presentation)
-		rendered_presentation.add_file(self.rendering_params.index_filename, rendered_index, to_deployment_dir = True)
+		rendered_presentation.reset_slides()
+		self._included_files = [ ]
+		self._directive_records = None
+		if (self.rendering_params.template_jobs > 1) and TemplatePool.available():
+			self._directive_records = self._render_final_pass_parallel(rendered_presentation)
+		if self._directive_records is None:
+			self._directive_records = [ self._render_final_directive(rendered_presentation, directive) for directive in self._presentation ]
+		self._finish_rendering(rendered_presentation)
 
 		return rendered_presentation
@@ -25,32 +25,104 @@ import hashlib
 import datetime
 import collections
 import json
-from .ExtendedJSONEncoder import ExtendedJSONEncoder
+import threading
+from .ExtendedJSONEncoder import ExtendedJSONEncoder, ExtendedJSONObjects
+from .BlobStore import BlobStore
+from .Tools import FileTools
 
 RenderedResult = collections.namedtuple("RenderedResult", [ "key", "keyhash", "from_cache", "data" ])
 
 class RendererCache():
-	def __init__(self, renderer):
+	_MIN_BLOB_SIZE = 4096
+
+	def __init__(self, renderer, cache_directory = None):
+		if cache_directory is None:
+			cache_directory = self.default_directory()
+		elif not cache_directory.endswith("/"):
+			cache_directory += "/"
 		self._renderer = renderer
-		self._directory = os.path.expanduser("~/.cache/pyradium/" + self._renderer.name + "/")
+		self._blob_store = BlobStore(cache_directory + "blobs/")
+		self._directory = cache_directory + self._renderer.name + "/"
+		self._statistics_lock = threading.Lock()
+		self._hits = 0
+		self._misses = 0
 		with contextlib.suppress(FileExistsError):
 			os.makedirs(self._directory)
 
+	@staticmethod
+	def default_directory():
+		return os.path.expanduser("~/.cache/pyradium/")
+
 	@staticmethod
 	def _hash_key(key):
 		binkey = ExtendedJSONEncoder.dumps(key, minify = True, sort_keys = True).encode("utf-8")
 		keyhash = hashlib.md5(binkey).hexdigest()
 		return keyhash
 
+	@property
+	def blob_store(self):
+		return self._blob_store
+
+	def _externalize_blobs(self, obj):
+		# Large binary objects are not stored inside the JSON document, but
+		# as raw files in the content-addressed blob store.
+		if isinstance(obj, bytes) and (len(obj) >= self._MIN_BLOB_SIZE):
+			return {
+				"__internal_object__":	ExtendedJSONObjects.BlobReference.value,
+				"blob":					self._blob_store.store(obj),
+				"length":				len(obj),
+			}
+		elif isinstance(obj, dict):
+			return { key: self._externalize_blobs(value) for (key, value) in obj.items() }
+		elif isinstance(obj, (list, tuple)):
+			return [ self._externalize_blobs(value) for value in obj ]
+		else:
+			return obj
+
+	def _resolve_blobs(self, obj):
+		if isinstance(obj, dict):
+			if obj.get("__internal_object__") == ExtendedJSONObjects.BlobReference.value:
+				data = self._blob_store.load(obj["blob"])
+				if (data is None) or (len(data) != obj["length"]):
+					raise FileNotFoundError(f"Blob {obj['blob']} referenced in cache entry is missing or truncated.")
+				return data
+			return { key: self._resolve_blobs(value) for (key, value) in obj.items() }
+		elif isinstance(obj, list):
+			return [ self._resolve_blobs(value) for value in obj ]
+		else:
+			return obj
+
+	def pop_statistics(self):
+		with self._statistics_lock:
+			statistics = {
+				"hits":		self._hits,
+				"misses":	self._misses,
+			}
+			self._hits = 0
+			self._misses = 0
+		return statistics
+
+	def _count(self, hit):
+		with self._statistics_lock:
+			if hit:
+				self._hits += 1
+			else:
+				self._misses += 1
+
 	def _retrieve(self, keyhash):
 		filename = self._directory + keyhash + ".json"
 		try:
 			with open(filename) as f:
 				file_representation = ExtendedJSONEncoder.load(f)
+			object_data = self._resolve_blobs(file_representation["object"])
 		except (FileNotFoundError, json.decoder.JSONDecodeError):
 			return None
 
-		return RenderedResult(key = file_representation["key"], keyhash = keyhash, from_cache = True, data = file_representation["object"])
+		# The modification time of the entry serves as the last access
+		# timestamp for LRU eviction
+		with contextlib.suppress(FileNotFoundError):
+			os.utime(filename)
+		return RenderedResult(key = file_representation["key"], keyhash = keyhash, from_cache = True, data = object_data)
 
 	def _store(self, key, keyhash, object_data):
 		file_representation = {
@@ -59,28 +131,79 @@ class RendererCache():
 				"rendered":	datetime.datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%SZ"),
 				"keyhash":	keyhash,
 			},
-			"object": object_data,
+			"object": self._externalize_blobs(object_data),
 		}
 
 		filename = self._directory + keyhash + ".json"
-		with open(filename, "w") as f:
+		tmp_filename = FileTools.base_random_file_on(filename)
+		with open(tmp_filename, "w") as f:
 			ExtendedJSONEncoder.dump(file_representation, f, minify = True)
+		os.replace(tmp_filename, filename)
 
-	def render(self, property_dict):
-		key = {
+	@property
+	def name(self):
+		return self._renderer.name
+
+	@property
+	def batchable(self):
+		return self._renderer.batchable
+
+	def close(self):
+		self._renderer.close()
+
+	def _compute_key(self, property_dict):
+		return {
 			"name":						self._renderer.name,
 			"renderer_properties":		self._renderer.properties,
-			"object_properties":		property_dict,
+			"object_properties":		self._renderer.key_properties(property_dict),
 			"additional_key":			self._renderer.rendering_key(property_dict),
 		}
+
+	def keyhash(self, property_dict):
+		return self._hash_key(self._compute_key(property_dict))
+
+	def is_cached(self, keyhash):
+		return os.path.isfile(self._directory + keyhash + ".json")
+
+	def render(self, property_dict):
+		key = self._compute_key(property_dict)
 		attempt_cache = property_dict.get("cache", True)
 
 		keyhash = self._hash_key(key)
 		cached_object = self._retrieve(keyhash)
 		if attempt_cache and (cached_object is not None):
+			self._count(hit = True)
 			return cached_object
 		else:
 			object_data = self._renderer.render(property_dict)
 			if attempt_cache:
+				self._count(hit = False)
 				self._store(key, keyhash, object_data)
 			return RenderedResult(key = key, keyhash = keyhash, from_cache = False, data = object_data)
+
+	def render_batch(self, property_dicts):
+		# Render all uncached objects at once, but store each one in its own
+		# cache entry, exactly as render() would. Objects that fail to render
+		# are None.
+		results = [ None ] * len(property_dicts)
+		misses = [ ]
+		for (index, property_dict) in enumerate(property_dicts):
+			key = self._compute_key(property_dict)
+			keyhash = self._hash_key(key)
+			cached_object = self._retrieve(keyhash) if property_dict.get("cache", True) else None
+			if cached_object is not None:
+				self._count(hit = True)
+				results[index] = cached_object
+			else:
+				misses.append((index, key, keyhash))
+
+		if len(misses) > 0:
+			rendered_objects = self._renderer.render_batch([ property_dicts[index] for (index, key, keyhash) in misses ])
+			for ((index, key, keyhash), object_data) in zip(misses, rendered_objects):
+				if object_data is None:
+					continue
+				if property_dicts[index].get("cache", True):
+					self._count(hit = False)
+					self._store(key, keyhash, object_data)
+				results[index] = RenderedResult(key = key, keyhash = keyhash, from_cache = False, data = object_data)
+		return results
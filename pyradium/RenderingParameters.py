@@ -23,6 +23,7 @@ import dataclasses
 import os
 from pysvgedit import SVGValidator, SVGValidatorErrorClass
 from .FileLookup import FileLookup
+from .Enums import ImageFormat
 
 @dataclasses.dataclass()
 class RenderingParameters():
@@ -37,10 +38,20 @@ class RenderingParameters():
 	resource_uri: str = ""
 	geometry: tuple = (1280, 720)
 	image_max_dimension: int = 1920
+	image_srcset: list[int] | None = None
+	eager_image_slides: int = 1
+	image_format: ImageFormat = ImageFormat.Original
+	image_format_fallback: bool = False
+	optimize_png: bool = False
 	presentation_features: set | None = None
 	injected_metadata: dict | None = None
 	trustworthy_source: bool = False
 	allow_missing_svg_fonts: bool = False
+	render_jobs: int | None = None
+	template_jobs: int = 1
+	stream_index: bool = False
+	link_cached_assets: bool = False
+	xml_parser: str | None = None
 	svg_validator: None = dataclasses.field(default = None, init = False)
 
 	@property
@@ -59,6 +70,10 @@ class RenderingParameters():
 			self.extra_template_dirs = [ ]
 		if self.include_dirs is None:
 			self.include_dirs = [ ]
+		if self.image_srcset is None:
+			self.image_srcset = [ ]
+		if self.render_jobs is None:
+			self.render_jobs = os.cpu_count() or 1
 		if self.presentation_features is None:
 			self.presentation_features = frozenset()
 		else:
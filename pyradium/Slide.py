@@ -20,17 +20,22 @@
 #	Johannes Bauer <JohannesBauer@gmx.de>
 
 from pyradium.xmlhooks.XMLHookRegistry import XMLHookRegistry
-from .Tools import XMLTools
+from .Tools import XMLTools, HashTools
 from .BaseDirective import BaseDirective
 from .RenderableSlide import RenderableSlide
 from .PauseRenderer import PauseRenderer
 
 class RenderSlideDirective(BaseDirective):
+	# Hooks whose effect reaches beyond the slide they are contained in
+	_LAYOUT_HOOKS = set([ "s:time", "s:ac" ])
+
 	def __init__(self, xmlnode):
 		assert(xmlnode.tagName == "slide")
 		self._dom = xmlnode
+		self._fingerprint = HashTools.hash_data(self._dom.toxml().encode("utf-8"))
 		if not self._dom.hasAttribute("type"):
 			self._dom.setAttribute("type", "default")
+		self._layout_fingerprint = (self.slide_type, tuple(node.toxml() for node in XMLTools.findall_recurse_predicate(self._dom, lambda node: node.tagName in self._LAYOUT_HOOKS)))
 		self._xml_slide_vars = self._get_xml_slide_vars()
 		self._content_containers = { }
 		for content_node in XMLTools.findall(self._dom, "s:content"):
@@ -46,6 +51,14 @@ class RenderSlideDirective(BaseDirective):
 	def slide_type(self):
 		return self._dom.getAttribute("type")
 
+	@property
+	def fingerprint(self):
+		return self._fingerprint
+
+	@property
+	def layout_fingerprint(self):
+		return self._layout_fingerprint
+
 	def get_xml_slide_var(self, key):
 		return self._xml_slide_vars.get(key)
 
@@ -75,9 +88,14 @@ class RenderSlideDirective(BaseDirective):
 		rendered_presentation.advance_slide()
 		# We need to render the content containers even though they're not
 		# used: Traversal of the containers is necessary because they might
-		# contain instructions such as the <s:time> specification.
+		# contain instructions such as the <s:time> specification. Mangling
+		# happens on a copy because the slide (e.g., from a cached include
+		# file) may be rendered again.
 		for container_node in content_containers.values():
-			XMLHookRegistry.mangle(rendered_presentation, container_node)
+			if rendered_presentation.layout_only:
+				XMLHookRegistry.layout(rendered_presentation, container_node)
+			else:
+				XMLHookRegistry.mangle(rendered_presentation, XMLTools.clone(container_node))
 		if additional_slide_var_list is None:
 			additional_slide_var_list = [ { } ]
 		elif not isinstance(additional_slide_var_list, list):
@@ -90,12 +108,13 @@ class RenderSlideDirective(BaseDirective):
 
 	def emit_content_slide(self, rendered_presentation, content_containers, additional_slide_vars = None):
 		rendered_presentation.advance_slide()
-		paused_containers = PauseRenderer(content_containers, honor_pauses = rendered_presentation.renderer.rendering_params.honor_pauses).render()
+		pause_renderer = PauseRenderer(content_containers, honor_pauses = rendered_presentation.renderer.rendering_params.honor_pauses)
+		if rendered_presentation.layout_only:
+			paused_containers = [ None ] * pause_renderer.layout(rendered_presentation)
+		else:
+			paused_containers = pause_renderer.render(rendered_presentation)
 
 		for (sub_slide_index, paused_container) in enumerate(paused_containers):
-			for container_node in paused_container.values():
-				XMLHookRegistry.mangle(rendered_presentation, container_node)
-
 			slide_vars = self.compute_slide_vars(rendered_presentation, sub_slide_index)
 			if additional_slide_vars is not None:
 				slide_vars.update(additional_slide_vars)
@@ -47,6 +47,10 @@ class TOCDirective(BaseDirective):
 	def value(self):
 		return self._value
 
+	@property
+	def fingerprint(self):
+		return ("toc", self.toc_element.value, self.value)
+
 	def render(self, rendered_presentation):
 		level = self._TOC_LEVEL[self.toc_element]
 		rendered_presentation.toc.new_heading(level, self.value)
@@ -0,0 +1,128 @@
+#	pyradium - HTML presentation/slide show generator
+#	Copyright (C) 2026-2026 Johannes Bauer
+#
+#	This file is part of pyradium.
+#
+#	pyradium is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	pyradium is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with pyradium; if not, write to the Free Software
+#	Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+
+import os
+import sys
+import json
+import time
+import shutil
+import hashlib
+import logging
+import contextlib
+import mako
+import mako.exceptions
+import pyradium
+from .RendererCache import RendererCache
+
+_log = logging.getLogger(__spec__.name)
+
+class TemplateModuleCache():
+	# Mako compiles every template into a Python module before it can be
+	# rendered. Without a module directory, this happens in memory for all
+	# templates in every single invocation. The compiled modules are instead
+	# kept on disk, in a directory that is versioned by everything that
+	# influences the generated code (pyradium and Mako versions and the
+	# options of the lookup). Within that directory, modules are keyed by the
+	# absolute template filename and its modification time: templates of
+	# different styles share URIs like "slide_default.html" and a template
+	# that is replaced by an older copy still needs to be recompiled. The
+	# module of the previous modification time is removed when a template is
+	# recompiled, and directories of versions that have not been used for a
+	# while are removed entirely.
+	_UNUSED_VERSION_MAX_AGE_SECS = 7 * 86400
+
+	def __init__(self, lookup_options, cache_directory = None):
+		if cache_directory is None:
+			cache_directory = RendererCache.default_directory()
+		elif not cache_directory.endswith("/"):
+			cache_directory += "/"
+		version_key = [ pyradium.VERSION, mako.__version__, sys.implementation.cache_tag, lookup_options ]
+		version_hash = hashlib.md5(json.dumps(version_key, sort_keys = True).encode("utf-8")).hexdigest()
+		self._directory = cache_directory + "mako/" + version_hash + "/"
+		try:
+			os.makedirs(self._directory, exist_ok = True)
+			os.utime(self._directory)
+		except OSError as e:
+			_log.warning("Cannot create template module cache directory %s, compiling templates in memory: %s", self._directory, str(e))
+			self._directory = None
+			return
+		self._remove_unused_versions(cache_directory + "mako/", version_hash)
+
+	def _remove_unused_versions(self, mako_directory, version_hash):
+		# The modification time of a version directory is updated every time
+		# it is used
+		min_mtime = time.time() - self._UNUSED_VERSION_MAX_AGE_SECS
+		with contextlib.suppress(OSError), os.scandir(mako_directory) as entries:
+			for entry in entries:
+				if (entry.name != version_hash) and entry.is_dir(follow_symlinks = False) and (entry.stat().st_mtime < min_mtime):
+					_log.debug("Removing unused template module cache directory %s", entry.path)
+					shutil.rmtree(entry.path, ignore_errors = True)
+
+	@property
+	def directory(self):
+		return self._directory
+
+	@property
+	def modulename_callable(self):
+		# Passed as "modulename_callable" to the Mako TemplateLookup; None
+		# when the cache is unusable so that templates are compiled in memory
+		if self._directory is None:
+			return None
+		return self.module_filename
+
+	def module_filename(self, filename, uri):
+		filename = os.path.realpath(filename)
+		filename_hash = hashlib.md5(filename.encode("utf-8")).hexdigest()
+		module_filename = f"{self._directory}{filename_hash}_{os.stat(filename).st_mtime_ns}.py"
+		if not os.path.exists(module_filename):
+			# The template is about to be compiled; modules of its previous
+			# versions will never be used again
+			self._remove_modules(filename_hash + "_")
+		return module_filename
+
+	def _remove_modules(self, prefix):
+		with contextlib.suppress(OSError), os.scandir(self._directory) as entries:
+			for entry in entries:
+				if entry.name.startswith(prefix) and entry.name.endswith(".py"):
+					with contextlib.suppress(FileNotFoundError):
+						os.unlink(entry.path)
+
+	def warmup(self, lookup, uris):
+		# Compiles all templates a style might need the first time the style
+		# is used with this set of lookup directories. Afterwards, templates
+		# are only compiled on demand when their source changes.
+		if self._directory is None:
+			return
+		uris = sorted(uris)
+		warmup_key = json.dumps([ lookup.directories, uris ])
+		marker_filename = self._directory + "warmup_" + hashlib.md5(warmup_key.encode("utf-8")).hexdigest()
+		if os.path.exists(marker_filename):
+			return
+		compiled_count = 0
+		for uri in uris:
+			try:
+				lookup.get_template(uri)
+				compiled_count += 1
+			except mako.exceptions.MakoException as e:
+				_log.debug("Cannot precompile template %s: %s", uri, str(e))
+		_log.debug("Precompiled %d of %d templates into %s", compiled_count, len(uris), self._directory)
+		with contextlib.suppress(OSError), open(marker_filename, "w"):
+			pass
@@ -0,0 +1,80 @@
+#	pyradium - HTML presentation/slide show generator
+#	Copyright (C) 2026-2026 Johannes Bauer
+#
+#	This file is part of pyradium.
+#
+#	pyradium is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	pyradium is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with pyradium; if not, write to the Free Software
+#	Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+
+import logging
+import multiprocessing
+import concurrent.futures
+
+_log = logging.getLogger(__spec__.name)
+
+class TemplatePool():
+	# Renders the slide templates of the final pass in forked worker
+	# processes. Workers inherit the renderer and all collected slides from
+	# the parent, so only slide indices are sent to them and only the rendered
+	# HTML is sent back. Slide templates may read, but not modify the rendered
+	# presentation (for which each worker restores the state the slide was
+	# emitted in). Unique IDs handed out by templates are placeholders that
+	# the parent replaces in slide order.
+	_UID_PLACEHOLDER = "\0uid%d\0"
+	_WORKER_STATE = None
+
+	def __init__(self, renderer, max_workers):
+		self._renderer = renderer
+		self._max_workers = max_workers
+
+	@classmethod
+	def available(cls):
+		return "fork" in multiprocessing.get_all_start_methods()
+
+	@classmethod
+	def _render_chunk(cls, indices):
+		(renderer, rendered_presentation, slides) = cls._WORKER_STATE
+		results = [ ]
+		for index in indices:
+			(renderable_slide, state) = slides[index]
+			uid_placeholders = [ ]
+			def generate_uid():
+				uid_placeholders.append(cls._UID_PLACEHOLDER % (len(uid_placeholders)))
+				return uid_placeholders[-1]
+			rendered_presentation.restore_state(state)
+			rendered_slide = renderer.render_slide(rendered_presentation, renderable_slide.replace_vars(generate_uid = generate_uid))
+			results.append((rendered_slide, len(uid_placeholders)))
+		return results
+
+	def render(self, rendered_presentation, slides):
+		# slides is a list of (RenderableSlide, RenderState) tuples; returns
+		# the rendered slides with their unique IDs resolved in the same order
+		# as if they had been rendered sequentially
+		chunk_size = max(1, (len(slides) + (4 * self._max_workers) - 1) // (4 * self._max_workers))
+		chunks = [ range(offset, min(offset + chunk_size, len(slides))) for offset in range(0, len(slides), chunk_size) ]
+		TemplatePool._WORKER_STATE = (self._renderer, rendered_presentation, slides)
+		try:
+			with concurrent.futures.ProcessPoolExecutor(max_workers = min(self._max_workers, len(chunks)), mp_context = multiprocessing.get_context("fork")) as executor:
+				results = [ result for chunk_results in executor.map(self._render_chunk, chunks) for result in chunk_results ]
+		finally:
+			TemplatePool._WORKER_STATE = None
+		_log.debug("Rendered %d slide templates in %d chunks using %d processes.", len(slides), len(chunks), min(self._max_workers, len(chunks)))
+		return results
+
+	def resolve_unique_ids(self, rendered_presentation, rendered_slide, uid_count):
+		for uid_index in range(uid_count):
+			rendered_slide = rendered_slide.replace(self._UID_PLACEHOLDER % (uid_index), rendered_presentation.next_unique_id)
+		return rendered_slide
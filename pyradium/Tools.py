@@ -20,12 +20,17 @@
 #	Johannes Bauer <JohannesBauer@gmx.de>
 
 import os
+import re
 import sys
 import json
+import shutil
+import struct
+import filecmp
 import hashlib
 import tempfile
 import contextlib
 import subprocess
+import xml.etree.ElementTree
 from pyradium.CmdlineEscape import CmdlineEscape
 from pyradium.Exceptions import InvalidBooleanValueException, InvalidValueNodeException, InvalidEvalExpressionException, FailedToExecuteSubprocessException
 
@@ -76,10 +81,17 @@ class XMLTools():
 
 	@classmethod
 	def inner_text(cls, node):
+		# Equivalent to walking all text nodes, but without any callbacks
 		result = [ ]
-		def callback(node):
-			result.append(node.wholeText)
-		cls.walk(node, callback, predicate = lambda node: node.nodeType in [ node.TEXT_NODE, node.CDATA_SECTION_NODE ])
+		stack = [ node ]
+		(pop, push) = (stack.pop, stack.extend)
+		text_node_types = (node.TEXT_NODE, node.CDATA_SECTION_NODE)
+		while stack:
+			node = pop()
+			if node.nodeType in text_node_types:
+				result.append(node.wholeText)
+			elif node.childNodes:
+				push(reversed(node.childNodes))
 		return "".join(result)
 
 	@classmethod
@@ -91,21 +103,23 @@ class XMLTools():
 
 	@classmethod
 	def walk(cls, node, callback, predicate = None, cancel_descent_predicate = None):
-		if (cancel_descent_predicate is not None) and cancel_descent_predicate(node):
-			return
-		continue_descent = True
-		if (predicate is None) or predicate(node):
-			try:
-				callback(node)
-			except cls.CancelDescentException:
-				continue_descent = False
-
-		if continue_descent:
-			# We *must* make a copy of childNodes here so that we are
-			# guaranteed to not iterate over wrong elements if the callback
-			# chooses to modify the DOM
-			for child in list(node.childNodes):
-				cls.walk(child, callback, predicate = predicate, cancel_descent_predicate = cancel_descent_predicate)
+		# Pre-order traversal using one explicit stack. The children of a node
+		# are pushed after its callback has run, so the callback may freely
+		# modify the DOM: the children that a node had at that time are the
+		# ones visited, even if siblings are removed or replaced in between.
+		stack = [ node ]
+		(pop, push) = (stack.pop, stack.extend)
+		while stack:
+			node = pop()
+			if (cancel_descent_predicate is not None) and cancel_descent_predicate(node):
+				continue
+			if (predicate is None) or predicate(node):
+				try:
+					callback(node)
+				except cls.CancelDescentException:
+					continue
+			if node.childNodes:
+				push(reversed(node.childNodes))
 
 	@classmethod
 	def walk_elements(cls, node, callback):
@@ -114,10 +128,14 @@ class XMLTools():
 	@classmethod
 	def findall_recurse_predicate(cls, root_node, predicate):
 		result = [ ]
-		def callback(node):
-			if predicate(node):
+		stack = [ root_node ]
+		(pop, push) = (stack.pop, stack.extend)
+		while stack:
+			node = pop()
+			if (node.nodeType == node.ELEMENT_NODE) and predicate(node):
 				result.append(node)
-		cls.walk_elements(root_node, callback)
+			if node.childNodes:
+				push(reversed(node.childNodes))
 		return result
 
 	@classmethod
@@ -147,18 +165,9 @@ class XMLTools():
 		return list(cls.findall_generator(root_node, name, namespace_uri = namespace_uri))
 
 	@classmethod
-	def normalize_ns(cls, node, known_namespaces = None):
+	def assign_ns_prefixes(cls, present_namespaces, known_namespaces = None):
 		if known_namespaces is None:
 			known_namespaces = { }
-
-		# First collect all known namespace URIs
-		present_namespaces = set()
-		def visit(node):
-			if node.namespaceURI is not None:
-				present_namespaces.add(node.namespaceURI)
-		cls.walk_elements(node, visit)
-
-		# Then assign them
 		assigned_namespaces = { }
 		namespace_id = 0
 		for uri in sorted(present_namespaces):
@@ -167,16 +176,32 @@ class XMLTools():
 			else:
 				assigned_namespaces[uri] = "ns%d" % (namespace_id)
 				namespace_id += 1
+		return assigned_namespaces
 
+	@classmethod
+	def declare_ns_prefixes(cls, node, assigned_namespaces):
 		# Remove old namespace assignments
 		remove_attributes = set(key for key in node.attributes.keys() if key.startswith("xmlns:"))
 		for key in remove_attributes:
 			node.attributes.removeNamedItem(key)
 
-		# Append new namespace assignments to root element
+		# Append new namespace assignments
 		for (uri, key) in assigned_namespaces.items():
 			node.setAttribute("xmlns:%s" % (key), uri)
 
+	@classmethod
+	def normalize_ns(cls, node, known_namespaces = None):
+		# First collect all known namespace URIs
+		present_namespaces = set()
+		def visit(node):
+			if node.namespaceURI is not None:
+				present_namespaces.add(node.namespaceURI)
+		cls.walk_elements(node, visit)
+
+		# Then assign them and declare them at the root element
+		assigned_namespaces = cls.assign_ns_prefixes(present_namespaces, known_namespaces)
+		cls.declare_ns_prefixes(node, assigned_namespaces)
+
 		# Finally, traverse the tree again and change tag names
 		def visit(node):
 			(ns, tag) = cls.get_ns_tag(node)
@@ -296,6 +321,90 @@ class JSONTools():
 
 
 class ImageTools():
+	_SVG_LENGTH_RE = re.compile(r"\s*(?P<value>[-+]?(\d+\.?\d*|\.\d+)([eE][-+]?\d+)?)\s*(?P<unit>[a-zA-Z%]*)\s*")
+	_SVG_UNITS_TO_PX = {
+		"":		1,
+		"px":	1,
+		"in":	96,
+		"cm":	96 / 2.54,
+		"mm":	96 / 25.4,
+		"q":	96 / 101.6,
+		"pt":	96 / 72,
+		"pc":	16,
+	}
+
+	@classmethod
+	def _parse_svg_length(cls, length: str | None):
+		# Relative units (percent, em) cannot be resolved without context
+		if length is None:
+			return None
+		match = cls._SVG_LENGTH_RE.fullmatch(length)
+		if match is None:
+			return None
+		factor = cls._SVG_UNITS_TO_PX.get(match["unit"].lower())
+		if factor is None:
+			return None
+		return float(match["value"]) * factor
+
+	@classmethod
+	def get_svg_dimensions(cls, svg_data: bytes):
+		# Determines the rendered size (in px) of an SVG from the attributes of
+		# the root element without parsing the whole document. Returns None if
+		# the size cannot be determined.
+		parser = xml.etree.ElementTree.XMLPullParser(events = ("start", ))
+		root = None
+		try:
+			for offset in range(0, len(svg_data), 4096):
+				parser.feed(svg_data[offset : offset + 4096])
+				for (event, element) in parser.read_events():
+					root = element
+					break
+				if root is not None:
+					break
+		except xml.etree.ElementTree.ParseError:
+			return None
+		if root is None:
+			return None
+
+		(width, height) = (cls._parse_svg_length(root.get("width")), cls._parse_svg_length(root.get("height")))
+		viewbox = root.get("viewBox")
+		if viewbox is not None:
+			try:
+				(_, _, vb_width, vb_height) = (float(value) for value in viewbox.replace(",", " ").split())
+			except ValueError:
+				vb_width = vb_height = None
+			if (vb_width is not None) and (vb_width > 0) and (vb_height > 0):
+				if (width is None) and (height is None):
+					(width, height) = (vb_width, vb_height)
+				elif width is None:
+					width = height * vb_width / vb_height
+				elif height is None:
+					height = width * vb_height / vb_width
+		if (width is None) or (height is None):
+			return None
+		return (width, height)
+
+	@classmethod
+	def get_raster_dimensions(cls, img_data: bytes):
+		# Determines the size (in px) of a PNG, GIF or JPEG image from its
+		# header without decoding the image. Returns None for any other format.
+		if img_data.startswith(b"\x89PNG\r\n\x1a\n") and (img_data[12:16] == b"IHDR"):
+			return struct.unpack_from(">LL", img_data, 16)
+		elif img_data[:6] in (b"GIF87a", b"GIF89a"):
+			return struct.unpack_from("<HH", img_data, 6)
+		elif img_data.startswith(b"\xff\xd8"):
+			offset = 2
+			while offset + 9 <= len(img_data):
+				(marker, length) = struct.unpack_from(">HH", img_data, offset)
+				if (marker & 0xff00) != 0xff00:
+					break
+				if (0xffc0 <= marker <= 0xffcf) and (marker not in (0xffc4, 0xffc8, 0xffcc)):
+					# Start of frame segment: precision, height, width
+					(height, width) = struct.unpack_from(">HH", img_data, offset + 5)
+					return (width, height)
+				offset += 2 + length
+		return None
+
 	@classmethod
 	def get_image_info(cls, filename: str):
 		# For some reason, ImageMagick 6.9.13-12 Q16 x86_64 18420 produces a
@@ -367,6 +476,51 @@ class FileTools():
 			if not os.path.exists(rndname):
 				return rndname
 
+	@classmethod
+	def write_if_changed(cls, filename, content: bytes):
+		try:
+			if os.stat(filename).st_size == len(content):
+				with open(filename, "rb") as f:
+					if f.read() == content:
+						return False
+			# Unlink first so that a hardlinked file is never modified in place
+			os.unlink(filename)
+		except FileNotFoundError:
+			pass
+		with open(filename, "wb") as f:
+			f.write(content)
+		return True
+
+	@classmethod
+	def copy_if_changed(cls, src_filename, dest_filename):
+		src_stat = os.stat(src_filename)
+		try:
+			dest_stat = os.stat(dest_filename)
+			if (dest_stat.st_size == src_stat.st_size) and (dest_stat.st_mtime_ns == src_stat.st_mtime_ns):
+				return False
+			os.unlink(dest_filename)
+		except FileNotFoundError:
+			pass
+		shutil.copy2(src_filename, dest_filename)
+		return True
+
+	@classmethod
+	def replace_if_changed(cls, src_filename, dest_filename):
+		# Moves src_filename over dest_filename unless both have identical
+		# content, in which case src_filename is removed instead
+		with contextlib.suppress(FileNotFoundError):
+			if filecmp.cmp(src_filename, dest_filename, shallow = False):
+				os.unlink(src_filename)
+				return False
+		os.replace(src_filename, dest_filename)
+		return True
+
+	@classmethod
+	def link_replace(cls, src_filename, dest_filename):
+		tmp_filename = cls.base_random_file_on(dest_filename)
+		os.link(src_filename, tmp_filename)
+		os.replace(tmp_filename, dest_filename)
+
 	@classmethod
 	@contextlib.contextmanager
 	def open_write_stdout(cls, filename):
@@ -0,0 +1,272 @@
+#	pyradium - HTML presentation/slide show generator
+#	Copyright (C) 2026-2026 Johannes Bauer
+#
+#	This file is part of pyradium.
+#
+#	pyradium is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	pyradium is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with pyradium; if not, write to the Free Software
+#	Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+
+import logging
+import xml.dom
+import xml.dom.minidom
+import xml.parsers.expat
+from pyradium.Tools import XMLTools
+from pyradium.Exceptions import XMLFileNotFoundException, MalformedXMLInputException, XMLParserRegistryException, DocumentTypeDeclarationException
+
+_log = logging.getLogger(__spec__.name)
+
+class BaseXMLParser():
+	# Parsers turn an XML file into a minidom document in which all namespace
+	# prefixes have been normalized like XMLTools.normalize_ns() does it. The
+	# hooks operate on (and modify) that DOM, so all parsers need to produce
+	# the identical tree and only differ in how fast they get there.
+	_NAME = None
+	_PARSER_CLASSES = { }
+	DEFAULT_PARSER = "minidom"
+
+	@property
+	def name(self):
+		if self._NAME is None:
+			raise NotImplementedError(__class__.__name__)
+		return self._NAME
+
+	@classmethod
+	def register(cls, parser_class):
+		if parser_class._NAME in cls._PARSER_CLASSES:
+			raise XMLParserRegistryException(f"Duplicate XML parser name: {parser_class._NAME}")
+		cls._PARSER_CLASSES[parser_class._NAME] = parser_class
+		return parser_class
+
+	@classmethod
+	def parser_names(cls):
+		return sorted(cls._PARSER_CLASSES)
+
+	@classmethod
+	def get(cls, parser_name = None):
+		if parser_name is None:
+			parser_name = cls.DEFAULT_PARSER
+		if parser_name not in cls._PARSER_CLASSES:
+			raise XMLParserRegistryException(f"No XML parser registered for: {parser_name}")
+		return cls._PARSER_CLASSES[parser_name]()
+
+	def _parse(self, filename, known_namespaces):
+		raise NotImplementedError(__class__.__name__)
+
+	def parse(self, filename, known_namespaces = None):
+		try:
+			return self._parse(filename, known_namespaces)
+		except FileNotFoundError as e:
+			raise XMLFileNotFoundException(f"Cannot parse {filename}: {str(e)}") from e
+		except xml.parsers.expat.ExpatError as e:
+			raise MalformedXMLInputException(f"Cannot parse {filename}: {str(e)}") from e
+
+@BaseXMLParser.register
+class MinidomXMLParser(BaseXMLParser):
+	# Reference implementation: builds the DOM first and then walks it twice
+	# to determine and rename the namespace prefixes
+	_NAME = "minidom"
+
+	def _parse(self, filename, known_namespaces):
+		dom = xml.dom.minidom.parse(filename)
+		XMLTools.normalize_ns(dom.documentElement, known_namespaces)
+		return dom
+
+@BaseXMLParser.register
+class ExpatXMLParser(BaseXMLParser):
+	# Drives pyexpat directly and normalizes namespaces while building the
+	# tree, which saves the builder overhead of minidom and both passes of
+	# XMLTools.normalize_ns() over the finished DOM. It relies on minidom
+	# internals and is therefore opt-in.
+	_NAME = "expat"
+
+	@classmethod
+	def _build_dom(cls, f, known_namespaces):
+		# Builds the same DOM as xml.dom.minidom.parse() (i.e., its
+		# ExpatBuilderNS with default options) followed by
+		# XMLTools.normalize_ns(), but names the elements by their final prefix
+		# while they are created. Only elements of namespaces that are not known
+		# in advance need to be renamed after parsing, because their prefixes
+		# depend on all namespaces in the file. The handlers are closures over
+		# local state because they are called for every single node.
+		known_namespaces = known_namespaces or { }
+		document = xml.dom.minidom.getDOMImplementation().createDocument(None, None, None)
+		current = document
+		cdata_continue = False
+		tags = { }
+		present_namespaces = set()
+		unknown_namespace_elements = { }
+		namespace_declarations = [ ]
+		(Element, Attr, Text, TEXT_NODE) = (xml.dom.minidom.Element, xml.dom.minidom.Attr, xml.dom.minidom.Text, xml.dom.Node.TEXT_NODE)
+
+		def append(node):
+			child_nodes = current.childNodes
+			if child_nodes:
+				last = child_nodes[-1]
+				node.previousSibling = last
+				last.nextSibling = node
+			child_nodes.append(node)
+			node.parentNode = current
+
+		def start_doctype_decl(doctype_name, system_id, public_id, has_internal_subset):
+			# Document type declarations (and entities defined therein) are
+			# not used in presentations; leave them to the reference parser
+			raise DocumentTypeDeclarationException(doctype_name)
+
+		def xml_decl(version, encoding, standalone):
+			document.version = version
+			document.encoding = encoding
+			if standalone >= 0:
+				document.standalone = bool(standalone)
+
+		def start_namespace_decl(prefix, uri):
+			namespace_declarations.append((prefix, uri))
+
+		def parse_tag(name):
+			# Returns the final (tag name, namespace URI, prefix) of an
+			# element; the prefix is None for elements of unknown namespaces
+			parts = name.split(" ")
+			if len(parts) == 1:
+				return (name, None, None)
+			elif len(parts) > 3:
+				raise MalformedXMLInputException(f"Spaces in namespace URIs are not supported: {name}")
+			(uri, local_name) = parts[:2]
+			present_namespaces.add(uri)
+			prefix = known_namespaces.get(uri)
+			if prefix is None:
+				return (local_name, uri, None)
+			else:
+				return (f"{prefix}:{local_name}", uri, prefix)
+
+		def start_element(name, attributes):
+			nonlocal current
+			tag = tags.get(name)
+			if tag is None:
+				tag = tags[name] = parse_tag(name)
+			node = Element(*tag)
+			node.ownerDocument = document
+			child_nodes = current.childNodes
+			if child_nodes:
+				last = child_nodes[-1]
+				node.previousSibling = last
+				last.nextSibling = node
+			child_nodes.append(node)
+			node.parentNode = current
+			current = node
+			if (tag[1] is not None) and (tag[2] is None):
+				unknown_namespace_elements.setdefault(tag[1], [ ]).append(node)
+
+			if namespace_declarations:
+				for (prefix, uri) in namespace_declarations:
+					if prefix:
+						attribute = Attr("xmlns:" + prefix, xml.dom.XMLNS_NAMESPACE, prefix, "xmlns")
+					else:
+						attribute = Attr("xmlns", xml.dom.XMLNS_NAMESPACE, "xmlns", None)
+					attribute.value = uri
+					attribute.ownerDocument = document
+					node.setAttributeNode(attribute)
+				namespace_declarations.clear()
+
+			for i in range(0, len(attributes), 2):
+				(attribute_name, value) = (attributes[i], attributes[i + 1])
+				if " " in attribute_name:
+					(uri, local_name, *prefix) = attribute_name.split(" ")
+					if prefix:
+						attribute = Attr(f"{prefix[0]}:{local_name}", uri, local_name, prefix[0])
+					else:
+						attribute = Attr(local_name, uri, local_name, None)
+				else:
+					attribute = Attr(attribute_name, None, attribute_name, None)
+				attribute.value = value
+				attribute.ownerDocument = document
+				node.setAttributeNode(attribute)
+
+		def end_element(name):
+			nonlocal current
+			current = current.parentNode
+
+		def character_data(data):
+			child_nodes = current.childNodes
+			if child_nodes:
+				last = child_nodes[-1]
+				if last.nodeType == TEXT_NODE:
+					last.data += data
+					return
+				node = Text()
+				node.previousSibling = last
+				last.nextSibling = node
+			else:
+				node = Text()
+			node.data = data
+			node.ownerDocument = document
+			child_nodes.append(node)
+			node.parentNode = current
+
+		def cdata_section_data(data):
+			nonlocal cdata_continue
+			if cdata_continue:
+				current.childNodes[-1].appendData(data)
+			else:
+				append(document.createCDATASection(data))
+				cdata_continue = True
+
+		def start_cdata_section():
+			nonlocal cdata_continue
+			parser.CharacterDataHandler = cdata_section_data
+			cdata_continue = False
+
+		def end_cdata_section():
+			parser.CharacterDataHandler = character_data
+
+		def comment(data):
+			append(document.createComment(data))
+
+		def processing_instruction(target, data):
+			append(document.createProcessingInstruction(target, data))
+
+		parser = xml.parsers.expat.ParserCreate(namespace_separator = " ")
+		parser.namespace_prefixes = True
+		parser.buffer_text = True
+		parser.buffer_size = 64 * 1024
+		parser.ordered_attributes = True
+		parser.specified_attributes = True
+		parser.StartDoctypeDeclHandler = start_doctype_decl
+		parser.XmlDeclHandler = xml_decl
+		parser.StartNamespaceDeclHandler = start_namespace_decl
+		parser.StartElementHandler = start_element
+		parser.EndElementHandler = end_element
+		parser.CharacterDataHandler = character_data
+		parser.StartCdataSectionHandler = start_cdata_section
+		parser.EndCdataSectionHandler = end_cdata_section
+		parser.CommentHandler = comment
+		parser.ProcessingInstructionHandler = processing_instruction
+		parser.ParseFile(f)
+
+		assigned_namespaces = XMLTools.assign_ns_prefixes(present_namespaces, known_namespaces)
+		for (uri, elements) in unknown_namespace_elements.items():
+			prefix = assigned_namespaces[uri]
+			for element in elements:
+				element.prefix = prefix
+				element.tagName = element.nodeName = f"{prefix}:{element.tagName}"
+		XMLTools.declare_ns_prefixes(document.documentElement, assigned_namespaces)
+		return document
+
+	def _parse(self, filename, known_namespaces):
+		with open(filename, "rb") as f:
+			try:
+				return self._build_dom(f, known_namespaces)
+			except DocumentTypeDeclarationException:
+				_log.debug("%s contains a document type declaration, falling back to minidom parser", filename)
+		return MinidomXMLParser()._parse(filename, known_namespaces)
@@ -23,24 +23,8 @@ import sys
 import argparse
 import pyradium
 from .MultiCommand import MultiCommand
-from .ActionRender import ActionRender
-from .ActionShowStyleOpts import ActionShowStyleOpts
-from .ActionModify import ActionModify
-from .ActionServe import ActionServe
-from .ActionAcroAdd import ActionAcroAdd
-from .ActionAcroScan import ActionAcroScan
-from .ActionAcroSort import ActionAcroSort
-from .ActionAcroTex import ActionAcroTex
-from .ActionPurge import ActionPurge
-from .ActionHashPresentation import ActionHashPresentation
-from .ActionDumpMetadata import ActionDumpMetadata
-from .ActionSpellcheck import ActionSpellcheck
-from .ActionDictAdd import ActionDictAdd
-from .ActionTemplateHelper import ActionTemplateHelper
-from .ActionStandalone import ActionStandalone
-from .modify.BaseModifyCommand import BaseModifyCommand
-from .standalone.BaseStandaloneCommand import BaseStandaloneCommand
-from .Enums import PresentationFeature
+from .Enums import PresentationFeature, ImageFormat
+from .XMLParser import BaseXMLParser
 from .GlobalConfig import GlobalConfig
 
 def _geometry(text):
@@ -49,6 +33,24 @@ def _geometry(text):
 		raise argparse.ArgumentTypeError("Not a valid geometry: %s" % (text))
 	return (int(text[0]), int(text[1]))
 
+def _positive_int(text):
+	try:
+		value = int(text)
+	except ValueError as e:
+		raise argparse.ArgumentTypeError("Not a valid integer: %s" % (text)) from e
+	if value < 1:
+		raise argparse.ArgumentTypeError("Must be at least 1: %s" % (text))
+	return value
+
+def _dimension_list(text):
+	try:
+		values = [ int(value) for value in text.split(",") ]
+	except ValueError as e:
+		raise argparse.ArgumentTypeError("Not a valid comma-separated list of dimensions: %s" % (text)) from e
+	if any(value < 1 for value in values):
+		raise argparse.ArgumentTypeError("Dimensions must be at least 1: %s" % (text))
+	return sorted(set(values))
+
 def _resource_dir(text):
 	text = text.split(":", maxsplit = 1)
 	if len(text) != 2:
@@ -61,6 +63,11 @@ def main():
 
 	def genparser(parser):
 		parser.add_argument("--image-max-dimension", metavar = "pixels", type = int, default = 1920, help = "When rendering imaages, specifies the maximum dimension they're downsized to. The lower this value, the smaller the output files and the lower the quality. Defaults to %(default)d pixels.")
+		parser.add_argument("--image-srcset", metavar = "pixels,pixels,...", type = _dimension_list, default = [ ], help = "Additionally render images at these smaller maximum dimensions (e.g., \"480,960\") and let the browser choose which one to load depending on the size the presentation is displayed at. By default, only the full size given by --image-max-dimension is rendered.")
+		parser.add_argument("--eager-image-slides", metavar = "count", type = int, default = 1, help = "Images are marked to be loaded lazily by the browser, i.e., only once the slide they are on is about to be shown. Images on this many slides at the beginning of the presentation are loaded right away instead. Defaults to %(default)d.")
+		parser.add_argument("--image-format", choices = [ enumitem.value for enumitem in ImageFormat ], default = ImageFormat.Original.value, help = "Output format of rendered images. 'original' renders vector graphics as PNG and keeps the format of raster images, 'webp' and 'avif' re-encode them (except for GIFs) unless that does not make them smaller. Can be overridden for single images by the 'format' attribute of s:img. Can be one of %(choices)s, defaults to %(default)s.")
+		parser.add_argument("--image-format-fallback", action = "store_true", help = "When images are re-encoded by --image-format, additionally keep the original image as a fallback for browsers which do not support the format.")
+		parser.add_argument("--optimize-png", action = "store_true", help = "Losslessly optimize all PNG images written to the output directory. Uses oxipng, zopflipng or pngcrush if installed and an in-process optimizer otherwise. Optimized images are cached, so this only slows down the first rendering of an image.")
 		parser.add_argument("-I", "--include-dir", metavar = "path", action = "append", default = [ ], help = "Specifies an additional include directory in which, for example, images are located which are referenced from the presentation. Can be issued multiple times.")
 		parser.add_argument("-R", "--resource-dir", metavar = "path:uripath", type = _resource_dir, help = "Specifies the resource directory both as the actual deployment directory and the URI it has when serving the presentation. By default, the deployment directory of resources is identical to the output directory and the uripath is '.'.")
 		parser.add_argument("--template-dir", metavar = "path", action = "append", default = [ ], help = "Specifies an additional template directories in which template style files are located. Can be issued multiple times.")
@@ -79,47 +86,52 @@ def main():
 		parser.add_argument("--re-render-watch", metavar = "path", action = "append", default = [ ], help = "By default, all include files and the template directory is being watched for changes. This option gives additional files or directories upon change of which the presentation should be re-rendered.")
 		parser.add_argument("--trustworthy-source", action = "store_true", help = "By default, the presentation source code is considered not trustworthy and therefore primitives which allow remote code execution (like s:exec) are disabled by default. If you know that the source of your presentation is trustworthy and want to allow it to execute arbitrary code, then specify this parameter.")
 		parser.add_argument("--allow-missing-svg-fonts", action = "store_true", help = "If a font is not present on the local system, pyradium aborts instead of rendering an SVG with replaced fonts. This option allows to render the presentation anyways.")
+		parser.add_argument("--jobs", metavar = "count", type = _positive_int, help = "Number of external renderer processes (e.g., for images or LaTeX formulas) that are run in parallel before the slides are rendered. LaTeX formulas are typeset in one batch per process. A value of 1 disables parallel prerendering. Defaults to the number of CPUs.")
+		parser.add_argument("--template-jobs", metavar = "count", type = _positive_int, default = 1, help = "Number of processes that render the slide templates in the final pass. Slide templates must then not modify the rendered presentation, which the included templates do not. Only has an effect on systems that can fork processes. Defaults to %(default)d, which renders all slides sequentially.")
+		parser.add_argument("--stream-index", action = "store_true", help = "Write rendered slides to a temporary file in the output directory as they are produced and assemble the index file from it, instead of keeping all slides in memory. Reduces the memory footprint of very large presentations, but disables incremental re-rendering in re-render mode.")
+		parser.add_argument("--link-cache", action = "store_true", help = "Hardlink rendered binary assets (e.g., images) from the renderer cache into the output directory instead of writing a copy of them. Falls back to copying when the cache resides on a different file system. Note that the output directory then shares its files with the cache.")
+		parser.add_argument("--xml-parser", choices = BaseXMLParser.parser_names(), default = BaseXMLParser.DEFAULT_PARSER, help = "XML parser that reads the presentation source files. All parsers produce the identical document tree; 'expat' builds it faster but relies on minidom internals. Can be one of %(choices)s, defaults to %(default)s.")
 		parser.add_argument("-f", "--force", action = "store_true", help = "Overwrite files in destination directory if they already exist.")
 		parser.add_argument("-v", "--verbose", action = "count", default = 0, help = "Increase verbosity. Can be specified more than once.")
 		parser.add_argument("infile", help = "Input XML file of the presentation.")
 		parser.add_argument("outdir", help = "Output directory the presentation is put into.")
-	mc.register("render", "Render a presentation", genparser, action = ActionRender)
+	mc.register("render", "Render a presentation", genparser, action = "pyradium.ActionRender:ActionRender")
 
 	def genparser(parser):
 		parser.add_argument("--template-dir", metavar = "path", action = "append", default = [ ], help = "Specifies an additional template directories in which template style files are located. Can be issued multiple times.")
 		parser.add_argument("-v", "--verbose", action = "count", default = 0, help = "Increase verbosity. Can be specified more than once.")
 		parser.add_argument("template_style", help = "Name of the template that should be shown.")
-	mc.register("showstyleopts", "Show all options a specific template style supports", genparser, action = ActionShowStyleOpts)
+	mc.register("showstyleopts", "Show all options a specific template style supports", genparser, action = "pyradium.ActionShowStyleOpts:ActionShowStyleOpts")
 
-	modify_commands = list(sorted(BaseModifyCommand.get_supported_cmd_list()))
-	if len(modify_commands) > 0:
-		def genparser(parser):
-			parser.add_argument("subcommand", choices = modify_commands, help = "Name of subcommand to call.")
-			parser.add_argument("params", nargs = argparse.REMAINDER, help = "Arguments for the respective sub-command.")
-		mc.register("modify", "Modify a presentation through one of many sub-commands", genparser, action = ActionModify)
+	def genparser(parser):
+		# Importing the sub-commands is deferred until the command is used
+		from .modify.BaseModifyCommand import BaseModifyCommand
+		parser.add_argument("subcommand", choices = sorted(BaseModifyCommand.get_supported_cmd_list()), help = "Name of subcommand to call.")
+		parser.add_argument("params", nargs = argparse.REMAINDER, help = "Arguments for the respective sub-command.")
+	mc.register("modify", "Modify a presentation through one of many sub-commands", genparser, action = "pyradium.ActionModify:ActionModify")
 
 	def genparser(parser):
 		parser.add_argument("-b", "--bind-addr", metavar = "addr", type = str, default = "127.0.0.1", help = "Address to bind to. Defaults to %(default)s.")
 		parser.add_argument("-p", "--port", metavar = "port", type = int, default = 8123, help = "Port to serve directory under. Defaults to %(default)s.")
 		parser.add_argument("-v", "--verbose", action = "count", default = 0, help = "Increases verbosity. Can be specified multiple times to increase.")
 		parser.add_argument("dirname", help = "Directory that should be served.")
-	mc.register("serve", "Serve a rendered presentation over HTTP", genparser, action = ActionServe)
+	mc.register("serve", "Serve a rendered presentation over HTTP", genparser, action = "pyradium.ActionServe:ActionServe")
 
 	def genparser(parser):
 		parser.add_argument("-v", "--verbose", action = "count", default = 0, help = "Increases verbosity. Can be specified multiple times to increase.")
 		parser.add_argument("acrofile", help = "Acronym database JSON file.")
-	mc.register("acroadd", "Add an acryonym to the acronym database", genparser, action = ActionAcroAdd, aliases = [ "aadd" ])
+	mc.register("acroadd", "Add an acryonym to the acronym database", genparser, action = "pyradium.ActionAcroAdd:ActionAcroAdd", aliases = [ "aadd" ])
 
 	def genparser(parser):
 		parser.add_argument("-v", "--verbose", action = "count", default = 0, help = "Increases verbosity. Can be specified multiple times to increase.")
 		parser.add_argument("acrofile", help = "Acronym database JSON file.")
 		parser.add_argument("infile", help = "Input XML file of the presentation.")
-	mc.register("acroscan", "Scans a presentation and suggests acronyms that can be added", genparser, action = ActionAcroScan, aliases = [ "ascan" ])
+	mc.register("acroscan", "Scans a presentation and suggests acronyms that can be added", genparser, action = "pyradium.ActionAcroScan:ActionAcroScan", aliases = [ "ascan" ])
 
 	def genparser(parser):
 		parser.add_argument("-v", "--verbose", action = "count", default = 0, help = "Increases verbosity. Can be specified multiple times to increase.")
 		parser.add_argument("acrofile", help = "Acronym database JSON file.")
-	mc.register("acrosort", "Sort an acryonym database", genparser, action = ActionAcroSort, aliases = [ "asort" ])
+	mc.register("acrosort", "Sort an acryonym database", genparser, action = "pyradium.ActionAcroSort:ActionAcroSort", aliases = [ "asort" ])
 
 	def genparser(parser):
 		parser.add_argument("-i", "--itemsep", metavar = "distance", help = "Include an \\itemsep command inside the acronym directory.")
@@ -127,17 +139,26 @@ def main():
 		parser.add_argument("-f", "--force", action = "store_true", help = "Overwrite files if they already exist.")
 		parser.add_argument("acrofile", help = "Acronym database JSON file.")
 		parser.add_argument("tex_outfile", nargs = "?", default = "-", help = "TeX output file to generate. If omitted, defaults to stdout.")
-	mc.register("acrotex", "Convert an acronym database to LaTeX format", genparser, action = ActionAcroTex)
+	mc.register("acrotex", "Convert an acronym database to LaTeX format", genparser, action = "pyradium.ActionAcroTex:ActionAcroTex")
 
 	def genparser(parser):
 		parser.add_argument("-v", "--verbose", action = "count", default = 0, help = "Increases verbosity. Can be specified multiple times to increase.")
-	mc.register("purge", "Purge the document cache", genparser, action = ActionPurge)
+	mc.register("purge", "Purge the document cache", genparser, action = "pyradium.ActionPurge:ActionPurge")
+
+	def genparser(parser):
+		parser.add_argument("--max-size", metavar = "size", help = "For 'gc', evict least recently used entries until the cache is at most this large. Accepts suffixes like ki, Mi or Gi. Defaults to cache.max_size of the configuration file, if present.")
+		parser.add_argument("--max-age", metavar = "age", help = "For 'gc', evict all entries that have not been used for this amount of time. Accepts suffixes s, m, h, d or w. Defaults to cache.max_age of the configuration file, if present.")
+		parser.add_argument("-n", "--dry-run", action = "store_true", help = "For 'gc', only show what would be removed.")
+		parser.add_argument("--oldest", metavar = "count", type = int, default = 5, help = "For 'stats', show this many least recently used entries. Defaults to %(default)d.")
+		parser.add_argument("-v", "--verbose", action = "count", default = 0, help = "Increases verbosity. Can be specified multiple times to increase.")
+		parser.add_argument("subcommand", choices = [ "stats", "gc" ], help = "Show cache statistics or evict cache entries. Can be one of %(choices)s.")
+	mc.register("cache", "Show statistics about or garbage collect the renderer cache", genparser, action = "pyradium.ActionCache:ActionCache")
 
 	def genparser(parser):
 		parser.add_argument("-I", "--include-dir", metavar = "path", action = "append", default = [ ], help = "Specifies an additional include directory in which, for example, images are located which are referenced from the presentation. Can be issued multiple times.")
 		parser.add_argument("-v", "--verbose", action = "count", default = 0, help = "Increases verbosity. Can be specified multiple times to increase.")
 		parser.add_argument("infile", help = "Input XML file of the presentation.")
-	mc.register("hash", "Create a hash of a presentation and all dependencies to detect modifications", genparser, action = ActionHashPresentation)
+	mc.register("hash", "Create a hash of a presentation and all dependencies to detect modifications", genparser, action = "pyradium.ActionHashPresentation:ActionHashPresentation")
 
 	def genparser(parser):
 		parser.add_argument("-p", "--pretty-print", action = "store_true", help = "Pretty print the output JSON data.")
@@ -146,7 +167,7 @@ def main():
 		parser.add_argument("-o", "--outfile", metavar = "filename", default = "-", help = "Write JSON data to this file. May be '-' to write to stdout. Defaults to %(default)s.")
 		parser.add_argument("-v", "--verbose", action = "count", default = 0, help = "Increases verbosity. Can be specified multiple times to increase.")
 		parser.add_argument("infile", help = "Input XML file of the presentation.")
-	mc.register("dumpmeta", "Dump the metadata dictionary in JSON format", genparser, action = ActionDumpMetadata)
+	mc.register("dumpmeta", "Dump the metadata dictionary in JSON format", genparser, action = "pyradium.ActionDumpMetadata:ActionDumpMetadata")
 
 	def genparser(parser):
 		have_default_spellchecker = gc.has("spellcheck", "uri") or gc.has("spellcheck", "jar")
@@ -160,24 +181,24 @@ def main():
 		parser.add_argument("-f", "--force", action = "store_true", help = "Overwrite files if they already exist.")
 		parser.add_argument("-v", "--verbose", action = "count", default = 0, help = "Increases verbosity. Can be specified multiple times to increase.")
 		parser.add_argument("infile", help = "Input XML file of the presentation.")
-	mc.register("spellcheck", "Spellcheck an XML presentation file", genparser, action = ActionSpellcheck)
+	mc.register("spellcheck", "Spellcheck an XML presentation file", genparser, action = "pyradium.ActionSpellcheck:ActionSpellcheck")
 
 	def genparser(parser):
 		parser.add_argument("-v", "--verbose", action = "count", default = 0, help = "Increases verbosity. Can be specified multiple times to increase.")
 		parser.add_argument("infile", help = "Input file, needs to be a quickfix file in evim format.")
-	mc.register("dictadd", "Add false-positive spellcheck errors to the dictionary", genparser, action = ActionDictAdd)
+	mc.register("dictadd", "Add false-positive spellcheck errors to the dictionary", genparser, action = "pyradium.ActionDictAdd:ActionDictAdd")
 
 	def genparser(parser):
 		parser.add_argument("-v", "--verbose", action = "count", default = 0, help = "Increases verbosity. Can be specified multiple times to increase.")
 		parser.add_argument("template_name", help = "Name of the template to insert.")
-	mc.register("template-helper", "Show different templates on stdout; used in conjunction with vim plugins", genparser, action = ActionTemplateHelper)
-
-	standalone_commands = list(sorted(BaseStandaloneCommand.get_supported_cmd_list()))
-	if len(standalone_commands) > 0:
-		def genparser(parser):
-			parser.add_argument("subcommand", choices = standalone_commands, help = "Name of subcommand to call.")
-			parser.add_argument("params", nargs = argparse.REMAINDER, help = "Arguments for the respective sub-command.")
-		mc.register("standalone", "Run one of various standalong tools through sub-commands", genparser, action = ActionStandalone)
+	mc.register("template-helper", "Show different templates on stdout; used in conjunction with vim plugins", genparser, action = "pyradium.ActionTemplateHelper:ActionTemplateHelper")
+
+	def genparser(parser):
+		# Importing the sub-commands is deferred until the command is used
+		from .standalone.BaseStandaloneCommand import BaseStandaloneCommand
+		parser.add_argument("subcommand", choices = sorted(BaseStandaloneCommand.get_supported_cmd_list()), help = "Name of subcommand to call.")
+		parser.add_argument("params", nargs = argparse.REMAINDER, help = "Arguments for the respective sub-command.")
+	mc.register("standalone", "Run one of various standalong tools through sub-commands", genparser, action = "pyradium.ActionStandalone:ActionStandalone")
 
 	return mc.run(sys.argv[1:])
 
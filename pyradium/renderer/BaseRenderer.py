@@ -19,17 +19,36 @@
 #
 #	Johannes Bauer <JohannesBauer@gmx.de>
 
+import logging
+import importlib
 import collections
 from pyradium.RendererCache import RendererCache
-from pyradium.Exceptions import RendererRegistryException
+from pyradium.Tools import ImageTools
+from pyradium.Exceptions import RendererRegistryException, PyRadiumException
+
+_log = logging.getLogger(__spec__.name)
 
 class BaseRenderer():
 	RendererResult = collections.namedtuple("RendererResult", [ "key", "data" ])
 	_NAME = None
 	_CACHE = True
+	_BATCHABLE = False
 	_RENDERER_CLASSES = { }
 	_RENDERER_INSTANCES = { }
 
+	# Modules of the built-in renderers by name; they are only imported (and
+	# thereby register themselves) once the renderer is first instanciated
+	_BUILTIN_RENDERER_MODULES = {
+		"dtg":		"DigitalTimingDiagramRenderer",
+		"exec":		"ExecRenderer",
+		"graphviz":	"GraphvizRenderer",
+		"img":		"ImageRenderer",
+		"latex":	"LatexFormulaRenderer",
+		"plot":		"PlotRenderer",
+		"pngopt":	"PNGOptimizationRenderer",
+		"qrcode":	"QRCodeRenderer",
+	}
+
 	@property
 	def name(self):
 		if self._NAME is None:
@@ -43,12 +62,50 @@ class BaseRenderer():
 	def rendering_key(self, property_dict):
 		return None
 
+	def key_properties(self, property_dict):
+		# The properties that identify a rendered object in the cache, in case
+		# the property dict itself is unsuitable (e.g., contains large data)
+		return property_dict
+
+	@property
+	def batchable(self):
+		# Batchable renderers are significantly faster when rendering many
+		# objects at once through render_batch()
+		return self._BATCHABLE
+
 	def render(self, property_dict):
 		raise NotImplementedError(__class__.__name__)
 
+	@staticmethod
+	def _add_dimensions(image):
+		# Rendered raster images carry their size in pixels so that the <img>
+		# elements referring to them can reserve their space before loading
+		dimensions = ImageTools.get_raster_dimensions(image["img_data"])
+		if dimensions is not None:
+			(image["width"], image["height"]) = dimensions
+
+	def render_batch(self, property_dicts):
+		# Returns the rendered objects in order; objects that failed to render
+		# are None (their error resurfaces when they are rendered individually)
+		results = [ ]
+		for property_dict in property_dicts:
+			try:
+				results.append(self.render(property_dict))
+			except PyRadiumException as e:
+				_log.debug("Rendering of %s object failed: [%s] %s", self.name, e.__class__.__name__, str(e))
+				results.append(None)
+		return results
+
+	def close(self):
+		# Called after rendering is finished to release external resources
+		# (e.g., helper processes) which are kept during rendering
+		pass
+
 	@classmethod
 	def instanciate(cls, renderer_name, **kwargs):
 		if renderer_name not in cls._RENDERER_INSTANCES:
+			if (renderer_name not in cls._RENDERER_CLASSES) and (renderer_name in cls._BUILTIN_RENDERER_MODULES):
+				importlib.import_module(f"{__package__}.{cls._BUILTIN_RENDERER_MODULES[renderer_name]}")
 			if renderer_name not in cls._RENDERER_CLASSES:
 				raise RendererRegistryException(f"No renderer class registered for: {renderer_name}")
 			renderer_class = cls._RENDERER_CLASSES[renderer_name]
@@ -58,6 +115,14 @@ class BaseRenderer():
 			cls._RENDERER_INSTANCES[renderer_name] = instance
 		return cls._RENDERER_INSTANCES[renderer_name]
 
+	@classmethod
+	def builtin_renderer_names(cls):
+		return cls._BUILTIN_RENDERER_MODULES.keys()
+
+	@classmethod
+	def instances(cls):
+		return iter(cls._RENDERER_INSTANCES.values())
+
 	@classmethod
 	def register(cls, renderer_class):
 		if renderer_class._NAME is None:
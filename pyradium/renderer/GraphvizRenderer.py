@@ -21,7 +21,7 @@
 
 import logging
 import subprocess
-from pyradium.Tools import HashTools
+from pyradium.Tools import HashTools, ImageTools
 from .BaseRenderer import BaseRenderer
 
 _log = logging.getLogger(__spec__.name)
@@ -33,7 +33,7 @@ class GraphvizRenderer(BaseRenderer):
 	@property
 	def properties(self):
 		return {
-			"version":			1,
+			"version":			2,
 		}
 
 	def _render_plot_png(self, src, scale):
@@ -53,10 +53,17 @@ class GraphvizRenderer(BaseRenderer):
 		src = property_dict["src"]
 		scale = float(property_dict.get("scale", "1"))
 		img_data = self._render_plot_png(src, scale)
+		if "max_dimension" in property_dict:
+			# The size of a graph is only known after rendering it, render it
+			# again at a lower resolution if it exceeds the maximum dimension
+			dimensions = ImageTools.get_raster_dimensions(img_data)
+			if (dimensions is not None) and (max(dimensions) > property_dict["max_dimension"]):
+				img_data = self._render_plot_png(src, scale * property_dict["max_dimension"] / max(dimensions))
 		image = {
 			"extension":	"png",
 			"img_data":		img_data,
 		}
+		self._add_dimensions(image)
 		return image
 
 if __name__ == "__main__":
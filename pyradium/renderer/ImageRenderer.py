@@ -21,12 +21,16 @@
 
 import logging
 import tempfile
+import concurrent.futures
 import mimetypes
 import subprocess
 from pysvgedit import SVGDocument, FormatTextTransformation
 from pyradium.CmdlineEscape import CmdlineEscape
+from pyradium.InkscapeShell import InkscapeShellPool
+from pyradium.GlobalConfig import GlobalConfig
 from pyradium.Tools import ImageTools, HashTools
-from pyradium.Exceptions import UsageException, ImageRenderingException
+from pyradium.Enums import ImageFormat
+from pyradium.Exceptions import UsageException, ImageRenderingException, InkscapeShellException, PyRadiumException
 from .BaseRenderer import BaseRenderer
 
 _log = logging.getLogger(__spec__.name)
@@ -34,30 +38,69 @@ _log = logging.getLogger(__spec__.name)
 @BaseRenderer.register
 class ImageRenderer(BaseRenderer):
 	_NAME = "img"
+	_OUTPUT_FORMATS = {
+		ImageFormat.WebP:	{ "extension": "webp", "mimetype": "image/webp", "quality": 90 },
+		ImageFormat.AVIF:	{ "extension": "avif", "mimetype": "image/avif", "quality": 70 },
+	}
+
+	def __init__(self):
+		# Exporting through persistent Inkscape shells is opt-in
+		# ("inkscape": { "shell": true } in the global configuration) until the
+		# shell protocol has been proven with all supported Inkscape versions
+		self._inkscape_pool = InkscapeShellPool(enabled = GlobalConfig.read().get("inkscape", "shell") is True)
 
 	@property
 	def properties(self):
 		return {
-			"version":			1,
+			"version":			3,
 		}
 
+	def _svg_is_landscape(self, content, filename):
+		# Only for SVGs that do not specify their size in absolute terms is
+		# the image actually rendered to determine it
+		dimensions = ImageTools.get_svg_dimensions(content)
+		if dimensions is None:
+			_log.debug("Unable to determine SVG dimensions from document, rendering it to determine size: %s", filename)
+			svg_info = ImageTools.get_image_info(filename)
+			dimensions = (svg_info["image"]["geometry"]["width"], svg_info["image"]["geometry"]["height"])
+		return dimensions[0] > dimensions[1]
+
 	def _render_raw_svg(self, content, max_dimension, svg_transform = None):
 		with tempfile.NamedTemporaryFile(prefix = "pyradium_img_", suffix = ".svg", mode = "wb") as input_file, tempfile.NamedTemporaryFile(prefix = "pyradium_img_", suffix = ".png") as output_file:
 			input_file.write(content)
 			input_file.flush()
 
-			svg_info = ImageTools.get_image_info(input_file.name)
-			if svg_info["image"]["geometry"]["width"] > svg_info["image"]["geometry"]["height"]:
+			if self._svg_is_landscape(content, input_file.name):
 				scale_param = "-w"
 			else:
 				scale_param = "-h"
-			cmd = [ "inkscape", "-o", output_file.name, scale_param, str(max_dimension), input_file.name ]
-			_log.debug("Rendering SVG: %s", CmdlineEscape().cmdline(cmd))
-			subprocess.check_call(cmd, stdout = _log.subproc_target, stderr = _log.subproc_target)
+			self._inkscape_export(input_file.name, output_file.name, scale_param, max_dimension)
 			extension = "png"
 			img_data = output_file.read()
 		return (extension, img_data)
 
+	def _inkscape_export(self, svg_filename, png_filename, scale_param, max_dimension):
+		# Exporting through a persistent Inkscape shell avoids the startup
+		# cost of Inkscape for every single image; if that is disabled or not
+		# possible, run one Inkscape process per image.
+		if self._inkscape_pool.available:
+			try:
+				if scale_param == "-w":
+					self._inkscape_pool.export_png(svg_filename, png_filename, width = max_dimension)
+				else:
+					self._inkscape_pool.export_png(svg_filename, png_filename, height = max_dimension)
+				_log.debug("Rendered SVG %s using Inkscape shell", svg_filename)
+				return
+			except InkscapeShellException as e:
+				_log.debug("Exporting SVG using Inkscape shell failed, falling back to separate process: %s", str(e))
+
+		cmd = [ "inkscape", "-o", png_filename, scale_param, str(max_dimension), svg_filename ]
+		_log.debug("Rendering SVG: %s", CmdlineEscape().cmdline(cmd))
+		try:
+			subprocess.check_call(cmd, stdout = _log.subproc_target, stderr = _log.subproc_target)
+		except (subprocess.CalledProcessError, FileNotFoundError) as e:
+			raise ImageRenderingException(f"Failed to render {svg_filename} while trying to execute: {CmdlineEscape().cmdline(cmd)}") from e
+
 	def _dict_to_svg_transform(self, svg_doc, transform_dict):
 		if transform_dict["cmd"] == "format_text":
 			return FormatTextTransformation(svg_doc, template_vars = transform_dict["variables"])
@@ -98,6 +141,42 @@ class ImageRenderer(BaseRenderer):
 		}[mimetype]
 		return (extension, content)
 
+	def _reencode(self, image, output_format, fallback = False):
+		# PNG and JPEG images are re-encoded using ImageMagick. When the
+		# re-encoded image is not any smaller or ImageMagick cannot write the
+		# format, the original is kept. With a fallback, the re-encoded image
+		# becomes an additional source and the original remains for browsers
+		# that do not support the format.
+		encoding = self._OUTPUT_FORMATS[output_format]
+		with tempfile.NamedTemporaryFile(prefix = "pyradium_img_", suffix = "." + image["extension"]) as input_file, tempfile.NamedTemporaryFile(prefix = "pyradium_img_", suffix = "." + encoding["extension"]) as output_file:
+			input_file.write(image["img_data"])
+			input_file.flush()
+
+			cmd = [ "convert", input_file.name, "-quality", str(encoding["quality"]), output_file.name ]
+			_log.debug("Re-encoding image: %s", CmdlineEscape().cmdline(cmd))
+			try:
+				subprocess.check_call(cmd, stdout = _log.subproc_target, stderr = _log.subproc_target)
+			except (subprocess.CalledProcessError, FileNotFoundError) as e:
+				_log.warning("Failed to re-encode image as %s, keeping %s: %s", encoding["extension"], image["extension"], str(e))
+				return image
+			img_data = output_file.read()
+
+		if len(img_data) >= len(image["img_data"]):
+			_log.debug("Re-encoding image as %s does not make it smaller (%d bytes instead of %d bytes), keeping %s", encoding["extension"], len(img_data), len(image["img_data"]), image["extension"])
+			return image
+
+		image["original_size"] = len(image["img_data"])
+		if fallback:
+			image["sources"] = [ {
+				"extension":	encoding["extension"],
+				"mimetype":		encoding["mimetype"],
+				"img_data":		img_data,
+			} ]
+		else:
+			image["extension"] = encoding["extension"]
+			image["img_data"] = img_data
+		return image
+
 	def rendering_key(self, property_dict):
 		if "src" in property_dict:
 			# Specification as filename
@@ -146,8 +225,28 @@ class ImageRenderer(BaseRenderer):
 			"extension":	extension,
 			"img_data":		img_data,
 		}
+		self._add_dimensions(image)
+		output_format = ImageFormat(property_dict.get("output_format", ImageFormat.Original.value))
+		if (output_format != ImageFormat.Original) and (extension != "gif"):
+			image = self._reencode(image, output_format, fallback = property_dict.get("fallback", False))
 		return image
 
+	def _render_or_none(self, property_dict):
+		try:
+			return self.render(property_dict)
+		except PyRadiumException as e:
+			_log.debug("Rendering of %s object failed: [%s] %s", self.name, e.__class__.__name__, str(e))
+			return None
+
+	def render_batch(self, property_dicts):
+		# Distribute the images (e.g., all frames of an animation) over the
+		# Inkscape shells
+		with concurrent.futures.ThreadPoolExecutor(max_workers = self._inkscape_pool.max_shells) as executor:
+			return list(executor.map(self._render_or_none, property_dicts))
+
+	def close(self):
+		self._inkscape_pool.close()
+
 if __name__ == "__main__":
 	from pyradium.RendererCache import RendererCache
 	renderer = RendererCache(ImageRenderer())
@@ -19,32 +19,47 @@
 #
 #	Johannes Bauer <JohannesBauer@gmx.de>
 
+import os
 import json
 import tempfile
 import subprocess
 import logging
 import collections
 from pyradium.CmdlineEscape import CmdlineEscape
-from pyradium.Exceptions import InvalidTeXException, ImageRenderingException
+from pyradium.Exceptions import InvalidTeXException, ImageRenderingException, MalformedImageException
 from .BaseRenderer import BaseRenderer
 
 _log = logging.getLogger(__spec__.name)
 
+# Single formulas and batches are typeset from the same document so that a
+# formula renders identically regardless of the path it took; every formula is
+# on its own page, tightly cropped with a 1mm border
 _TEX_TEMPLATE = r"""
-\documentclass[preview,border=1mm,varwidth=true]{standalone}
+\documentclass{article}
 \usepackage[utf8]{inputenc}
 \usepackage[T1]{fontenc}
 \usepackage{lmodern}
 \usepackage{amsmath}
 \usepackage{amssymb}
+\usepackage{varwidth}
+\usepackage[active,tightpage]{preview}
+\setlength\PreviewBorder{1mm}
+\pagestyle{empty}
 \begin{document}
 %(content)s
 \end{document}
 """
 
+_TEX_PAGE_TEMPLATE = r"""
+\begin{preview}\begin{varwidth}{\linewidth}
+%(content)s
+\end{varwidth}\end{preview}
+"""
+
 @BaseRenderer.register
 class LatexFormulaRenderer(BaseRenderer):
 	_NAME = "latex"
+	_BATCHABLE = True
 	_Baseline = collections.namedtuple("Baseline", [ "image_width", "image_height", "upper", "lower", "mid" ])
 
 	def __init__(self, rendering_dpi = 600):
@@ -55,10 +70,31 @@ class LatexFormulaRenderer(BaseRenderer):
 	@property
 	def properties(self):
 		return {
-			"version":			3,
+			"version":			6,
 			"rendering_dpi":	self._rendering_dpi,
 		}
 
+	@property
+	def _left_crop_pixel(self):
+		# Crop 3mm off the left side (1mm baseline bar + 2mm space)
+		return round((3 / 25.4) * self._rendering_dpi)
+
+	@property
+	def _left_crop_pixel_safe(self):
+		return round((2 / 25.4) * self._rendering_dpi)
+
+	@property
+	def _eval_baseline_at_x(self):
+		return round((0.5 / 25.4) * self._rendering_dpi)
+
+	def _formula_content(self, property_dict):
+		baseline = r"\rule{1mm}{1pt} \hspace{2mm}"
+		if property_dict.get("long", False):
+			formula = r"\[" + baseline + property_dict["formula"] + r" \]"
+		else:
+			formula = r"$" + baseline + property_dict["formula"] + r"$"
+		return _TEX_PAGE_TEMPLATE % { "content": formula }
+
 	def _get_baseline_info(self, png_filename, xoffset):
 		# Need 2 pixel wide sample so that ImageMagick does not return an empty image
 		crop_info = json.loads(subprocess.check_output([ "convert", "%s[2x+%d+0]" % (png_filename, xoffset), "-trim", "json:-" ]))
@@ -73,93 +109,170 @@ class LatexFormulaRenderer(BaseRenderer):
 		baseline_y_from_top = round((upper_baseline_y_from_top + 7 * lower_baseline_y_from_top) / 8)
 		return self._Baseline(image_width = image_width, image_height = image_height, upper = upper_baseline_y_from_top, lower = lower_baseline_y_from_top, mid = baseline_y_from_top)
 
-	def render(self, property_dict):
-		with tempfile.TemporaryDirectory(prefix = "pyradium_formula_") as tex_dir:
-			# Formula to PDF first using pdflatex
-			tex_filename = tex_dir + "/formula.tex"
-			pdf_filename = tex_dir + "/formula.pdf"
-			png_filename = tex_dir + "/formula.png"
-			gs_png_filename = tex_dir + "/formula_ghostscript.png"
-
-			# Crop 3mm off the left side (1mm baseline bar + 2mm space)
-			baseline = r"\rule{1mm}{1pt} \hspace{2mm}"
-			left_crop_pixel = round((3 / 25.4) * self._rendering_dpi)
-			left_crop_pixel_safe = round((2 / 25.4) * self._rendering_dpi)
-			eval_baseline_at_x = round((0.5 / 25.4) * self._rendering_dpi)
-
-			if property_dict.get("long", False):
-				content = r"\[" + baseline + property_dict["formula"] + r" \]"
-			else:
-				content = r"$" + baseline + property_dict["formula"] + r"$"
-			with open(tex_filename, "w") as tex_file:
-				tex_file.write(_TEX_TEMPLATE % { "content": content })
-			_log.debug("Rendering TeX formula: %s in directory %s", content, tex_dir)
-			try:
-				subprocess.check_call([ "pdflatex", "-interaction=nonstopmode", "-output-directory=%s" % (tex_dir), tex_filename ], stdout = _log.subproc_target, stderr = _log.subproc_target)
-			except subprocess.CalledProcessError as e:
-				raise InvalidTeXException(f"Invalid TeX in source: {property_dict['formula']}") from e
-
-			# Then render the PDF to PNG using Ghostscript. ImageMagick's
-			# default system policy in policy.xml refuses to perform this
-			# conversion for us and if we preload a custom temporary policy
-			# file using MAGICK_CONFIGURE_PATH, it still takes the most
-			# restrictive of the union of all policy files.
-			cmd = [ "gs", "-dSAFER", f"-r{self._rendering_dpi}", "-sDEVICE=pngalpha", f"-o{gs_png_filename}", pdf_filename ]
-			_log.trace("Converting PDF to PNG in %d dpi: %s", self._rendering_dpi, CmdlineEscape().cmdline(cmd))
-			try:
-				subprocess.check_call(cmd, stdout = _log.subproc_target, stderr = _log.subproc_target)
-			except subprocess.CalledProcessError as e:
-				raise ImageRenderingException(f"Rasterizing of PDF to PNG failed for TeX formula \"{property_dict['formula']}\" attempting to run: {CmdlineEscape().cmdline(cmd)}") from e
+	def postprocess_imagemagick(self, gs_png_filename, property_dict):
+		# Trim the Ghostscript-rendered formula using ImageMagick, determine
+		# the baseline from the extent of the baseline rule on the left side
+		# and finally crop off the rule.
+		png_filename = gs_png_filename + ".trim.png"
+		left_crop_pixel_safe = self._left_crop_pixel_safe
+		cmd = [ "convert", "-define", "profile:skip=ICC", "-trim", "+repage", gs_png_filename, png_filename ]
+		_log.trace("Cropping Ghostscript-rendered image: %s", CmdlineEscape().cmdline(cmd))
+		try:
+			subprocess.check_call(cmd, stdout = _log.subproc_target, stderr = _log.subproc_target)
+		except subprocess.CalledProcessError as e:
+			raise ImageRenderingException(f"Croping of PNG image failed for TeX formula \"{property_dict['formula']}\" attempting to run: {CmdlineEscape().cmdline(cmd)}") from e
 
-			cmd = [ "convert", "-define", "profile:skip=ICC", "-trim", "+repage", gs_png_filename, png_filename ]
-			_log.trace("Cropping Ghostscript-rendered image: %s", CmdlineEscape().cmdline(cmd))
-			try:
-				subprocess.check_call(cmd, stdout = _log.subproc_target, stderr = _log.subproc_target)
-			except subprocess.CalledProcessError as e:
-				raise ImageRenderingException(f"Croping of PNG image failed for TeX formula \"{property_dict['formula']}\" attempting to run: {CmdlineEscape().cmdline(cmd)}") from e
+		_log.trace("Crop on left side: %d (choosing %d to be on safe side); evaluating baseline at x = %d; filename %s", self._left_crop_pixel, left_crop_pixel_safe, self._eval_baseline_at_x, png_filename)
+		baseline = self._get_baseline_info(png_filename, self._eval_baseline_at_x)
+		_log.trace("Baseline Y from top %d px upper, %d px lower, %d px mid (equals %d px mid from bottom)", baseline.upper, baseline.lower, baseline.mid, baseline.image_height - baseline.mid)
+
+		# Then crop the image finally and capture cropping metadata along the way
+		crop_meta = json.loads(subprocess.check_output([ "convert", "-crop", "+%d+0" % (left_crop_pixel_safe), "-trim", png_filename, "json:-" ]))[0]
+		cmd = [ "convert", "-crop", "+%d+0" % (left_crop_pixel_safe), "-trim", "+repage", "-strip", png_filename, "png:-" ]
+		try:
+			png_data = subprocess.check_output(cmd)
+		except subprocess.CalledProcessError as e:
+			raise ImageRenderingException(f"Postprocessing rendered formula PNG failed for TeX formula: {property_dict['formula']}") from e
+		_log.trace("Final crop to output size: %s", CmdlineEscape().cmdline(cmd))
+		_log.trace("Crop upper left corner is at %d, %d and cropped size is %d x %d px", crop_meta["image"]["pageGeometry"]["x"], crop_meta["image"]["pageGeometry"]["y"], crop_meta["image"]["geometry"]["width"], crop_meta["image"]["geometry"]["height"])
+
+		# Compute the shifted baseline in the cropped image
+		baseline_from_top_cropped = baseline.mid - crop_meta["image"]["pageGeometry"]["y"]
+		baseline_from_bottom_cropped = crop_meta["image"]["geometry"]["height"] - baseline_from_top_cropped
+		_log.trace("Adapted baseline offsets for cropped image: %d px from top (equals %d px from bottom).", baseline_from_top_cropped, baseline_from_bottom_cropped)
+		return {
+			"png_data":	png_data,
+			"info": {
+				"width": crop_meta["image"]["geometry"]["width"],
+				"height": crop_meta["image"]["geometry"]["height"],
+				"baseline": baseline_from_bottom_cropped,
+			},
+		}
 
-			_log.trace("Crop on left side: %d (choosing %d to be on safe side); evaluating baseline at x = %d; filename %s", left_crop_pixel, left_crop_pixel_safe, eval_baseline_at_x, png_filename)
-			baseline = self._get_baseline_info(png_filename, eval_baseline_at_x)
-			_log.trace("Baseline Y from top %d px upper, %d px lower, %d px mid (equals %d px mid from bottom)", baseline.upper, baseline.lower, baseline.mid, baseline.image_height - baseline.mid)
+	def postprocess(self, image, property_dict):
+		# In-process equivalent of postprocess_imagemagick(). It is not used
+		# for rendering until scripts/benchmark_formula_metrics has shown
+		# identical results on a formula corpus.
+		try:
+			image = image.trim()
+		except MalformedImageException as e:
+			raise ImageRenderingException(f"Rendered TeX formula is empty: {property_dict['formula']}") from e
 
-			# Then crop the image finally and capture cropping metadata along the way
-			crop_meta = json.loads(subprocess.check_output([ "convert", "-crop", "+%d+0" % (left_crop_pixel_safe), "-trim", png_filename, "json:-" ]))[0]
-			cmd = [ "convert", "-crop", "+%d+0" % (left_crop_pixel_safe), "-trim", "+repage", "-strip", png_filename, "png:-" ]
+		baseline_bbox = image.alpha_bounding_box(x = self._eval_baseline_at_x, width = 2)
+		crop_bbox = image.alpha_bounding_box(x = self._left_crop_pixel_safe)
+		if (baseline_bbox is None) or (crop_bbox is None):
+			raise ImageRenderingException(f"Unable to determine baseline of rendered TeX formula: {property_dict['formula']}")
+		(upper_baseline_y_from_top, lower_baseline_y_from_top) = (baseline_bbox[1], baseline_bbox[3])
+		baseline_y_from_top = round((upper_baseline_y_from_top + 7 * lower_baseline_y_from_top) / 8)
+
+		(x0, y0, x1, y1) = crop_bbox
+		cropped_image = image.crop(x0, y0, x1 - x0, y1 - y0)
+		baseline_from_top_cropped = baseline_y_from_top - y0
+		baseline_from_bottom_cropped = cropped_image.height - baseline_from_top_cropped
+		_log.trace("Baseline Y from top %d px upper, %d px lower, %d px mid; cropped image %d x %d px, baseline %d px from bottom", upper_baseline_y_from_top, lower_baseline_y_from_top, baseline_y_from_top, cropped_image.width, cropped_image.height, baseline_from_bottom_cropped)
+		return {
+			"png_data":	cropped_image.to_png_data(),
+			"info": {
+				"width": cropped_image.width,
+				"height": cropped_image.height,
+				"baseline": baseline_from_bottom_cropped,
+			},
+		}
+
+	def _rasterize_batch(self, property_dicts, tex_dir):
+		# Typesets all formulas in one document and rasterizes it using
+		# Ghostscript, returns the filenames of the uncropped PNG pages
+		tex_filename = tex_dir + "/formulas.tex"
+		pdf_filename = tex_dir + "/formulas.pdf"
+		content = "".join(self._formula_content(property_dict) for property_dict in property_dicts)
+		with open(tex_filename, "w") as tex_file:
+			tex_file.write(_TEX_TEMPLATE % { "content": content })
+		_log.debug("Rendering batch of %d TeX formulas in directory %s", len(property_dicts), tex_dir)
+		try:
+			subprocess.check_call([ "pdflatex", "-interaction=nonstopmode", "-output-directory=%s" % (tex_dir), tex_filename ], stdout = _log.subproc_target, stderr = _log.subproc_target)
+		except subprocess.CalledProcessError as e:
+			raise InvalidTeXException(f"Invalid TeX in batch of {len(property_dicts)} formulas.") from e
+
+		# Rasterize all pages in one Ghostscript invocation
+		cmd = [ "gs", "-dSAFER", f"-r{self._rendering_dpi}", "-sDEVICE=pngalpha", f"-o{tex_dir}/page_%d.png", pdf_filename ]
+		_log.trace("Converting PDF to PNG in %d dpi: %s", self._rendering_dpi, CmdlineEscape().cmdline(cmd))
+		try:
+			subprocess.check_call(cmd, stdout = _log.subproc_target, stderr = _log.subproc_target)
+		except subprocess.CalledProcessError as e:
+			raise ImageRenderingException(f"Rasterizing of PDF to PNG failed for batch of {len(property_dicts)} TeX formulas attempting to run: {CmdlineEscape().cmdline(cmd)}") from e
+
+		page_count = len([ filename for filename in os.listdir(tex_dir) if filename.startswith("page_") and filename.endswith(".png") ])
+		if page_count != len(property_dicts):
+			raise ImageRenderingException(f"Rendering batch of {len(property_dicts)} TeX formulas resulted in {page_count} pages.")
+		return [ f"{tex_dir}/page_{page_no}.png" for page_no in range(1, len(property_dicts) + 1) ]
+
+	def render_batch(self, property_dicts):
+		with tempfile.TemporaryDirectory(prefix = "pyradium_formulas_") as tex_dir:
 			try:
-				png_data = subprocess.check_output(cmd)
-			except subprocess.CalledProcessError as e:
-				raise ImageRenderingException(f"Postprocessing rendered formula PNG failed for TeX formula: {property_dict['formula']}") from e
-			_log.trace("Final crop to output size: %s", CmdlineEscape().cmdline(cmd))
+				gs_png_filenames = self._rasterize_batch(property_dicts, tex_dir)
+			except (InvalidTeXException, ImageRenderingException) as e:
+				# A single broken formula spoils the whole batch; render them one
+				# by one instead so that all others still get cached
+				_log.debug("Batch rendering of TeX formulas failed, rendering individually: [%s] %s", e.__class__.__name__, str(e))
+				return super().render_batch(property_dicts)
+
+			results = [ ]
+			for (property_dict, gs_png_filename) in zip(property_dicts, gs_png_filenames):
+				try:
+					results.append(self.postprocess_imagemagick(gs_png_filename, property_dict))
+				except (ImageRenderingException, subprocess.CalledProcessError) as e:
+					_log.debug("Post-processing of batch rendered TeX formula failed: %s", str(e))
+					results.append(None)
+			return results
+
+	def rasterize(self, property_dict, tex_dir):
+		# Typesets a single formula and rasterizes it using Ghostscript,
+		# returns the filename of the uncropped PNG
+		tex_filename = tex_dir + "/formula.tex"
+		pdf_filename = tex_dir + "/formula.pdf"
+		gs_png_filename = tex_dir + "/formula_ghostscript.png"
+
+		content = self._formula_content(property_dict)
+		with open(tex_filename, "w") as tex_file:
+			tex_file.write(_TEX_TEMPLATE % { "content": content })
+		_log.debug("Rendering TeX formula: %s in directory %s", content, tex_dir)
+		try:
+			subprocess.check_call([ "pdflatex", "-interaction=nonstopmode", "-output-directory=%s" % (tex_dir), tex_filename ], stdout = _log.subproc_target, stderr = _log.subproc_target)
+		except subprocess.CalledProcessError as e:
+			raise InvalidTeXException(f"Invalid TeX in source: {property_dict['formula']}") from e
+
+		# Then render the PDF to PNG using Ghostscript. ImageMagick's
+		# default system policy in policy.xml refuses to perform this
+		# conversion for us and if we preload a custom temporary policy
+		# file using MAGICK_CONFIGURE_PATH, it still takes the most
+		# restrictive of the union of all policy files.
+		cmd = [ "gs", "-dSAFER", f"-r{self._rendering_dpi}", "-sDEVICE=pngalpha", f"-o{gs_png_filename}", pdf_filename ]
+		_log.trace("Converting PDF to PNG in %d dpi: %s", self._rendering_dpi, CmdlineEscape().cmdline(cmd))
+		try:
+			subprocess.check_call(cmd, stdout = _log.subproc_target, stderr = _log.subproc_target)
+		except subprocess.CalledProcessError as e:
+			raise ImageRenderingException(f"Rasterizing of PDF to PNG failed for TeX formula \"{property_dict['formula']}\" attempting to run: {CmdlineEscape().cmdline(cmd)}") from e
+		return gs_png_filename
+
+	def render(self, property_dict):
+		with tempfile.TemporaryDirectory(prefix = "pyradium_formula_") as tex_dir:
+			gs_png_filename = self.rasterize(property_dict, tex_dir)
+			image = self.postprocess_imagemagick(gs_png_filename, property_dict)
+
 			if _log.isEnabledFor(logging.SINGLESTEP):
-				with open(tex_dir + "/processed_01_crop_meta.json", "w") as f:
-					json.dump(crop_meta, f, indent = 4, sort_keys = True)
+				with open(tex_dir + "/processed_01_info.json", "w") as f:
+					json.dump(image["info"], f, indent = 4, sort_keys = True)
 				with open(tex_dir + "/processed_01_cropped.png", "wb") as f:
-					f.write(png_data)
-
-			_log.trace("Crop upper left corner is at %d, %d and cropped size is %d x %d px", crop_meta["image"]["pageGeometry"]["x"], crop_meta["image"]["pageGeometry"]["y"], crop_meta["image"]["geometry"]["width"], crop_meta["image"]["geometry"]["height"])
+					f.write(image["png_data"])
 
 			# For debugging purposes, draw the baseline on the image
 			if self._debug_draw_baselines:
-				cmd = [ "convert", "-stroke", "red", "-draw", "line 0,%d %d,%d" % (baseline.mid, crop_meta["image"]["geometry"]["width"], baseline.mid) ]
+				baseline_y_from_top = image["info"]["height"] - image["info"]["baseline"]
+				cmd = [ "convert", "-stroke", "red", "-draw", "line 0,%d %d,%d" % (baseline_y_from_top, image["info"]["width"], baseline_y_from_top) ]
 				cmd += [ "-", "png:-" ]
-				png_data = subprocess.check_output(cmd, input = png_data)
 				with open(tex_dir + "/processed_02_baseline.png", "wb") as f:
-					f.write(png_data)
-
-			# Compute the shifted baseline in the cropped image
-			baseline_from_top_cropped = baseline.mid - crop_meta["image"]["pageGeometry"]["y"]
-			baseline_from_bottom_cropped = crop_meta["image"]["geometry"]["height"] - baseline_from_top_cropped
-			_log.trace("Adapted baseline offsets for cropped image: %d px from top (equals %d px from bottom).", baseline_from_top_cropped, baseline_from_bottom_cropped)
-
-			# Return an image object
-			image = {
-				"png_data":	png_data,
-				"info": {
-					"width": crop_meta["image"]["geometry"]["width"],
-					"height": crop_meta["image"]["geometry"]["height"],
-					"baseline": baseline_from_bottom_cropped,
-				},
-			}
+					f.write(subprocess.check_output(cmd, input = image["png_data"]))
+
 			if _log.isEnabledFor(logging.SINGLESTEP):
 				_log.singlestep("Interrupting execution.")
 				input("Press RETURN to continue...")
@@ -0,0 +1,104 @@
+#	pyradium - HTML presentation/slide show generator
+#	Copyright (C) 2026-2026 Johannes Bauer
+#
+#	This file is part of pyradium.
+#
+#	pyradium is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	pyradium is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with pyradium; if not, write to the Free Software
+#	Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+
+import shutil
+import logging
+import tempfile
+import subprocess
+from pyradium.CmdlineEscape import CmdlineEscape
+from pyradium.RasterImage import RasterImage
+from pyradium.Tools import HashTools
+from pyradium.Exceptions import MalformedImageException
+from .BaseRenderer import BaseRenderer
+
+_log = logging.getLogger(__spec__.name)
+
+@BaseRenderer.register
+class PNGOptimizationRenderer(BaseRenderer):
+	# Losslessly recompresses rendered PNG images. Dedicated optimizers are
+	# used if one is installed, otherwise the image is re-encoded in-process.
+	_NAME = "pngopt"
+	# The optimizers must keep the color management chunks (iCCP, sRGB, gAMA,
+	# cHRM), they change how an image is displayed
+	_EXTERNAL_OPTIMIZERS = {
+		"oxipng":		lambda input_filename, output_filename: [ "oxipng", "--quiet", "-o", "4", "--strip", "safe", "--out", output_filename, input_filename ],
+		"zopflipng":	lambda input_filename, output_filename: [ "zopflipng", "-y", "--keepchunks=iCCP,sRGB,gAMA,cHRM", input_filename, output_filename ],
+		"pngcrush":		lambda input_filename, output_filename: [ "pngcrush", "-q", "-rem", "text", "-rem", "time", "-rem", "phys", "-reduce", input_filename, output_filename ],
+	}
+
+	# Ancillary chunks the in-process optimizer may drop because they do not
+	# affect how browsers display the image
+	_DISPOSABLE_CHUNKS = set([ b"tEXt", b"zTXt", b"iTXt", b"tIME", b"pHYs", b"bKGD", b"sBIT", b"iDOT" ])
+
+	def __init__(self):
+		self._external_optimizer = next((name for name in self._EXTERNAL_OPTIMIZERS if shutil.which(name) is not None), None)
+
+	@property
+	def properties(self):
+		return {
+			"version":			2,
+			"optimizer":		self._external_optimizer,
+		}
+
+	def key_properties(self, property_dict):
+		return {
+			"png_hash":			HashTools.hash_data(property_dict["png_data"]),
+		}
+
+	def _optimize_external(self, png_data):
+		with tempfile.NamedTemporaryFile(prefix = "pyradium_png_", suffix = ".png") as input_file, tempfile.TemporaryDirectory(prefix = "pyradium_png_") as output_directory:
+			input_file.write(png_data)
+			input_file.flush()
+
+			output_filename = output_directory + "/optimized.png"
+			cmd = self._EXTERNAL_OPTIMIZERS[self._external_optimizer](input_file.name, output_filename)
+			_log.debug("Optimizing PNG: %s", CmdlineEscape().cmdline(cmd))
+			try:
+				subprocess.check_call(cmd, stdout = _log.subproc_target, stderr = _log.subproc_target)
+				with open(output_filename, "rb") as f:
+					return f.read()
+			except (subprocess.CalledProcessError, FileNotFoundError) as e:
+				_log.debug("Optimizing PNG using %s failed: %s", self._external_optimizer, str(e))
+				return None
+
+	def _optimize_internal(self, png_data):
+		try:
+			chunk_types = set(chunk_type for (chunk_type, chunk_data) in RasterImage.png_chunks(png_data))
+			if len(chunk_types - self._DISPOSABLE_CHUNKS - set([ b"IHDR", b"IDAT", b"IEND" ])) > 0:
+				# E.g., transparency or color space information
+				_log.debug("Not optimizing PNG with chunks %s in-process", ", ".join(sorted(chunk_type.decode("latin1") for chunk_type in chunk_types)))
+				return None
+			return RasterImage.from_png_data(png_data).to_optimized_png_data()
+		except MalformedImageException as e:
+			_log.debug("Not optimizing PNG in-process: %s", str(e))
+			return None
+
+	def render(self, property_dict):
+		png_data = property_dict["png_data"]
+		if self._external_optimizer is not None:
+			optimized_data = self._optimize_external(png_data)
+		else:
+			optimized_data = self._optimize_internal(png_data)
+		if (optimized_data is None) or (len(optimized_data) >= len(png_data)):
+			optimized_data = png_data
+		return {
+			"png_data":			optimized_data,
+		}
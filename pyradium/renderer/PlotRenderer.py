@@ -35,14 +35,17 @@ class PlotRenderer(BaseRenderer):
 	@property
 	def properties(self):
 		return {
-			"version":			1,
+			"version":			2,
 		}
 
-	def _render_plot_png(self, src, width, height):
+	def _render_plot_png(self, src, width, height, scale = None):
 		with open(src) as f:
 			source = f.read()
 		source = self._SET_TERMINAL_RE.sub("", source)
-		source = "set terminal pngcairo size %d,%d enhanced font 'Latin Modern Sans,24'\n" % (width, height) + source
+		terminal = "set terminal pngcairo size %d,%d enhanced font 'Latin Modern Sans,24'" % (width, height)
+		if scale is not None:
+			terminal += " fontscale %.3f linewidth %.3f" % (scale, scale)
+		source = terminal + "\n" + source
 		png_data = subprocess.check_output([ "gnuplot" ], input = source.encode("utf-8"), stderr = _log.subproc_target)
 		return png_data
 
@@ -64,11 +67,17 @@ class PlotRenderer(BaseRenderer):
 			width = max_dimension * aspect
 			height = max_dimension
 
-		img_data = self._render_plot_png(src, width, height)
+		if "reference_dimension" in property_dict:
+			# Downscaled rendition of a plot rendered at the reference size
+			scale = max_dimension / property_dict["reference_dimension"]
+		else:
+			scale = None
+		img_data = self._render_plot_png(src, width, height, scale = scale)
 		image = {
 			"extension":	"png",
 			"img_data":		img_data,
 		}
+		self._add_dimensions(image)
 		return image
 
 if __name__ == "__main__":
@@ -45,6 +45,33 @@ def _parse_frame_range(frame_range_str):
 	return frames
 
 class AnimationController(BaseController):
+	def _render_frames(self, filename, frame_count, selected_frames):
+		_log.trace("SVG animation from %s has %d frames, rasterizing %d of them.", filename, frame_count, len(selected_frames))
+		renderer = self.rendered_presentation.renderer.get_custom_renderer("img")
+
+		# All frames are rendered at once so they are distributed over
+		# multiple Inkscape shells; frames that failed are rendered again
+		# individually to report the error.
+		frame_property_dicts = [ {
+			"filetype":			"svg",
+			"value":			svg_frame,
+			"max_dimension":	self.rendered_presentation.renderer.rendering_params.image_max_dimension
+		} for svg_frame in selected_frames ]
+		additional_slide_var_list = [ ]
+		for (property_dict, rendered_image) in zip(frame_property_dicts, renderer.render_batch(frame_property_dicts)):
+			if rendered_image is None:
+				rendered_image = renderer.render(property_dict)
+			local_filename = f"imgs/anim/{rendered_image.keyhash}.{rendered_image.data['extension']}"
+			self.rendered_presentation.add_file(local_filename, rendered_image.data["img_data"])
+			slide_vars = {
+				"image": local_filename,
+			}
+			if "width" in rendered_image.data:
+				slide_vars["image_width"] = rendered_image.data["width"]
+				slide_vars["image_height"] = rendered_image.data["height"]
+			additional_slide_var_list.append(slide_vars)
+		return additional_slide_var_list
+
 	def render(self):
 		filename = self.slide.get_xml_slide_var("filename")
 		if filename is None:
@@ -68,30 +95,24 @@ class AnimationController(BaseController):
 
 		svg_doc = SVGDocument.readfile(full_filename)
 		svg_animation = SVGAnimation(svg_doc, animation_mode = animation_mode)
-		renderer = self.rendered_presentation.renderer.get_custom_renderer("img")
 
-		# TODO: we're including all files in the presentation even if we only
-		# need the last because we're collapsing the presentation
-		additional_slide_var_list = [ ]
-		for svg_frame in svg_animation:
-			rendered_image = renderer.render({
-				"filetype":			"svg",
-				"value":			svg_frame.asbytes(),
-				"max_dimension":	self.rendered_presentation.renderer.rendering_params.image_max_dimension
-			})
-			local_filename = f"imgs/anim/{rendered_image.keyhash}.{rendered_image.data['extension']}"
-			self.rendered_presentation.add_file(local_filename, rendered_image.data["img_data"])
-			additional_slide_var_list.append({
-				"image": local_filename,
-			})
+		# Only frames which end up in emitted slides are rasterized. Frames
+		# are still generated in order since each one is derived from the
+		# previous state of the document.
+		selected_frames = [ ]
+		frame_count = 0
+		for (frame_no, svg_frame) in enumerate(svg_animation, 1):
+			frame_count = frame_no
+			if (frame_range is None) or (frame_no in frame_range):
+				selected_frames.append(svg_frame.asbytes() if (not self.rendered_presentation.layout_only) else None)
+		if self.rendered_presentation.renderer.rendering_params.collapse_animation:
+			selected_frames = selected_frames[-1:]
 
-
-		if frame_range is not None:
-			filtered_slide_var_list = [ ]
-			for (frame_no, frame) in enumerate(additional_slide_var_list, 1):
-				if frame_no in frame_range:
-					filtered_slide_var_list.append(frame)
-			additional_slide_var_list = filtered_slide_var_list
+		if self.rendered_presentation.layout_only:
+			# Only the number of slides matters
+			additional_slide_var_list = [ { } for _ in selected_frames ]
+		else:
+			additional_slide_var_list = self._render_frames(filename, frame_count, selected_frames)
 
 		if len(additional_slide_var_list) == 0:
 			_log.warning("SVG animation from %s rendered into no slides.", filename)
@@ -99,5 +120,5 @@ class AnimationController(BaseController):
 			_log.debug("SVG animation from %s rendered into %d slides.", filename, len(additional_slide_var_list))
 		if not self.rendered_presentation.renderer.rendering_params.collapse_animation:
 			yield from self.slide.emit_nocontent_slide(self.rendered_presentation, self.content_containers, additional_slide_var_list)
-		else:
+		elif len(additional_slide_var_list) > 0:
 			yield from self.slide.emit_nocontent_slide(self.rendered_presentation, self.content_containers, additional_slide_var_list[-1])
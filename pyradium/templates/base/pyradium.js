@@ -44,6 +44,7 @@ export class Presentation {
 		};
 		this._enumerate_slides();
 		this._internal_slide_index = 0;
+		this._init_lazy_slides();
 		this._resize_obs = new ResizeObserver((event) => this.event_resize(event));
 		this._resize_obs.observe(this._ui_elements.full_screen_div);
 		this._intersect_obs = new IntersectionObserver((event) => this.event_scroll_in_viewport(event), {
@@ -128,6 +129,83 @@ export class Presentation {
 		});
 	}
 
+	_init_lazy_slides() {
+		/* With the "lazy" feature, the content of every slide is an inert
+		 * <template>. Only the current slide and a window of its neighbors
+		 * are attached to the document, distant ones are detached again so
+		 * that their images and SVGs are released. Slides that contain
+		 * scripts (e.g., feedback) are not wrapped and always attached. */
+		this._lazy_slides = Array.from(this._ui_elements.slides).some((slide) => this._slide_template(slide) != null);
+		this._lazy_window = this._parameters.lazy_window ?? 3;
+		this._attached_slides = new Set();
+		this._printing = false;
+		if (this._lazy_slides) {
+			window.addEventListener("beforeprint", () => this._attach_all_slides());
+			window.addEventListener("afterprint", () => {
+				this._printing = false;
+				this._update_attached_slides();
+			});
+			this._update_attached_slides();
+		}
+	}
+
+	_slide_template(slide) {
+		return slide.querySelector(":scope > template.slide_content");
+	}
+
+	_attach_slide(slide_index) {
+		if (this._attached_slides.has(slide_index)) {
+			return;
+		}
+		const slide = this._ui_elements.slides[slide_index];
+		const template = this._slide_template(slide);
+		if (template == null) {
+			return;
+		}
+		slide.append(template.content.cloneNode(true));
+		this._attached_slides.add(slide_index);
+		if (globalThis.MathJax?.typesetPromise != null) {
+			/* Slides attached after MathJax has started are not typeset by it */
+			MathJax.typesetPromise([ slide ]);
+		}
+	}
+
+	_detach_slide(slide_index) {
+		if (!this._attached_slides.has(slide_index)) {
+			return;
+		}
+		const slide = this._ui_elements.slides[slide_index];
+		slide.replaceChildren(this._slide_template(slide));
+		this._attached_slides.delete(slide_index);
+	}
+
+	_attach_all_slides() {
+		this._log("Attaching all slides for printing.");
+		this._printing = true;
+		for (let slide_index = 0; slide_index < this.slide_count; slide_index++) {
+			this._attach_slide(slide_index);
+		}
+	}
+
+	_update_attached_slides() {
+		if ((!this._lazy_slides) || this._printing) {
+			return;
+		}
+		const first_index = Math.max(0, this._internal_slide_index - this._lazy_window);
+		const last_index = Math.min(this.slide_count - 1, this._internal_slide_index + this._lazy_window);
+		for (let slide_index = first_index; slide_index <= last_index; slide_index++) {
+			this._attach_slide(slide_index);
+		}
+
+		/* Detach with hysteresis so that going back and forth does not
+		 * repeatedly attach the same slides */
+		for (const slide_index of Array.from(this._attached_slides)) {
+			if ((slide_index < first_index - this._lazy_window) || (slide_index > last_index + this._lazy_window)) {
+				this._detach_slide(slide_index);
+			}
+		}
+	}
+
 	_hide_full_screen_div() {
 		this._ui_elements.full_screen_div.style.display = "none";
 	}
@@ -210,6 +288,7 @@ export class Presentation {
 	}
 
 	_update(scroll_to_slide) {
+		this._update_attached_slides();
 		if (scroll_to_slide) {
 			this.current_slide.scrollIntoView();
 			if (this.current_slide.getBoundingClientRect().top < 1) {
@@ -0,0 +1,52 @@
+#	pyradium - HTML presentation/slide show generator
+#	Copyright (C) 2026-2026 Johannes Bauer
+#
+#	This file is part of pyradium.
+#
+#	pyradium is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	pyradium is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with pyradium; if not, write to the Free Software
+#	Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+
+import os
+import sys
+import argparse
+import unittest
+import subprocess
+from pyradium.__main__ import _positive_int, _dimension_list
+
+class CmdlineArgumentTests(unittest.TestCase):
+	def test_positive_int(self):
+		self.assertEqual(_positive_int("1"), 1)
+		self.assertEqual(_positive_int("16"), 16)
+		for text in [ "0", "-1", "x", "" ]:
+			with self.subTest(text = text), self.assertRaises(argparse.ArgumentTypeError):
+				_positive_int(text)
+
+	def test_dimension_list(self):
+		self.assertEqual(_dimension_list("480"), [ 480 ])
+		self.assertEqual(_dimension_list("960,480,960"), [ 480, 960 ])
+		for text in [ "0", "480,-1", "480,,960", "x", "" ]:
+			with self.subTest(text = text), self.assertRaises(argparse.ArgumentTypeError):
+				_dimension_list(text)
+
+	def test_jobs_rejected(self):
+		env = dict(os.environ)
+		env["PYTHONPATH"] = os.path.dirname(os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+		for option in [ "--jobs", "--template-jobs" ]:
+			for value in [ "0", "-2" ]:
+				with self.subTest(option = option, value = value):
+					result = subprocess.run([ sys.executable, "-m", "pyradium", "render", f"{option}={value}", "presentation.xml", "output" ], env = env, stdout = subprocess.DEVNULL, stderr = subprocess.PIPE, check = False)
+					self.assertEqual(result.returncode, 1)
+					self.assertIn(b"Must be at least 1", result.stderr)
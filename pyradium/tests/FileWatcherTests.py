@@ -0,0 +1,95 @@
+#	pyradium - HTML presentation/slide show generator
+#	Copyright (C) 2026-2026 Johannes Bauer
+#
+#	This file is part of pyradium.
+#
+#	pyradium is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	pyradium is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with pyradium; if not, write to the Free Software
+#	Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+
+import os
+import shutil
+import tempfile
+import unittest
+from pyradium.FileWatcher import FileWatcher, InotifyFileWatcher, PollingFileWatcher
+
+class FileWatcherTests(unittest.TestCase):
+	def setUp(self):
+		self._tempdir = tempfile.TemporaryDirectory(prefix = "pyradium_test_watcher_")
+		self._dirname = os.path.realpath(self._tempdir.name)
+		os.makedirs(self._dirname + "/include/sub")
+		os.makedirs(self._dirname + "/output")
+		self._write("presentation.xml")
+		self._write("unrelated.txt")
+		self._write("include/sub/image.svg")
+
+	def tearDown(self):
+		self._tempdir.cleanup()
+
+	def _write(self, filename, content = "foo"):
+		with open(self._dirname + "/" + filename, "w") as f:
+			f.write(content)
+
+	def _create_inotify_watcher(self):
+		try:
+			return InotifyFileWatcher(debounce_secs = 0.05)
+		except OSError as e:
+			self.skipTest(f"inotify not available: {str(e)}")
+
+	def _assert_watcher_reports_changes(self, watcher):
+		with watcher:
+			watcher.exclude(self._dirname + "/include/sub/output")
+			watcher.watch([ self._dirname + "/presentation.xml", self._dirname + "/include", self._dirname + "/nonexistent" ])
+			self.assertEqual(watcher.wait(timeout_secs = 0.1), set())
+
+			# Changes while not waiting must not be lost
+			self._write("presentation.xml", "bar")
+			self._write("unrelated.txt", "bar")
+			self._write("include/sub/image.svg", "bar")
+			self._write("include/sub/.presentation.xml.swp", "bar")
+			self.assertEqual(watcher.wait(timeout_secs = 5), set([ self._dirname + "/presentation.xml", self._dirname + "/include/sub/image.svg" ]))
+
+			# Newly created directories are watched as well, except for
+			# excluded ones
+			os.makedirs(self._dirname + "/include/sub/output")
+			os.makedirs(self._dirname + "/include/new")
+			self._write("include/sub/output/index.html", "bar")
+			self._write("include/new/data.json", "bar")
+			changed_paths = watcher.wait(timeout_secs = 5)
+			self.assertIn(self._dirname + "/include/new/data.json", changed_paths)
+			self.assertNotIn(self._dirname + "/include/sub/output/index.html", changed_paths)
+
+			self._write("include/new/data.json", "moo")
+			self.assertEqual(watcher.wait(timeout_secs = 5), set([ self._dirname + "/include/new/data.json" ]))
+
+			# A removed and recreated directory is watched again
+			shutil.rmtree(self._dirname + "/include")
+			self.assertIn(self._dirname + "/include/sub/image.svg", watcher.wait(timeout_secs = 5))
+			os.makedirs(self._dirname + "/include")
+			watcher.watch([ self._dirname + "/presentation.xml", self._dirname + "/include" ])
+			self._write("include/restored.svg", "bar")
+			self.assertIn(self._dirname + "/include/restored.svg", watcher.wait(timeout_secs = 5))
+			self._write("include/restored.svg", "moo")
+			self.assertEqual(watcher.wait(timeout_secs = 5), set([ self._dirname + "/include/restored.svg" ]))
+
+	def test_inotify(self):
+		self._assert_watcher_reports_changes(self._create_inotify_watcher())
+
+	def test_polling(self):
+		self._assert_watcher_reports_changes(PollingFileWatcher(debounce_secs = 0.05, poll_interval_secs = 0.05))
+
+	def test_create(self):
+		with FileWatcher.create() as watcher:
+			self.assertIsInstance(watcher, FileWatcher)
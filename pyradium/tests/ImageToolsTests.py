@@ -0,0 +1,68 @@
+#	pyradium - HTML presentation/slide show generator
+#	Copyright (C) 2026-2026 Johannes Bauer
+#
+#	This file is part of pyradium.
+#
+#	pyradium is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	pyradium is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with pyradium; if not, write to the Free Software
+#	Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+
+import struct
+import unittest
+from pyradium.Tools import ImageTools
+from pyradium.RasterImage import RasterImage
+
+class ImageToolsTests(unittest.TestCase):
+	def _assert_dimensions(self, svg_data, expected):
+		dimensions = ImageTools.get_svg_dimensions(svg_data.encode("utf-8"))
+		if expected is None:
+			self.assertIsNone(dimensions)
+		else:
+			self.assertIsNotNone(dimensions)
+			self.assertAlmostEqual(dimensions[0], expected[0])
+			self.assertAlmostEqual(dimensions[1], expected[1])
+
+	def test_absolute_dimensions(self):
+		self._assert_dimensions("<svg xmlns=\"http://www.w3.org/2000/svg\" width=\"300\" height=\"200\"><rect /></svg>", (300, 200))
+		self._assert_dimensions("<svg width=\"1in\" height=\"72pt\" viewBox=\"0 0 5 50\"/>", (96, 96))
+		self._assert_dimensions("<svg width=\"25.4mm\" height=\"2.54cm\"/>", (96, 96))
+		self._assert_dimensions("<svg width=\" 1.5e2px \" height=\"10pc\"/>", (150, 160))
+
+	def test_viewbox(self):
+		self._assert_dimensions("<?xml version=\"1.0\"?>\n<!-- comment -->\n<svg viewBox=\"0 0 200 100\"/>", (200, 100))
+		self._assert_dimensions("<svg width=\"100%\" height=\"100%\" viewBox=\"-10,-10,30,60\"/>", (30, 60))
+		self._assert_dimensions("<svg width=\"50\" viewBox=\"0 0 10 20\"/>", (50, 100))
+		self._assert_dimensions("<svg height=\"50\" viewBox=\"0 0 10 20\"/>", (25, 50))
+
+	def test_undeterminable(self):
+		self._assert_dimensions("<svg width=\"5em\" height=\"3\"/>", None)
+		self._assert_dimensions("<svg width=\"100%\"/>", None)
+		self._assert_dimensions("<svg viewBox=\"0 0 0 0\"/>", None)
+		self._assert_dimensions("no XML", None)
+		self._assert_dimensions("", None)
+
+	def test_raster_dimensions(self):
+		png_data = RasterImage(13, 7, 4, [ bytes(13 * 4) ] * 7).to_png_data()
+		self.assertEqual(ImageTools.get_raster_dimensions(png_data), (13, 7))
+		self.assertEqual(ImageTools.get_raster_dimensions(b"GIF89a" + struct.pack("<HH", 300, 20) + bytes(20)), (300, 20))
+
+		# JPEG with an APP0 and a DHT segment in front of the SOF2 segment
+		jpeg_data = b"\xff\xd8" + b"\xff\xe0" + struct.pack(">H", 16) + bytes(14) + b"\xff\xc4" + struct.pack(">H", 4) + bytes(2)
+		jpeg_data += b"\xff\xc2" + struct.pack(">HBHHB", 11, 8, 480, 640, 1) + bytes(3)
+		self.assertEqual(ImageTools.get_raster_dimensions(jpeg_data), (640, 480))
+
+		self.assertIsNone(ImageTools.get_raster_dimensions(b"\xff\xd8\xff\xe0\x00\x10"))
+		self.assertIsNone(ImageTools.get_raster_dimensions(b"<svg/>"))
+		self.assertIsNone(ImageTools.get_raster_dimensions(b""))
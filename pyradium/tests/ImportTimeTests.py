@@ -0,0 +1,102 @@
+#	pyradium - HTML presentation/slide show generator
+#	Copyright (C) 2026-2026 Johannes Bauer
+#
+#	This file is part of pyradium.
+#
+#	pyradium is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	pyradium is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with pyradium; if not, write to the Free Software
+#	Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+
+import os
+import sys
+import tempfile
+import unittest
+import subprocess
+
+class ImportTimeTests(unittest.TestCase):
+	# Subcommands only import what they need and must not pull in the whole
+	# rendering machinery; their import time is benchmarked in detail by
+	# scripts/benchmark_import_time. The budget is the import time on top of a
+	# bare interpreter and is several times what is measured (below 150ms) so
+	# that it only catches real regressions, not a loaded CI machine.
+	_IMPORT_BUDGET_MILLIS = 500
+	_IMPORT_BUDGET_RUNS = 3
+	_HEAVY_MODULES = [ "mako", "pygments", "requests", "lzstr", "pyradium.Renderer", "pyradium.Spellcheck", "pyradium.modify", "pyradium.renderer.ImageRenderer" ]
+	_LIGHTWEIGHT_COMMANDS = [ "purge", "cache", "acrotex", "template-helper", "hash", "dumpmeta" ]
+
+	def setUp(self):
+		self._tempdir = tempfile.TemporaryDirectory(prefix = "pyradium_test_importtime_")
+		self._dirname = self._tempdir.name
+		with open(self._dirname + "/presentation.xml", "w") as f:
+			print("<?xml version=\"1.0\" encoding=\"UTF-8\"?>", file = f)
+			print("<presentation xmlns:s=\"https://github.com/johndoe31415/pyradium\"><meta><title>Test</title></meta><slide><s:time rel=\"1\" />Text <s:tt>code</s:tt></slide></presentation>", file = f)
+		with open(self._dirname + "/acronyms.json", "w") as f:
+			print("{ \"ABC\": { \"text\": \"Alpha Bravo Charlie\" } }", file = f)
+
+	def tearDown(self):
+		self._tempdir.cleanup()
+
+	def _import_profile(self, *args):
+		# Returns a dictionary of all modules imported by the command, mapping
+		# the module name to its self import time in microseconds
+		env = dict(os.environ)
+		env["HOME"] = self._dirname
+		env["PYTHONPATH"] = os.path.dirname(os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+		result = subprocess.run([ sys.executable, "-X", "importtime" ] + list(args), cwd = self._dirname, env = env, stdout = subprocess.DEVNULL, stderr = subprocess.PIPE, check = True)
+		profile = { }
+		for line in result.stderr.decode("utf-8").split("\n"):
+			if line.startswith("import time:") and (not line.endswith("| imported package")):
+				(self_us, cumulative_us, module) = line[len("import time:"):].split("|")
+				profile[module.strip()] = int(self_us)
+		return profile
+
+	def _imported_modules(self, *args):
+		return set(self._import_profile(*args))
+
+	def _import_time_millis(self, *args):
+		return min(sum(self._import_profile(*args).values()) for _ in range(self._IMPORT_BUDGET_RUNS)) / 1000
+
+	def _command_args(self, command):
+		return {
+			"purge":			[ ],
+			"cache":			[ "stats" ],
+			"acrotex":			[ "acronyms.json" ],
+			"template-helper":	[ "slide_toc" ],
+			"hash":				[ "presentation.xml" ],
+			"dumpmeta":			[ "presentation.xml" ],
+		}[command]
+
+	def test_subcommand_imports(self):
+		for command in self._LIGHTWEIGHT_COMMANDS:
+			with self.subTest(command = command):
+				modules = self._imported_modules("-m", "pyradium", command, *self._command_args(command))
+				for heavy_module in self._HEAVY_MODULES:
+					self.assertNotIn(heavy_module, modules)
+
+	def test_hooks_imported_on_demand(self):
+		modules = self._imported_modules("-m", "pyradium", "hash", "presentation.xml")
+		self.assertNotIn("pyradium.xmlhooks.CodeHook", modules)
+		self.assertNotIn("pyradium.renderer.LatexFormulaRenderer", modules)
+
+	def test_subcommand_import_budget(self):
+		baseline = self._import_time_millis("-c", "pass")
+		for command in self._LIGHTWEIGHT_COMMANDS + [ "render" ]:
+			with self.subTest(command = command):
+				if command == "render":
+					args = [ "render", "--help" ]
+				else:
+					args = [ command ] + self._command_args(command)
+				import_time = self._import_time_millis("-m", "pyradium", *args) - baseline
+				self.assertLess(import_time, self._IMPORT_BUDGET_MILLIS)
@@ -0,0 +1,132 @@
+#	pyradium - HTML presentation/slide show generator
+#	Copyright (C) 2026-2026 Johannes Bauer
+#
+#	This file is part of pyradium.
+#
+#	pyradium is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	pyradium is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with pyradium; if not, write to the Free Software
+#	Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+import threading
+from pyradium.InkscapeShell import InkscapeShellPool
+from pyradium.Tools import ImageTools
+from pyradium.Exceptions import InkscapeShellException
+
+# Speaks the protocol of "inkscape --shell": writes its PID and the requested
+# dimensions as exported "image", fails for files named "broken.svg"
+_FAKE_INKSCAPE = """#!%(python)s
+import os, sys
+assert(sys.argv[1:] == [ "--shell" ])
+sys.stdout.write("Inkscape interactive shell mode.\\n> ")
+sys.stdout.flush()
+settings = { }
+for line in sys.stdin:
+	if line.strip() == "quit":
+		break
+	for action in line.strip().split("; "):
+		(name, _, value) = action.partition(":")
+		if name == "export-do":
+			if not settings["file-open"].endswith("broken.svg"):
+				with open(settings["export-filename"], "w") as f:
+					f.write("%%d %%s %%s" %% (os.getpid(), settings["export-width"], settings["export-height"]))
+			else:
+				sys.stdout.write("cannot export\\n")
+		else:
+			settings[name] = value
+	sys.stdout.write("> ")
+	sys.stdout.flush()
+"""
+
+class InkscapeShellTests(unittest.TestCase):
+	def setUp(self):
+		self._tempdir = tempfile.TemporaryDirectory(prefix = "pyradium_test_inkscape_")
+		self._executable = self._tempdir.name + "/inkscape"
+		with open(self._executable, "w") as f:
+			f.write(_FAKE_INKSCAPE % { "python": sys.executable })
+		os.chmod(self._executable, 0o755)
+
+	def tearDown(self):
+		self._tempdir.cleanup()
+
+	def _export(self, pool, name, width = None, height = None):
+		png_filename = f"{self._tempdir.name}/{name}.png"
+		pool.export_png(f"{self._tempdir.name}/{name}.svg", png_filename, width = width, height = height)
+		with open(png_filename) as f:
+			return f.read().split()
+
+	def test_shell_reused(self):
+		with InkscapeShellPool(executable = self._executable) as pool:
+			results = [ self._export(pool, f"frame{i}", width = 100 + i) for i in range(5) ]
+			self.assertEqual(pool.shell_count, 1)
+			self.assertEqual(pool.export_count, 5)
+		self.assertEqual(len(set(pid for (pid, width, height) in results)), 1)
+		self.assertEqual([ (width, height) for (pid, width, height) in results ], [ (str(100 + i), "0") for i in range(5) ])
+		self.assertEqual(pool.shell_count, 0)
+
+	def test_dimensions_reset(self):
+		with InkscapeShellPool(executable = self._executable) as pool:
+			self.assertEqual(self._export(pool, "a", width = 123)[1:], [ "123", "0" ])
+			self.assertEqual(self._export(pool, "b", height = 456)[1:], [ "0", "456" ])
+
+	def test_failed_export(self):
+		with InkscapeShellPool(executable = self._executable) as pool:
+			with self.assertRaises(InkscapeShellException):
+				self._export(pool, "broken", width = 100)
+			self.assertTrue(pool.available)
+			self._export(pool, "working", width = 100)
+			self.assertEqual(pool.shell_count, 1)
+
+	def test_unavailable(self):
+		with InkscapeShellPool(executable = self._tempdir.name + "/nonexistent") as pool:
+			with self.assertRaises(InkscapeShellException):
+				self._export(pool, "frame", width = 100)
+			self.assertFalse(pool.available)
+			self.assertEqual(pool.shell_count, 0)
+
+	def test_concurrent(self):
+		with InkscapeShellPool(max_shells = 2, executable = self._executable) as pool:
+			results = [ ]
+			def export(i):
+				results.append(self._export(pool, f"frame{i}", width = 10))
+			threads = [ threading.Thread(target = export, args = (i, )) for i in range(8) ]
+			for thread in threads:
+				thread.start()
+			for thread in threads:
+				thread.join()
+			self.assertEqual(len(results), 8)
+			self.assertLessEqual(pool.shell_count, 2)
+			self.assertLessEqual(len(set(pid for (pid, width, height) in results)), 2)
+
+	def test_disabled(self):
+		with InkscapeShellPool(executable = self._executable, enabled = False) as pool:
+			self.assertFalse(pool.available)
+
+	@unittest.skipUnless(shutil.which("inkscape") is not None, "Inkscape is required")
+	def test_real_inkscape(self):
+		with open(self._tempdir.name + "/real.svg", "w") as f:
+			f.write("<svg xmlns=\"http://www.w3.org/2000/svg\" width=\"40\" height=\"20\"><rect width=\"40\" height=\"20\" fill=\"red\" /></svg>")
+		with InkscapeShellPool(max_shells = 1) as pool:
+			for (width, height, dimensions) in [ (200, None, (200, 100)), (None, 50, (100, 50)), (80, None, (80, 40)) ]:
+				png_filename = f"{self._tempdir.name}/real_{width}_{height}.png"
+				pool.export_png(self._tempdir.name + "/real.svg", png_filename, width = width, height = height)
+				with open(png_filename, "rb") as f:
+					self.assertEqual(ImageTools.get_raster_dimensions(f.read()), dimensions)
+			self.assertEqual(pool.shell_count, 1)
+
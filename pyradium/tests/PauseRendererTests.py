@@ -0,0 +1,76 @@
+#	pyradium - HTML presentation/slide show generator
+#	Copyright (C) 2026-2026 Johannes Bauer
+#
+#	This file is part of pyradium.
+#
+#	pyradium is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	pyradium is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with pyradium; if not, write to the Free Software
+#	Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+
+import unittest
+import unittest.mock
+import xml.dom.minidom
+from pyradium.PauseRenderer import PauseRenderer
+from pyradium.xmlhooks.XMLHookRegistry import XMLHookRegistry
+from pyradium.Exceptions import DuplicateOrderException
+
+class PauseRendererTests(unittest.TestCase):
+	def _parse(self, xmltext):
+		doc = xml.dom.minidom.parseString(f"<?xml version=\"1.0\"?><slide xmlns:s=\"https://github.com/johndoe31415/pyradium\">{xmltext}</slide>")
+		return doc.childNodes[0]
+
+	def _render(self, xmltext, honor_pauses = True):
+		containers = { "default": self._parse(xmltext) }
+		source = containers["default"].toxml()
+		with unittest.mock.patch.object(XMLHookRegistry, "mangle", wraps = XMLHookRegistry.mangle) as mangle:
+			paused_containers = PauseRenderer(containers, honor_pauses = honor_pauses).render(rendered_presentation = None)
+		self.assertEqual(containers["default"].toxml(), source)
+		return ([ paused_container["default"].inner_toxml() for paused_container in paused_containers ], mangle.call_count)
+
+	def _render_per_pause(self, xmltext):
+		pause_renderer = PauseRenderer({ "default": self._parse(xmltext) })
+		containers = pause_renderer._clone_containers()
+		pause_renderer._enumerate_pause_nodes(containers)
+		return [ paused_container["default"].inner_toxml() for paused_container in pause_renderer._render_per_pause(rendered_presentation = None, containers = containers) ]
+
+	def test_no_pause(self):
+		self.assertEqual(self._render("<p>foo -- <s:enq type=\"bkt\">bar</s:enq></p>"), ([ "<p>foo – [bar]</p>" ], 1))
+
+	def test_pauses_mangled_once(self):
+		(sub_slides, mangle_count) = self._render("<ul><li><s:enq type=\"bkt\">A</s:enq></li><s:pause/><li>B</li><s:pause/><li>C</li></ul>")
+		self.assertEqual(sub_slides, [ "<ul><li>[A]</li></ul>", "<ul><li>[A]</li><li>B</li></ul>", "<ul><li>[A]</li><li>B</li><li>C</li></ul>" ])
+		self.assertEqual(mangle_count, 1)
+
+	def test_nested_and_ordered_pauses(self):
+		xmltext = "<ul><li>A &amp; <b x=\"a&quot;b\">bold</b></li><s:pause order=\"3\"/><li>B <i>nested <s:pause/> inner</i> tail</li><li><s:pause order=\"7\"/></li><li>C<br/></li></ul><p>x <s:pause/> y<em></em></p>"
+		(sub_slides, mangle_count) = self._render(xmltext)
+		self.assertEqual(sub_slides, self._render_per_pause(xmltext))
+		self.assertEqual(len(sub_slides), 5)
+		self.assertEqual(sub_slides[0], "<ul><li>A &amp; <b x=\"a&quot;b\">bold</b></li></ul><p>x </p>")
+		self.assertEqual(sub_slides[-1], "<ul><li>A &amp; <b x=\"a&quot;b\">bold</b></li><li>B <i>nested  inner</i> tail</li><li/><li>C<br/></li></ul><p>x  y<em/></p>")
+		self.assertEqual(mangle_count, 1)
+
+	def test_pause_inside_hook(self):
+		xmltext = "<p>A <s:nlb>B C<s:pause/> D</s:nlb> E</p>"
+		(sub_slides, mangle_count) = self._render(xmltext)
+		self.assertEqual(sub_slides, [ "<p>A B\u00a0C E</p>", "<p>A B\u00a0C\u00a0D E</p>" ])
+		self.assertEqual(mangle_count, 2)
+
+	def test_pauses_ignored(self):
+		self.assertEqual(self._render("<p>A <s:pause/>B <s:nlb>C <s:pause/>D</s:nlb></p>", honor_pauses = False), ([ "<p>A B C\u00a0D</p>" ], 1))
+
+	def test_duplicate_order(self):
+		with self.assertRaises(DuplicateOrderException):
+			self._render("<p>A</p><s:pause order=\"2\"/><p>B</p><s:pause order=\"2\"/>")
@@ -0,0 +1,111 @@
+#	pyradium - HTML presentation/slide show generator
+#	Copyright (C) 2026-2026 Johannes Bauer
+#
+#	This file is part of pyradium.
+#
+#	pyradium is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	pyradium is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with pyradium; if not, write to the Free Software
+#	Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+
+import zlib
+import struct
+import unittest
+from pyradium.RasterImage import RasterImage
+from pyradium.Exceptions import MalformedImageException
+from pyradium.renderer.LatexFormulaRenderer import LatexFormulaRenderer
+
+class RasterImageTests(unittest.TestCase):
+	@staticmethod
+	def _rectangles(width, height, rectangles):
+		rows = [ bytearray(width * 4) for _ in range(height) ]
+		for (x0, y0, x1, y1) in rectangles:
+			for y in range(y0, y1):
+				rows[y][x0 * 4 : x1 * 4] = b"\x00\x00\x00\xff" * (x1 - x0)
+		return RasterImage(width, height, 4, [ bytes(row) for row in rows ])
+
+	@staticmethod
+	def _filter_row(filter_type, row, prev, bpp):
+		filtered = bytearray()
+		for i in range(len(row)):
+			(a, b, c) = (row[i - bpp] if (i >= bpp) else 0, prev[i], prev[i - bpp] if (i >= bpp) else 0)
+			p = a + b - c
+			paeth = a if ((abs(p - a) <= abs(p - b)) and (abs(p - a) <= abs(p - c))) else (b if (abs(p - b) <= abs(p - c)) else c)
+			predictor = [ 0, a, b, (a + b) // 2, paeth ][filter_type]
+			filtered.append((row[i] - predictor) & 0xff)
+		return bytes(filtered)
+
+	def test_png_roundtrip(self):
+		image = self._rectangles(13, 7, [ (2, 1, 5, 3), (8, 4, 13, 7) ])
+		decoded = RasterImage.from_png_data(image.to_png_data())
+		self.assertEqual((decoded.width, decoded.height, decoded.channels), (13, 7, 4))
+		self.assertEqual(decoded.rows, image.rows)
+
+	def test_png_filters(self):
+		# Leading zeros exercise the skipping of transparent background
+		rows = [ bytes(2 * y) + bytes((x * 7 + y * 13 + (x * y) % 5) & 0xff for x in range(2 * y, 9 * 3)) for y in range(10) ]
+		raw_data = bytearray()
+		prev = bytes(9 * 3)
+		for (y, row) in enumerate(rows):
+			filter_type = y % 5
+			raw_data += bytes([ filter_type ]) + self._filter_row(filter_type, row, prev, 3)
+			prev = row
+		png_data = RasterImage._PNG_SIGNATURE + RasterImage._png_chunk(b"IHDR", bytes.fromhex("00000009 0000000a 08 02 00 00 00")) + RasterImage._png_chunk(b"IDAT", zlib.compress(raw_data)) + RasterImage._png_chunk(b"IEND", b"")
+		self.assertEqual(RasterImage.from_png_data(png_data).rows, rows)
+
+	def test_malformed(self):
+		with self.assertRaises(MalformedImageException):
+			RasterImage.from_png_data(b"GIF89a")
+
+	def test_bounding_box_and_trim(self):
+		image = self._rectangles(20, 10, [ (3, 2, 6, 4), (10, 5, 12, 9) ])
+		self.assertEqual(image.alpha_bounding_box(), (3, 2, 12, 9))
+		self.assertEqual(image.alpha_bounding_box(x = 7), (10, 5, 12, 9))
+		self.assertEqual(image.alpha_bounding_box(x = 4, width = 2), (4, 2, 6, 4))
+		self.assertIsNone(image.alpha_bounding_box(x = 7, width = 3))
+		trimmed = image.trim()
+		self.assertEqual((trimmed.width, trimmed.height), (9, 7))
+		self.assertEqual(trimmed.alpha_bounding_box(), (0, 0, 9, 7))
+
+	def test_formula_metrics(self):
+		# Baseline rule at the left side, followed by a "glyph"
+		image = self._rectangles(200, 100, [ (5, 60, 20, 63), (80, 30, 120, 70) ])
+		result = LatexFormulaRenderer(rendering_dpi = 600).postprocess(image, { "formula": "x" })
+		self.assertEqual(result["info"], { "width": 40, "height": 40, "baseline": 7 })
+		cropped = RasterImage.from_png_data(result["png_data"])
+		self.assertEqual((cropped.width, cropped.height), (40, 40))
+
+	def test_reduce_channels(self):
+		gray = RasterImage(2, 1, 4, [ b"\x10\x10\x10\xff\x20\x20\x20\xff" ])
+		self.assertEqual(gray.reduce_channels().rows, [ b"\x10\x20" ])
+		color = RasterImage(2, 1, 4, [ b"\x10\x11\x12\xff\x20\x21\x22\xff" ])
+		self.assertEqual(color.reduce_channels().rows, [ b"\x10\x11\x12\x20\x21\x22" ])
+		transparent = RasterImage(2, 1, 4, [ b"\x10\x10\x10\x00\x20\x20\x20\xff" ])
+		self.assertEqual(transparent.reduce_channels().rows, [ b"\x10\x00\x20\xff" ])
+		self.assertIs(self._rectangles(5, 5, [ (1, 1, 3, 3) ]).reduce_channels().channels, 2)
+
+	def test_optimized_png(self):
+		# More than 256 colors are stored as truecolor image
+		rows = [ bytes((x * 3 + y, x * 5, y * 7) [channel] & 0xff for x in range(30) for channel in range(3)) for y in range(20) ]
+		image = RasterImage(30, 20, 3, rows)
+		self.assertEqual(RasterImage.from_png_data(image.to_optimized_png_data()).rows, rows)
+
+		# Two colors are stored as palette image with one bit per pixel
+		png_data = self._rectangles(64, 64, [ (5, 5, 40, 20), (10, 30, 60, 60) ]).to_optimized_png_data()
+		chunks = dict(RasterImage.png_chunks(png_data))
+		self.assertEqual(struct.unpack(">LLBBBBB", chunks[b"IHDR"]), (64, 64, 1, 3, 0, 0, 0))
+		self.assertEqual(chunks[b"PLTE"], bytes(6))
+		self.assertEqual(chunks[b"tRNS"], b"\x00")
+		self.assertEqual(len(zlib.decompress(chunks[b"IDAT"])), 64 * (1 + 64 // 8))
+
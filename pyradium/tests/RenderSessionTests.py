@@ -0,0 +1,299 @@
+#	pyradium - HTML presentation/slide show generator
+#	Copyright (C) 2026-2026 Johannes Bauer
+#
+#	This file is part of pyradium.
+#
+#	pyradium is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	pyradium is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with pyradium; if not, write to the Free Software
+#	Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+
+import os
+import tempfile
+import functools
+import unittest
+import unittest.mock
+import xml.dom.minidom
+from pyradium.RenderSession import RenderSession
+from pyradium.RenderingParameters import RenderingParameters
+from pyradium.Enums import PresentationFeature, ImageFormat
+from pyradium.Exceptions import MalformedXMLInputException
+from pyradium.xmlhooks.CodeHook import CodeHook
+from pyradium.xmlhooks.ImgHook import ImgHook
+from pyradium.Presentation import Presentation
+from pyradium.TemplateModuleCache import TemplateModuleCache
+from pyradium.Slide import RenderSlideDirective
+
+class RenderSessionTests(unittest.TestCase):
+	_PRESENTATION = """<?xml version="1.0" encoding="UTF-8"?>
+<presentation xmlns:s="https://github.com/johndoe31415/pyradium">
+<meta><title>Test</title><author>Joe</author></meta>
+<chapter>Intro</chapter>
+<slide>
+	<s:var name="heading" value="First" />
+	<ul><li>one</li><s:pause /><li>two</li></ul>
+</slide>
+<slide type="toc" />
+<section>Details</section>
+<slide>
+	<s:var name="heading" value="Second" />
+	%s
+</slide>
+<slide>
+	<s:var name="heading" value="Third" />
+	Last slide
+</slide>
+</presentation>
+"""
+
+	def setUp(self):
+		self._tempdir = tempfile.TemporaryDirectory(prefix = "pyradium_test_session_")
+		self._infile = self._tempdir.name + "/presentation.xml"
+		self._rendering_parameters = RenderingParameters(template_style = "antonio", include_dirs = [ self._tempdir.name ], presentation_features = [ PresentationFeature.Interactive, PresentationFeature.Timer, PresentationFeature.Pause ], render_jobs = 1)
+		self._template_module_cache = unittest.mock.patch("pyradium.Renderer.TemplateModuleCache", functools.partial(TemplateModuleCache, cache_directory = self._tempdir.name + "/cache"))
+		self._template_module_cache.start()
+
+	def tearDown(self):
+		self._template_module_cache.stop()
+		self._tempdir.cleanup()
+
+	def _write_presentation(self, slide_content):
+		with open(self._infile, "w") as f:
+			f.write(self._PRESENTATION % (slide_content))
+
+	def _session(self, name):
+		return RenderSession(self._infile, self._rendering_parameters, deploy_directory = self._tempdir.name + "/" + name + "/")
+
+	def _read_index(self, name):
+		with open(self._tempdir.name + "/" + name + "/index.html") as f:
+			return f.read()
+
+	def _assert_matches_full_render(self, name):
+		self._session("reference").render()
+		self.assertEqual(self._read_index(name), self._read_index("reference"))
+
+	def test_incremental_content_change(self):
+		session = self._session("out")
+		self._write_presentation("Some text")
+		session.render()
+		self.assertFalse(session.last_render_incremental)
+
+		self._write_presentation("Other text <s:enq type=\"bkt\">quoted</s:enq>")
+		session.render()
+		self.assertTrue(session.last_render_incremental)
+		self.assertIn("quoted", self._read_index("out"))
+		self._assert_matches_full_render("out")
+
+	def test_pause_change(self):
+		session = self._session("out")
+		self._write_presentation("Some text")
+		session.render()
+
+		self._write_presentation("<ul><li>A</li><s:pause /><li>B</li></ul>")
+		session.render()
+		self.assertTrue(session.last_render_incremental)
+		self._assert_matches_full_render("out")
+
+	def test_timing_change_falls_back(self):
+		session = self._session("out")
+		self._write_presentation("Some text")
+		session.render()
+
+		self._write_presentation("Some text <s:time rel=\"3\" />")
+		session.render()
+		self.assertFalse(session.last_render_incremental)
+		self._assert_matches_full_render("out")
+
+	def test_structure_change_falls_back(self):
+		session = self._session("out")
+		self._write_presentation("Some text")
+		session.render()
+
+		self._write_presentation("Some text</slide><slide>New slide")
+		session.render()
+		self.assertFalse(session.last_render_incremental)
+		self._assert_matches_full_render("out")
+
+	def test_include_dependency_change(self):
+		session = self._session("out")
+		with open(self._tempdir.name + "/snippet.txt", "w") as f:
+			f.write("print(\"first\")\n")
+		self._write_presentation("<s:code lang=\"python\" src=\"snippet.txt\" />")
+		session.render()
+
+		included_files = list(session.renderer._included_files)
+		self.assertEqual(included_files, [ self._tempdir.name + "/snippet.txt" ])
+
+		for version in [ "second", "third" ]:
+			with open(self._tempdir.name + "/snippet.txt", "w") as f:
+				f.write(f"print(\"{version} version\")\n")
+			session.render()
+			self.assertTrue(session.last_render_incremental)
+			self.assertIn(f"{version} version", self._read_index("out"))
+			self.assertEqual(session.renderer._included_files, included_files)
+		self._assert_matches_full_render("out")
+
+	def test_hooks_handled_in_final_pass_only(self):
+		self._write_presentation("<s:code lang=\"python\">x = 1</s:code>")
+		with unittest.mock.patch.object(CodeHook, "handle_text", wraps = CodeHook.handle_text) as handle_text:
+			rendered_presentation = self._session("out").render()
+		self.assertEqual(handle_text.call_count, 1)
+		self.assertIn(PresentationFeature.Pygments, rendered_presentation.features)
+
+	def test_include_parsed_once(self):
+		def write_include(content):
+			with open(self._tempdir.name + "/module.xml", "w") as f:
+				f.write(f"""<presentation xmlns:s="https://github.com/johndoe31415/pyradium">
+<section>Module</section>
+<slide type="toc"><s:time rel="5" /><s:code lang="python">x = 1</s:code></slide>
+<slide><s:var name="heading" value="Module" />{content}<s:time rel="2" /></slide>
+</presentation>""")
+
+		def parsed_files():
+			return [ os.path.basename(call.args[0]) for call in parse_xml.call_args_list ]
+
+		session = self._session("out")
+		write_include("Module content")
+		self._write_presentation("Some text</slide><include src=\"module.xml\" /><slide>More text")
+		with unittest.mock.patch.object(Presentation, "parse_xml", wraps = Presentation.parse_xml) as parse_xml:
+			session.render()
+			self.assertEqual(parsed_files(), [ "presentation.xml", "module.xml" ])
+
+			# Directives of the unchanged include file are reused, so rendering
+			# must not have modified them
+			pristine_presentation = Presentation.load_from_file(self._infile, self._rendering_parameters)
+			self.assertEqual([ directive.xmlnode.toxml() for directive in session.renderer.presentation if isinstance(directive, RenderSlideDirective) ], [ directive.xmlnode.toxml() for directive in pristine_presentation if isinstance(directive, RenderSlideDirective) ])
+			parse_xml.reset_mock()
+			self._write_presentation("Other text</slide><include src=\"module.xml\" /><slide>More text</slide><slide>New slide")
+			session.render()
+			self.assertFalse(session.last_render_incremental)
+			self.assertEqual(parsed_files(), [ "presentation.xml" ])
+			self._assert_matches_full_render("out")
+
+			parse_xml.reset_mock()
+			write_include("Changed module content")
+			session.render()
+			self.assertEqual(parsed_files(), [ "presentation.xml", "module.xml" ])
+			self.assertIn("Changed module content", self._read_index("out"))
+			self._assert_matches_full_render("out")
+
+	def test_parallel_templates(self):
+		# Feedback slides request unique IDs from within their template
+		feedback_slide = "</slide><slide type=\"feedback\"><s:var name=\"endpoint\" value=\"https://example.com/feedback\" /></slide><slide>"
+		slides = lambda text: feedback_slide + "".join("%s %d<ul><li>one</li><s:pause /><li>two</li></ul>%s" % (text, i, feedback_slide) for i in range(20))
+		self._write_presentation(slides("Slide"))
+		self._session("reference").render()
+		self._rendering_parameters.template_jobs = 3
+		session = self._session("out")
+		session.render()
+		self.assertEqual(self._read_index("out").count("uid_"), self._read_index("reference").count("uid_"))
+		self.assertEqual(self._read_index("out"), self._read_index("reference"))
+
+		# Re-rendering directives in isolation continues from the recorded states
+		self._write_presentation(slides("Changed slide"))
+		session.render()
+		self.assertTrue(session.last_render_incremental)
+		self._rendering_parameters.template_jobs = 1
+		self._assert_matches_full_render("out")
+
+	def test_streamed_index(self):
+		self._write_presentation("Some text")
+		self._session("reference").render()
+		self._rendering_parameters.stream_index = True
+		session = self._session("out")
+		session.render()
+		self.assertEqual(self._read_index("out"), self._read_index("reference"))
+		self.assertEqual(sorted(os.listdir(self._tempdir.name + "/out")), [ "index.html", "template" ])
+
+		# Streamed slides are not retained, so changes need a full render
+		self._write_presentation("Other text")
+		session.render()
+		self.assertFalse(session.last_render_incremental)
+		self._rendering_parameters.stream_index = False
+		self._assert_matches_full_render("out")
+
+	def test_streamed_index_single_slide(self):
+		with open(self._infile, "w") as f:
+			f.write("<presentation><meta><title>Test</title></meta><slide>Only slide</slide></presentation>")
+		self._session("reference").render()
+		self._rendering_parameters.stream_index = True
+		self._session("out").render()
+		self.assertIn("Only slide", self._read_index("out"))
+		self.assertEqual(self._read_index("out"), self._read_index("reference"))
+
+	def test_lazy_slides(self):
+		self._write_presentation("Some <b>text</b>")
+		self._session("reference").render()
+		self._rendering_parameters.presentation_features |= frozenset([ PresentationFeature.LazySlides ])
+		self._session("out").render()
+		index = self._read_index("out")
+		self.assertEqual(index.count("<template class=\"slide_content\">"), self._read_index("reference").count("sub_slide_index="))
+		self.assertIn("<template class=\"slide_content\">", index[index.index("slide_no=\"3\"") : index.index("Some <b>text</b>")])
+
+		# The inline script of the feedback slide must only run once, so that
+		# slide is never wrapped
+		self._write_presentation("Some <b>text</b></slide><slide type=\"feedback\"><s:var name=\"endpoint\" value=\"https://example.com/feedback\" />")
+		self._session("feedback").render()
+		index = self._read_index("feedback")
+		feedback_start = index.index("<div class=\"slide feedback")
+		feedback_slide = index[feedback_start : index.index("</script>", feedback_start)]
+		self.assertNotIn("<template", feedback_slide)
+		self.assertIn("new FeedbackSender(", feedback_slide)
+		self.assertEqual(index.count("<template class=\"slide_content\">"), self._read_index("reference").count("sub_slide_index="))
+
+	def _write_pixel_gif(self):
+		with open(self._tempdir.name + "/pixel.gif", "wb") as f:
+			f.write(b"GIF89a\x01\x00\x01\x00\x80\x00\x00\x00\x00\x00\xff\xff\xff!\xf9\x04\x01\x00\x00\x00\x00,\x00\x00\x00\x00\x01\x00\x01\x00\x00\x02\x02D\x01\x00;")
+
+	def test_image_loading(self):
+		self._write_pixel_gif()
+		self._write_presentation("<s:img src=\"pixel.gif\" />")
+		self._session("out").render()
+		self.assertRegex(self._read_index("out"), r"<img src=\"imgs/img/[0-9a-f]+\.gif\" class=\"fill\" width=\"1\" height=\"1\" loading=\"lazy\" decoding=\"async\"")
+
+		self._rendering_parameters.eager_image_slides = 3
+		self._session("eager").render()
+		self.assertIn("loading=\"eager\"", self._read_index("eager"))
+
+	def test_image_format(self):
+		# GIFs are never re-encoded, so they remain plain images
+		self._write_pixel_gif()
+		self._write_presentation("<s:img src=\"pixel.gif\" />")
+		self._rendering_parameters.image_format = ImageFormat.WebP
+		self._rendering_parameters.image_format_fallback = True
+		rendered_presentation = self._session("out").render()
+		self.assertRegex(self._read_index("out"), r"<div class=\"fillimg\"><img src=\"imgs/img/[0-9a-f]+\.gif\"")
+		self.assertEqual(rendered_presentation.output_statistics["reencoded_images"], 0)
+
+		self._write_presentation("<s:img src=\"pixel.gif\" format=\"jpeg2000\" />")
+		with self.assertRaises(MalformedXMLInputException):
+			self._session("invalid").render()
+
+	def test_image_srcset(self):
+		self._write_pixel_gif()
+		self._write_presentation("<s:img src=\"pixel.gif\" />")
+		self._rendering_parameters.image_srcset = [ 960, 480, 2000 ]
+		rendered_presentation = self._session("out").render()
+
+		# Raster images are never scaled up, a rendition that is not smaller
+		# than the full size image is not offered
+		self.assertNotIn("srcset=", self._read_index("out"))
+
+		node = xml.dom.minidom.parseString("<s:img xmlns:s=\"https://github.com/johndoe31415/pyradium\" src=\"pixel.gif\" />").documentElement
+		self.assertEqual([ properties["max_dimension"] for (renderer_name, properties) in ImgHook.renderer_jobs(rendered_presentation, node) ], [ 1920, 480, 960 ])
+
+		img_node = node.ownerDocument.createElement("img")
+		ImgHook._set_img_srcset(rendered_presentation, img_node, [ ("small.png", 480), ("large.png", 1920) ])
+		self.assertEqual(img_node.getAttribute("srcset"), "small.png 480w, large.png 1920w")
+		self.assertEqual(img_node.getAttribute("sizes"), "(max-aspect-ratio: 1280/720) 100vw, 177.78vh")
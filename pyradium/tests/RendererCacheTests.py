@@ -0,0 +1,160 @@
+#	pyradium - HTML presentation/slide show generator
+#	Copyright (C) 2026-2026 Johannes Bauer
+#
+#	This file is part of pyradium.
+#
+#	pyradium is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	pyradium is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with pyradium; if not, write to the Free Software
+#	Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+
+import unittest
+import os
+import json
+import tempfile
+from pyradium.RendererCache import RendererCache
+from pyradium.CacheManager import CacheManager
+from pyradium.renderer.BaseRenderer import BaseRenderer
+from pyradium.Tools import FileTools
+
+class CountingRenderer(BaseRenderer):
+	_NAME = "counting"
+
+	def __init__(self):
+		self.render_count = 0
+
+	def render(self, property_dict):
+		self.render_count += 1
+		return {
+			"text":		property_dict["letter"] * property_dict["count"],
+			"small":	b"foo",
+			"large":	os.urandom(10000),
+		}
+
+class BatchCountingRenderer(CountingRenderer):
+	_NAME = "batchcounting"
+	_BATCHABLE = True
+
+	def __init__(self):
+		super().__init__()
+		self.batch_sizes = [ ]
+
+	def render_batch(self, property_dicts):
+		self.batch_sizes.append(len(property_dicts))
+		return [ None if (property_dict["count"] < 0) else self.render(property_dict) for property_dict in property_dicts ]
+
+class RendererCacheTests(unittest.TestCase):
+	def setUp(self):
+		self._tempdir = tempfile.TemporaryDirectory(prefix = "pyradium_test_cache_")
+		self._renderer = CountingRenderer()
+		self._cache = RendererCache(self._renderer, cache_directory = self._tempdir.name)
+
+	def tearDown(self):
+		self._tempdir.cleanup()
+
+	def test_miss_then_hit(self):
+		result1 = self._cache.render({ "letter": "a", "count": 3 })
+		self.assertFalse(result1.from_cache)
+		result2 = self._cache.render({ "letter": "a", "count": 3 })
+		self.assertTrue(result2.from_cache)
+		self.assertEqual(self._renderer.render_count, 1)
+		self.assertEqual(result1.keyhash, result2.keyhash)
+		self.assertEqual(result1.data, result2.data)
+		self.assertEqual(result2.data["text"], "aaa")
+
+	def test_large_bytes_stored_as_blob(self):
+		result = self._cache.render({ "letter": "b", "count": 1 })
+		with open(f"{self._tempdir.name}/counting/{result.keyhash}.json") as f:
+			metadata = json.load(f)
+		blobhash = metadata["object"]["large"]["blob"]
+		self.assertNotIn("data", metadata["object"]["large"])
+		with open(self._cache.blob_store.filename(blobhash), "rb") as f:
+			self.assertEqual(f.read(), result.data["large"])
+		self.assertEqual(metadata["object"]["small"]["data"], "Zm9v")
+
+	def test_missing_blob_rerenders(self):
+		result = self._cache.render({ "letter": "c", "count": 1 })
+		with open(f"{self._tempdir.name}/counting/{result.keyhash}.json") as f:
+			blobhash = json.load(f)["object"]["large"]["blob"]
+		os.unlink(self._cache.blob_store.filename(blobhash))
+		result = self._cache.render({ "letter": "c", "count": 1 })
+		self.assertFalse(result.from_cache)
+		self.assertEqual(self._renderer.render_count, 2)
+
+	def test_statistics(self):
+		self._cache.render({ "letter": "d", "count": 1 })
+		self._cache.render({ "letter": "d", "count": 1 })
+		self._cache.render({ "letter": "e", "count": 1 })
+		cache_manager = CacheManager(self._tempdir.name)
+		cache_manager.record_statistics([ self._cache ])
+		stats = cache_manager.statistics()
+		self.assertEqual(stats["total_entries"], 2)
+		self.assertEqual(stats["renderers"]["counting"]["entries"], 2)
+		self.assertEqual(stats["renderers"]["counting"]["hits"], 1)
+		self.assertEqual(stats["renderers"]["counting"]["misses"], 2)
+		self.assertGreater(stats["renderers"]["counting"]["bytes"], 20000)
+
+	def test_gc_evicts_least_recently_used(self):
+		old = self._cache.render({ "letter": "f", "count": 1 })
+		new = self._cache.render({ "letter": "g", "count": 1 })
+		os.utime(f"{self._tempdir.name}/counting/{old.keyhash}.json", (1000, 1000))
+
+		cache_manager = CacheManager(self._tempdir.name)
+		result = cache_manager.gc(max_size = 15000)
+		self.assertEqual(result.removed_entries, 1)
+		self.assertEqual(result.removed_blobs, 1)
+		self.assertLessEqual(result.remaining_bytes, 15000)
+		self.assertFalse(self._cache.render({ "letter": "f", "count": 1 }).from_cache)
+		self.assertTrue(self._cache.render({ "letter": "g", "count": 1 }).from_cache)
+
+	def test_gc_max_age(self):
+		self._cache.render({ "letter": "h", "count": 1 })
+		cache_manager = CacheManager(self._tempdir.name)
+		self.assertEqual(cache_manager.gc(max_age_secs = 3600).removed_entries, 0)
+		self.assertEqual(cache_manager.gc(max_age_secs = -1).removed_entries, 1)
+		self.assertEqual(cache_manager.statistics()["total_entries"], 0)
+
+	def test_parse_limits(self):
+		self.assertEqual(CacheManager.parse_size("2Mi"), 2 * 1024 * 1024)
+		self.assertEqual(CacheManager.parse_size("1234"), 1234)
+		self.assertEqual(CacheManager.parse_age("30d"), 30 * 86400)
+		self.assertEqual(CacheManager.parse_age("90"), 90)
+
+	def test_write_if_changed_breaks_hardlink(self):
+		blob_filename = self._cache.blob_store.filename(self._cache.blob_store.store(b"original"))
+		output_filename = f"{self._tempdir.name}/output.bin"
+		FileTools.link_replace(blob_filename, output_filename)
+		self.assertTrue(os.path.samefile(blob_filename, output_filename))
+		self.assertFalse(FileTools.write_if_changed(output_filename, b"original"))
+		self.assertTrue(FileTools.write_if_changed(output_filename, b"modified"))
+		self.assertFalse(os.path.samefile(blob_filename, output_filename))
+		with open(blob_filename, "rb") as f:
+			self.assertEqual(f.read(), b"original")
+
+	def test_render_batch(self):
+		renderer = BatchCountingRenderer()
+		cache = RendererCache(renderer, cache_directory = self._tempdir.name)
+		self.assertTrue(cache.batchable)
+		cache.render({ "letter": "a", "count": 1 })
+		results = cache.render_batch([ { "letter": "a", "count": 1 }, { "letter": "b", "count": 2 }, { "letter": "c", "count": -1 } ])
+		self.assertEqual(renderer.batch_sizes, [ 2 ])
+		self.assertTrue(results[0].from_cache)
+		self.assertFalse(results[1].from_cache)
+		self.assertIsNone(results[2])
+
+		# Batch rendered objects are cached individually
+		result = cache.render({ "letter": "b", "count": 2 })
+		self.assertTrue(result.from_cache)
+		self.assertEqual(result.keyhash, results[1].keyhash)
+		self.assertEqual(result.data["text"], "bb")
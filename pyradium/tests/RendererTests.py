@@ -19,10 +19,118 @@
 #
 #	Johannes Bauer <JohannesBauer@gmx.de>
 
+import os
+import json
+import shutil
 import unittest
+import tempfile
+import subprocess
+import unittest.mock
+import importlib
 from pyradium.renderer import BaseRenderer
+from pyradium.renderer.LatexFormulaRenderer import LatexFormulaRenderer
+from pyradium.renderer.ImageRenderer import ImageRenderer
+from pyradium.InkscapeShell import InkscapeShellPool
+from pyradium.renderer.PNGOptimizationRenderer import PNGOptimizationRenderer
+from pyradium.RendererCache import RendererCache
+from pyradium.RasterImage import RasterImage
+from pyradium.Enums import ImageFormat
 
 class RendererTests(unittest.TestCase):
+	def test_builtin_renderer_modules(self):
+		# Every renderer module needs to be listed so that it can be imported on demand
+		renderer_directory = os.path.dirname(importlib.import_module("pyradium.renderer.BaseRenderer").__file__)
+		for filename in os.listdir(renderer_directory):
+			if filename.endswith("Renderer.py") and (filename != "BaseRenderer.py"):
+				importlib.import_module(f"pyradium.renderer.{filename[:-3]}")
+		self.assertEqual(sorted(BaseRenderer._RENDERER_CLASSES), sorted(BaseRenderer.builtin_renderer_names()))
+
+	@unittest.skipUnless(all(shutil.which(program) is not None for program in [ "pdflatex", "gs", "convert" ]), "pdflatex, Ghostscript and ImageMagick are required")
+	def test_latex_batch_equals_single(self):
+		# Cache entries do not record which path rendered them, so batch and
+		# single formula rendering must yield identical images. The batch is
+		# rasterized directly because render_batch() silently falls back to
+		# single rendering on errors.
+		corpus = [
+			{ "formula": r"x" },
+			{ "formula": r"\frac{a + b}{c_{i,j}}" },
+			{ "formula": r"\sum_{i=0}^{n} i = \frac{n(n+1)}{2}", "long": True },
+			{ "formula": r"\begin{pmatrix} a & b \\ c & d \end{pmatrix}" },
+			{ "formula": r"f(x) = \begin{cases} 0 & x < 0 \\ 1 & x \geq 0 \end{cases}", "long": True },
+			{ "formula": r"y" },
+		]
+		renderer = LatexFormulaRenderer(rendering_dpi = 150)
+		with tempfile.TemporaryDirectory(prefix = "pyradium_test_latex_") as tex_dir:
+			gs_png_filenames = renderer._rasterize_batch(corpus, tex_dir)
+			self.assertEqual(len(gs_png_filenames), len(corpus))
+			for (property_dict, gs_png_filename) in zip(corpus, gs_png_filenames):
+				with self.subTest(formula = property_dict["formula"]):
+					batch_result = renderer.postprocess_imagemagick(gs_png_filename, property_dict)
+					single_result = renderer.render(property_dict)
+					self.assertEqual(batch_result["info"], single_result["info"])
+					self.assertEqual(RasterImage.from_png_data(batch_result["png_data"]).rows, RasterImage.from_png_data(single_result["png_data"]).rows)
+
+	def test_image_batch_failed_inkscape(self):
+		# A failing Inkscape process only fails the one image
+		svg_data = b"<svg xmlns=\"http://www.w3.org/2000/svg\" width=\"40\" height=\"20\" />"
+		renderer = ImageRenderer()
+		renderer._inkscape_pool = InkscapeShellPool(enabled = False)
+		gif_data = b"GIF89a\x01\x00\x01\x00\x00\x00\x00;"
+		for exception in [ subprocess.CalledProcessError(1, "inkscape"), FileNotFoundError("inkscape") ]:
+			with self.subTest(exception = exception), unittest.mock.patch("subprocess.check_call", side_effect = exception):
+				results = renderer.render_batch([ { "value": svg_data, "filetype": "svg", "max_dimension": 100 }, { "value": gif_data, "filetype": "gif", "max_dimension": 100 } ])
+				self.assertIsNone(results[0])
+				self.assertEqual(results[1]["img_data"], gif_data)
+
+	def test_image_reencode(self):
+		def convert(output_size = None, exception = None):
+			# Stands in for ImageMagick and writes an output file of the given size
+			def check_call(cmd, **kwargs):
+				if exception is not None:
+					raise exception
+				with open(cmd[-1], "wb") as f:
+					f.write(bytes(output_size))
+			return unittest.mock.patch("subprocess.check_call", side_effect = check_call)
+
+		renderer = ImageRenderer()
+		original = { "extension": "png", "img_data": bytes(100) }
+		with convert(output_size = 60):
+			image = renderer._reencode(dict(original), ImageFormat.WebP)
+		self.assertEqual((image["extension"], len(image["img_data"]), image["original_size"]), ("webp", 60, 100))
+
+		with convert(output_size = 60):
+			image = renderer._reencode(dict(original), ImageFormat.AVIF, fallback = True)
+		self.assertEqual((image["extension"], image["original_size"]), ("png", 100))
+		self.assertEqual([ (source["mimetype"], len(source["img_data"])) for source in image["sources"] ], [ ("image/avif", 60) ])
+
+		# Not smaller: the original is kept and not counted as re-encoded
+		with convert(output_size = 100):
+			self.assertEqual(renderer._reencode(dict(original), ImageFormat.WebP), original)
+
+		# ImageMagick without the delegate for the format
+		for exception in [ subprocess.CalledProcessError(1, "convert"), FileNotFoundError("convert") ]:
+			with self.subTest(exception = exception), convert(exception = exception):
+				self.assertEqual(renderer._reencode(dict(original), ImageFormat.AVIF), original)
+
+	def test_png_optimization(self):
+		image = RasterImage(64, 32, 4, [ b"".join(bytes([ x // 16 * 60, 0, 0, 255 ]) for x in range(64)) ] * 32)
+		png_data = image.to_png_data(compression_level = 1)
+		png_data = png_data[:-12] + RasterImage._png_chunk(b"tEXt", b"Software\x00Test") + png_data[-12:]
+		with tempfile.TemporaryDirectory(prefix = "pyradium_test_pngopt_") as cache_directory:
+			optimizer = PNGOptimizationRenderer()
+			optimizer._external_optimizer = None
+			renderer = RendererCache(optimizer, cache_directory = cache_directory)
+			result = renderer.render({ "png_data": png_data })
+			self.assertLess(len(result.data["png_data"]), len(png_data))
+			self.assertNotIn(b"tEXt", result.data["png_data"])
+			self.assertTrue(renderer.render({ "png_data": png_data }).from_cache)
+			with open(f"{cache_directory}/pngopt/{result.keyhash}.json") as f:
+				self.assertEqual(list(json.load(f)["key"]["object_properties"]), [ "png_hash" ])
+
+			# Transparency of truecolor images is not understood and kept as-is
+			png_data = png_data[:-12] + RasterImage._png_chunk(b"tRNS", b"\x00\x00\x00\x00\x00\x00") + png_data[-12:]
+			self.assertEqual(renderer.render({ "png_data": png_data }).data["png_data"], png_data)
+
 	def test_dtg1(self):
 		renderer = BaseRenderer.instanciate("dtg")
 		renderer.render({
@@ -0,0 +1,113 @@
+#	pyradium - HTML presentation/slide show generator
+#	Copyright (C) 2026-2026 Johannes Bauer
+#
+#	This file is part of pyradium.
+#
+#	pyradium is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	pyradium is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with pyradium; if not, write to the Free Software
+#	Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+
+import os
+import time
+import tempfile
+import unittest
+import unittest.mock
+import mako.lookup
+import mako.template
+from pyradium.TemplateModuleCache import TemplateModuleCache
+
+class TemplateModuleCacheTests(unittest.TestCase):
+	_LOOKUP_OPTIONS = { "strict_undefined": True, "default_filters": [ "h" ] }
+
+	def setUp(self):
+		self._tempdir = tempfile.TemporaryDirectory(prefix = "pyradium_test_template_cache_")
+		self._template_dir = self._tempdir.name + "/templates"
+		os.makedirs(self._template_dir + "/style_a")
+		os.makedirs(self._template_dir + "/style_b")
+		self._write_template("style_a/slide.html", "A ${value}")
+		self._write_template("style_b/slide.html", "B ${value}")
+
+	def tearDown(self):
+		self._tempdir.cleanup()
+
+	def _write_template(self, name, content, mtime = None):
+		filename = self._template_dir + "/" + name
+		with open(filename, "w") as f:
+			f.write(content)
+		if mtime is not None:
+			os.utime(filename, (mtime, mtime))
+
+	def _lookup(self, style):
+		cache = TemplateModuleCache(self._LOOKUP_OPTIONS, cache_directory = self._tempdir.name + "/cache")
+		lookup = mako.lookup.TemplateLookup([ self._template_dir, self._template_dir + "/" + style ], modulename_callable = cache.modulename_callable, **self._LOOKUP_OPTIONS)
+		return (cache, lookup)
+
+	def _render(self, style):
+		(cache, lookup) = self._lookup(style)
+		return lookup.get_template("slide.html").render(value = "<x>")
+
+	def test_modules_reused(self):
+		with unittest.mock.patch("mako.template._compile_module_file", wraps = mako.template._compile_module_file) as compile_module_file:
+			self.assertEqual(self._render("style_a"), "A &lt;x&gt;")
+			self.assertEqual(compile_module_file.call_count, 1)
+			self.assertEqual(self._render("style_a"), "A &lt;x&gt;")
+			self.assertEqual(compile_module_file.call_count, 1)
+
+			# Same URI in a different style must not reuse the module
+			self.assertEqual(self._render("style_b"), "B &lt;x&gt;")
+			self.assertEqual(compile_module_file.call_count, 2)
+
+			# Replacing a template by an older file still recompiles it
+			self._write_template("style_a/slide.html", "Old ${value}", mtime = 1000000000)
+			self.assertEqual(self._render("style_a"), "Old &lt;x&gt;")
+			self.assertEqual(compile_module_file.call_count, 3)
+
+		# The module of the replaced template is removed
+		(cache, _) = self._lookup("style_a")
+		self.assertEqual(len([ filename for filename in os.listdir(cache.directory) if filename.endswith(".py") ]), 2)
+
+	def test_versioned_directory(self):
+		(cache1, _) = self._lookup("style_a")
+		cache2 = TemplateModuleCache({ "strict_undefined": False }, cache_directory = self._tempdir.name + "/cache")
+		self.assertNotEqual(cache1.directory, cache2.directory)
+
+	def test_unused_versions_removed(self):
+		for (name, age_secs) in [ ("unused", 8 * 86400), ("recent", 86400) ]:
+			os.makedirs(f"{self._tempdir.name}/cache/mako/{name}")
+			os.utime(f"{self._tempdir.name}/cache/mako/{name}", (time.time() - age_secs, time.time() - age_secs))
+		(cache, _) = self._lookup("style_a")
+		self.assertEqual(sorted(os.listdir(self._tempdir.name + "/cache/mako")), sorted([ "recent", os.path.basename(cache.directory.rstrip("/")) ]))
+
+	def test_warmup(self):
+		(cache, lookup) = self._lookup("style_a")
+		self._write_template("style_a/broken.html", "${")
+		with unittest.mock.patch("mako.template._compile_module_file", wraps = mako.template._compile_module_file) as compile_module_file:
+			cache.warmup(lookup, [ "slide.html", "broken.html" ])
+			self.assertEqual(len([ filename for filename in os.listdir(cache.directory) if filename.endswith(".py") ]), 1)
+
+			# Only the first use of a style precompiles its templates
+			(cache, lookup) = self._lookup("style_a")
+			cache.warmup(lookup, [ "slide.html", "broken.html" ])
+			self.assertEqual(compile_module_file.call_count, 2)
+
+	def test_unusable_directory(self):
+		with open(self._tempdir.name + "/file", "w"):
+			pass
+		with self.assertLogs("pyradium.TemplateModuleCache", level = "WARNING"):
+			cache = TemplateModuleCache(self._LOOKUP_OPTIONS, cache_directory = self._tempdir.name + "/file")
+		self.assertIsNone(cache.modulename_callable)
+		lookup = mako.lookup.TemplateLookup([ self._template_dir + "/style_a" ], modulename_callable = cache.modulename_callable, **self._LOOKUP_OPTIONS)
+		cache.warmup(lookup, [ "slide.html" ])
+		self.assertEqual(lookup.get_template("slide.html").render(value = "x"), "A x")
@@ -19,7 +19,9 @@
 #
 #	Johannes Bauer <JohannesBauer@gmx.de>
 
+import os
 import unittest
+import importlib
 import xml.dom.minidom
 from pyradium.xmlhooks.XMLHookRegistry import XMLHookRegistry
 
@@ -29,6 +31,17 @@ class XMLHookTests(unittest.TestCase):
 		slide = doc.childNodes[0]
 		return slide
 
+	def test_builtin_hook_modules(self):
+		# Every hook module needs to be listed so that it can be imported on demand
+		hook_directory = os.path.dirname(importlib.import_module("pyradium.xmlhooks.XMLHookRegistry").__file__)
+		hook_modules = sorted(filename[:-3] for filename in os.listdir(hook_directory) if filename.endswith("Hook.py"))
+		for module_name in hook_modules:
+			importlib.import_module(f"pyradium.xmlhooks.{module_name}")
+		self.assertEqual(sorted(XMLHookRegistry._HOOKS), sorted(XMLHookRegistry.builtin_hook_names()))
+		for hook_name in XMLHookRegistry.builtin_hook_names():
+			self.assertEqual(XMLHookRegistry.get_hook(hook_name)._TAG_NAME, hook_name)
+		self.assertIsNone(XMLHookRegistry.get_hook("var"))
+
 	def test_simple_enq(self):
 		node = self._parse("<s:enq type=\"bkt\">foo</s:enq>")
 		XMLHookRegistry.mangle(rendered_presentation = None, root_node = node)
@@ -53,3 +66,9 @@ class XMLHookTests(unittest.TestCase):
 		node = self._parse("foo <!-- comment -->bar")
 		XMLHookRegistry.mangle(rendered_presentation = None, root_node = node)
 		self.assertEqual(node.toxml(), "<slide xmlns:s=\"https://github.com/johndoe31415/pyradium\">foo bar</slide>")
+
+	def test_layout_leaves_dom_untouched(self):
+		node = self._parse("foo -- <s:enq type=\"bkt\">bar</s:enq> <!-- comment --><s:verb>- --</s:verb>")
+		xml_before = node.toxml()
+		XMLHookRegistry.layout(rendered_presentation = None, root_node = node)
+		self.assertEqual(node.toxml(), xml_before)
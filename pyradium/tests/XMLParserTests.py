@@ -0,0 +1,112 @@
+#	pyradium - HTML presentation/slide show generator
+#	Copyright (C) 2026-2026 Johannes Bauer
+#
+#	This file is part of pyradium.
+#
+#	pyradium is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	pyradium is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with pyradium; if not, write to the Free Software
+#	Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+
+import os
+import tempfile
+import unittest
+from pyradium.XMLParser import BaseXMLParser
+from pyradium.Exceptions import XMLFileNotFoundException, MalformedXMLInputException, XMLParserRegistryException
+
+class XMLParserTests(unittest.TestCase):
+	_NAMESPACES = {
+		"https://github.com/johndoe31415/pyradium":		"s",
+	}
+
+	def _parse(self, parser_name, xml_data):
+		with tempfile.NamedTemporaryFile(suffix = ".xml") as f:
+			f.write(xml_data.encode("utf-8"))
+			f.flush()
+			return BaseXMLParser.get(parser_name).parse(f.name, self._NAMESPACES)
+
+	def _describe(self, document):
+		# Everything about the DOM the hooks might depend on, in document order
+		result = [ ]
+		stack = [ document ]
+		while stack:
+			node = stack.pop()
+			description = [ node.nodeType, node.nodeName, node.namespaceURI, node.localName, getattr(node, "prefix", None), getattr(node, "data", None) ]
+			description += [ None if (neighbor is None) else id(neighbor) for neighbor in (node.parentNode, node.previousSibling, node.nextSibling) ]
+			if node.nodeType == node.ELEMENT_NODE:
+				description.append([ (attribute.name, attribute.value, attribute.namespaceURI, attribute.localName, attribute.prefix) for attribute in node.attributes.values() ])
+				description.append(sorted(node._attrsNS or { }, key = str))
+			result.append((id(node), description))
+			stack += reversed(node.childNodes)
+
+		# Replace object IDs by node indices so that both trees are comparable
+		node_index = { node_id: index for (index, (node_id, description)) in enumerate(result) }
+		return [ [ node_index.get(value, value) if (i in (6, 7, 8)) else value for (i, value) in enumerate(description) ] for (node_id, description) in result ]
+
+	def _assert_identical_to_reference(self, xml_data):
+		reference = self._parse("minidom", xml_data)
+		for parser_name in BaseXMLParser.parser_names():
+			document = self._parse(parser_name, xml_data)
+			self.assertEqual(document.toxml(), reference.toxml())
+			self.assertEqual(self._describe(document), self._describe(reference))
+		return reference
+
+	def test_presentation(self):
+		document = self._assert_identical_to_reference("""<?xml version="1.0" encoding="utf-8"?>
+<presentation xmlns:s="https://github.com/johndoe31415/pyradium">
+	<slide type="title" hide="0">
+		<s:var name="title"/> &amp; more &lt;text&gt;
+		<ul><li>Foo <s:tt>bar</s:tt></li></ul>
+	</slide>
+</presentation>""")
+		self.assertEqual(document.documentElement.getAttribute("xmlns:s"), "https://github.com/johndoe31415/pyradium")
+
+	def test_namespace_normalization(self):
+		document = self._assert_identical_to_reference("""<presentation xmlns:pyr="https://github.com/johndoe31415/pyradium" xmlns:z="urn:z" xmlns:a="urn:a" xmlns="urn:default" z:attr="1">
+	<pyr:tt>foo</pyr:tt>
+	<z:elem xmlns:q="urn:q" a:attr="2"><q:inner/><a:elem/><plain xmlns="">text</plain></z:elem>
+</presentation>""")
+		root = document.documentElement
+		self.assertEqual(root.tagName, "ns1:presentation")
+		self.assertEqual([ child.tagName for child in root.getElementsByTagName("*") ], [ "s:tt", "ns3:elem", "ns2:inner", "ns0:elem", "plain" ])
+		self.assertEqual([ key for key in root.attributes.keys() if key.startswith("xmlns") ], [ "xmlns", "xmlns:s", "xmlns:ns0", "xmlns:ns1", "xmlns:ns2", "xmlns:ns3" ])
+
+	def test_text_nodes(self):
+		document = self._assert_identical_to_reference("""<?pi before?><!-- comment --><presentation>
+	<![CDATA[ <b>raw</b> ]]><![CDATA[second]]>text<!-- inside -->more<?pi inside?>
+	<s>&#x263a;&amp;&gt;&quot;</s>
+</presentation>""")
+		cdata = document.documentElement.childNodes[1]
+		self.assertEqual(cdata.nodeType, cdata.CDATA_SECTION_NODE)
+		self.assertEqual(cdata.data, " <b>raw</b> ")
+
+	def test_long_text(self):
+		text = "Lorem ipsum dolor sit amet &amp; consectetur. " * 10000
+		document = self._assert_identical_to_reference(f"<presentation><p>{text}</p></presentation>")
+		self.assertEqual(len(document.documentElement.firstChild.childNodes), 1)
+
+	def test_document_type_declaration(self):
+		document = self._assert_identical_to_reference("""<!DOCTYPE presentation [ <!ENTITY foo "bar"> ]><presentation>&foo;</presentation>""")
+		self.assertEqual(document.documentElement.firstChild.data, "bar")
+
+	def test_errors(self):
+		for parser_name in BaseXMLParser.parser_names():
+			with self.assertRaises(MalformedXMLInputException):
+				self._parse(parser_name, "<presentation><slide></presentation>")
+			with self.assertRaises(MalformedXMLInputException):
+				self._parse(parser_name, "<presentation><s:slide/></presentation>")
+			with self.assertRaises(XMLFileNotFoundException):
+				BaseXMLParser.get(parser_name).parse(os.path.join(tempfile.gettempdir(), "pyradium_does_not_exist.xml"))
+		with self.assertRaises(XMLParserRegistryException):
+			BaseXMLParser.get("no-such-parser")
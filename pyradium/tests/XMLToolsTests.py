@@ -0,0 +1,80 @@
+#	pyradium - HTML presentation/slide show generator
+#	Copyright (C) 2026-2026 Johannes Bauer
+#
+#	This file is part of pyradium.
+#
+#	pyradium is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	pyradium is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with pyradium; if not, write to the Free Software
+#	Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+
+import unittest
+import xml.dom.minidom
+from pyradium.Tools import XMLTools
+
+class XMLToolsTests(unittest.TestCase):
+	def _parse(self, xmltext):
+		return xml.dom.minidom.parseString(f"<root>{xmltext}</root>").documentElement
+
+	def _names(self, nodes):
+		return [ node.tagName if (node.nodeType == node.ELEMENT_NODE) else node.data for node in nodes ]
+
+	def test_walk_order(self):
+		visited = [ ]
+		XMLTools.walk(self._parse("<a>x<b>y</b></a><c/>z"), visited.append)
+		self.assertEqual(self._names(visited), [ "root", "a", "x", "b", "y", "c", "z" ])
+
+	def test_walk_predicates(self):
+		visited = [ ]
+		XMLTools.walk(self._parse("<a>x<b>y</b></a><c><d/></c>z"), visited.append, predicate = lambda node: node.nodeType == node.ELEMENT_NODE, cancel_descent_predicate = lambda node: (node.nodeType == node.ELEMENT_NODE) and (node.tagName == "b"))
+		self.assertEqual(self._names(visited), [ "root", "a", "c", "d" ])
+
+	def test_walk_cancel_descent(self):
+		visited = [ ]
+		def callback(node):
+			visited.append(node)
+			if (node.nodeType == node.ELEMENT_NODE) and (node.tagName == "a"):
+				raise XMLTools.CancelDescentException()
+		XMLTools.walk(self._parse("<a><b/></a><c/>"), callback)
+		self.assertEqual(self._names(visited), [ "root", "a", "c" ])
+
+	def test_walk_with_modification(self):
+		# Replaced nodes are not descended into, removed siblings are still
+		# visited because they were children at the time their parent was
+		root = self._parse("<a><x/></a><b/><c/>")
+		visited = [ ]
+		def callback(node):
+			visited.append(node)
+			if node.nodeType == node.ELEMENT_NODE:
+				if node.tagName == "a":
+					XMLTools.replace_node(node, node.ownerDocument.createElement("new"))
+					raise XMLTools.CancelDescentException()
+				elif node.tagName == "b":
+					XMLTools.remove_node(node.nextSibling)
+		XMLTools.walk(root, callback)
+		self.assertEqual(self._names(visited), [ "root", "a", "b", "c" ])
+		self.assertEqual(root.toxml(), "<root><new/><b/></root>")
+
+	def test_walk_deep(self):
+		depth = 5000
+		root = self._parse("<a>" * depth + "x" + "</a>" * depth)
+		self.assertEqual(len(XMLTools.findall_recurse(root, "a")), depth)
+		self.assertEqual(XMLTools.inner_text(root), "x")
+
+	def test_inner_text(self):
+		self.assertEqual(XMLTools.inner_text(self._parse("foo <a>bar<b>moo</b></a><![CDATA[<x>]]><c/> end")), "foo barmoo<x> end")
+
+	def test_findall_recurse(self):
+		doc = xml.dom.minidom.parseString("<root><a id=\"1\"><a id=\"2\"/></a><b><a id=\"3\"/></b></root>")
+		self.assertEqual([ node.getAttribute("id") for node in XMLTools.findall_recurse(doc, "a") ], [ "1", "2", "3" ])
@@ -26,3 +26,15 @@ from .BooleanExpressionTests import BooleanExpressionTests
 from .RendererTests import RendererTests
 from .VariableSubstitutionTests import VariableSubstitutionTests
 from .XMLHookTests import XMLHookTests
+from .RendererCacheTests import RendererCacheTests
+from .RenderSessionTests import RenderSessionTests
+from .FileWatcherTests import FileWatcherTests
+from .RasterImageTests import RasterImageTests
+from .InkscapeShellTests import InkscapeShellTests
+from .ImageToolsTests import ImageToolsTests
+from .PauseRendererTests import PauseRendererTests
+from .XMLToolsTests import XMLToolsTests
+from .XMLParserTests import XMLParserTests
+from .TemplateModuleCacheTests import TemplateModuleCacheTests
+from .ImportTimeTests import ImportTimeTests
+from .CmdlineArgumentTests import CmdlineArgumentTests
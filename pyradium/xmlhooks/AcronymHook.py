@@ -26,6 +26,13 @@ from pyradium.Enums import PresentationFeature
 @XMLHookRegistry.register_hook
 class AcronymHook(BaseHook):
 	_TAG_NAME = "ac"
+	_LAYOUT_DESCENT = False
+
+	@classmethod
+	def layout(cls, rendered_presentation, node):
+		acronym = rendered_presentation.renderer.get_custom_renderer("acronym")
+		if acronym.resolve(XMLTools.inner_text(node)) is not None:
+			rendered_presentation.add_feature(PresentationFeature.Acronyms)
 
 	@classmethod
 	def handle(cls, rendered_presentation, node):
@@ -25,6 +25,7 @@ from pyradium.Exceptions import NoAgendaException
 @XMLHookRegistry.register_hook
 class AgendaHook(BaseHook):
 	_TAG_NAME = "agenda"
+	_LAYOUT_DESCENT = False
 
 	@classmethod
 	def handle(cls, rendered_presentation, node):
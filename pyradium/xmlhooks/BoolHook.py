@@ -26,6 +26,7 @@ from pyradium.BooleanExpression import BooleanExpressionParser, TexBooleanExpres
 @XMLHookRegistry.register_hook
 class BoolHook(BaseHook):
 	_TAG_NAME = "bool"
+	_LAYOUT_DESCENT = False
 
 	@classmethod
 	def handle(cls, rendered_presentation, node):
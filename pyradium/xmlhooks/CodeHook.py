@@ -29,6 +29,10 @@ from pyradium.Exceptions import CodeHighlightingException
 class CodeHook(InnerTextHook):
 	_TAG_NAME = "code"
 
+	@classmethod
+	def layout(cls, rendered_presentation, node):
+		rendered_presentation.add_feature(PresentationFeature.Pygments)
+
 	@classmethod
 	def handle_text(cls, text, rendered_presentation, node):
 		lang = node.getAttribute("lang")
@@ -25,12 +25,21 @@ from pyradium.Tools import XMLTools
 @XMLHookRegistry.register_hook
 class DigitalTimingDiagramHook(BaseHook):
 	_TAG_NAME = "dtg"
+	_LAYOUT_DESCENT = False
 
 	@classmethod
-	def handle(cls, rendered_presentation, node):
-		properties = {
+	def _properties(cls, rendered_presentation, node):
+		return {
 			"data":	XMLTools.inner_text(node),
 		}
+
+	@classmethod
+	def renderer_jobs(cls, rendered_presentation, node):
+		return [ ("dtg", cls._properties(rendered_presentation, node)) ]
+
+	@classmethod
+	def handle(cls, rendered_presentation, node):
+		properties = cls._properties(rendered_presentation, node)
 		dtg_renderer = rendered_presentation.renderer.get_custom_renderer("dtg")
 		result = dtg_renderer.render(properties)
 
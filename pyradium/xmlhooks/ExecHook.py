@@ -30,6 +30,13 @@ from pyradium.CmdlineEscape import CmdlineEscape
 @XMLHookRegistry.register_hook
 class ExecHook(BaseHook):
 	_TAG_NAME = "exec"
+	_LAYOUT_DESCENT = False
+
+	@classmethod
+	def layout(cls, rendered_presentation, node):
+		# The (cached) output of the command may contain hooks itself
+		for replacement_node in cls.handle(rendered_presentation, node).replacement_items:
+			XMLHookRegistry.layout(rendered_presentation, replacement_node)
 
 	@classmethod
 	def handle(cls, rendered_presentation, node):
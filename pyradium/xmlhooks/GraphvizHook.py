@@ -26,22 +26,35 @@ class GraphvizHook(BaseHook):
 	_TAG_NAME = "graphviz"
 
 	@classmethod
-	def handle(cls, rendered_presentation, node):
-		properties = {
+	def _properties(cls, rendered_presentation, node):
+		return {
 			"src":				rendered_presentation.renderer.lookup_include(node.getAttribute("src")),
 		}
+
+	@classmethod
+	def renderer_jobs(cls, rendered_presentation, node):
+		properties = cls._properties(rendered_presentation, node)
+		return [ ("graphviz", properties) ] + [ ("graphviz", rendition_properties) for rendition_properties in cls._srcset_properties(rendered_presentation, properties) ]
+
+	@classmethod
+	def handle(cls, rendered_presentation, node):
+		properties = cls._properties(rendered_presentation, node)
 		graphviz_renderer = rendered_presentation.renderer.get_custom_renderer("graphviz")
 		rendered_graph = graphviz_renderer.render(properties)
-		local_filename = f"imgs/graphviz/{rendered_graph.keyhash}.{rendered_graph.data['extension']}"
-		uri = f"{rendered_presentation.renderer.rendering_params.resource_uri}imgs/graphviz/{rendered_graph.keyhash}.{rendered_graph.data['extension']}"
+		srcset = [ ]
+		for rendition in cls._render_renditions(rendered_presentation, "graphviz", properties, rendered_graph):
+			local_filename = f"imgs/graphviz/{rendition.keyhash}.{rendition.data['extension']}"
+			rendered_presentation.add_file(local_filename, rendition.data["img_data"])
+			srcset.append((f"{rendered_presentation.renderer.rendering_params.resource_uri}{local_filename}", rendition.data.get("width")))
 
 		replacement_node = node.ownerDocument.createElement("div")
 		replacement_node.setAttribute("class", "fillimg")
 
 		img_node = node.ownerDocument.createElement("img")
-		img_node.setAttribute("src", uri)
+		img_node.setAttribute("src", srcset[-1][0])
 		img_node.setAttribute("class", "fill")
+		cls._set_img_srcset(rendered_presentation, img_node, srcset)
+		cls._set_img_loading(rendered_presentation, img_node, rendered_graph.data.get("width"), rendered_graph.data.get("height"))
 		replacement_node.appendChild(img_node)
 
-		rendered_presentation.add_file(local_filename, rendered_graph.data["img_data"])
 		return ReplacementFragment(replacement = replacement_node)
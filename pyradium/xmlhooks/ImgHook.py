@@ -23,11 +23,13 @@ from pysvgedit import SVGDocument
 from pysvgedit.Exceptions import SVGValidationException
 from pyradium.xmlhooks.XMLHookRegistry import BaseHook, XMLHookRegistry, ReplacementFragment
 from pyradium.Tools import XMLTools
+from pyradium.Enums import ImageFormat
 from pyradium.Exceptions import InvalidTransformationException, MalformedXMLInputException, MalformedImageException
 
 @XMLHookRegistry.register_hook
 class ImgHook(BaseHook):
 	_TAG_NAME = "img"
+	_LAYOUT_DESCENT = False
 
 	@classmethod
 	def _parse_transformations(cls, node):
@@ -58,7 +60,7 @@ class ImgHook(BaseHook):
 		return transformations
 
 	@classmethod
-	def handle(cls, rendered_presentation, node):
+	def _properties(cls, rendered_presentation, node):
 		transformations = cls._parse_transformations(node)
 
 		if node.hasAttribute("src") and node.hasAttribute("value"):
@@ -72,14 +74,7 @@ class ImgHook(BaseHook):
 			"max_dimension":	rendered_presentation.renderer.rendering_params.image_max_dimension,
 		}
 		if node.hasAttribute("src"):
-			filename = rendered_presentation.renderer.lookup_include(node.getAttribute("src"))
-			properties["src"] = filename
-			if filename.lower().endswith(".svg"):
-				doc = SVGDocument.read(filename)
-				try:
-					rendered_presentation.renderer.rendering_params.svg_validator.validate(doc)
-				except SVGValidationException as e:
-					raise MalformedImageException(f"SVG image {filename} did not pass SVG validation: {str(e)}") from e
+			properties["src"] = rendered_presentation.renderer.lookup_include(node.getAttribute("src"))
 		else:
 			# Literal specification as value
 			properties["value"] = node.getAttribute("value").encode("utf-8")
@@ -89,33 +84,108 @@ class ImgHook(BaseHook):
 
 		if len(transformations) > 0:
 			properties["svg_transform"] = transformations
+
+		if node.hasAttribute("format"):
+			try:
+				output_format = ImageFormat(node.getAttribute("format"))
+			except ValueError as e:
+				raise MalformedXMLInputException(f"Image node has unsupported 'format' attribute '{node.getAttribute('format')}', must be any of {', '.join(enumitem.value for enumitem in ImageFormat)}.") from e
+		else:
+			output_format = rendered_presentation.renderer.rendering_params.image_format
+		if output_format != ImageFormat.Original:
+			properties["output_format"] = output_format.value
+			if rendered_presentation.renderer.rendering_params.image_format_fallback:
+				properties["fallback"] = True
+		return properties
+
+	@classmethod
+	def renderer_jobs(cls, rendered_presentation, node):
+		properties = cls._properties(rendered_presentation, node)
+		return [ ("img", properties) ] + [ ("img", rendition_properties) for rendition_properties in cls._srcset_properties(rendered_presentation, properties) ]
+
+	@classmethod
+	def _add_statistics(cls, rendered_presentation, rendered_image):
+		if "original_size" in rendered_image.data:
+			statistics = rendered_presentation.output_statistics
+			statistics["reencoded_images"] += 1
+			statistics["reencoded_original_bytes"] += rendered_image.data["original_size"]
+			statistics["reencoded_bytes"] += min(len(source["img_data"]) for source in rendered_image.data.get("sources", [ rendered_image.data ]))
+
+	@classmethod
+	def handle(cls, rendered_presentation, node):
+		properties = cls._properties(rendered_presentation, node)
+		if ("src" in properties) and properties["src"].lower().endswith(".svg"):
+			filename = properties["src"]
+			doc = SVGDocument.read(filename)
+			try:
+				rendered_presentation.renderer.rendering_params.svg_validator.validate(doc)
+			except SVGValidationException as e:
+				raise MalformedImageException(f"SVG image {filename} did not pass SVG validation: {str(e)}") from e
+
 		img_renderer = rendered_presentation.renderer.get_custom_renderer("img")
 		rendered_image = img_renderer.render(properties)
-		local_filename = "imgs/img/%s.%s" % (rendered_image.keyhash, rendered_image.data["extension"])
-		uri = "%simgs/img/%s.%s" % (rendered_presentation.renderer.rendering_params.resource_uri, rendered_image.keyhash, rendered_image.data["extension"])
+		resource_uri = rendered_presentation.renderer.rendering_params.resource_uri
+
+		# srcset of the image and of each re-encoded source; renditions for
+		# which re-encoding did not pay off fall back to the original image
+		srcset = [ ]
+		source_srcsets = [ [ ] for _ in rendered_image.data.get("sources", [ ]) ]
+		for rendition in cls._render_renditions(rendered_presentation, "img", properties, rendered_image):
+			local_filename = "imgs/img/%s.%s" % (rendition.keyhash, rendition.data["extension"])
+			rendered_presentation.add_file(local_filename, rendition.data["img_data"])
+			srcset.append((resource_uri + local_filename, rendition.data.get("width")))
+			rendition_sources = rendition.data.get("sources", [ ])
+			for (source_index, source_srcset) in enumerate(source_srcsets):
+				if source_index < len(rendition_sources):
+					source = rendition_sources[source_index]
+					source_filename = "imgs/img/%s.%s" % (rendition.keyhash, source["extension"])
+					rendered_presentation.add_file(source_filename, source["img_data"])
+					source_srcset.append((resource_uri + source_filename, rendition.data.get("width")))
+				else:
+					source_srcset.append(srcset[-1])
+			cls._add_statistics(rendered_presentation, rendition)
 
 		img_style = [ ]
 		if node.hasAttribute("width"):
 			img_style.append(("width", node.getAttribute("width")))
 		if node.hasAttribute("height"):
 			img_style.append(("height", node.getAttribute("height")))
+		if node.hasAttribute("width") != node.hasAttribute("height"):
+			# A single given dimension overrides only that one of the intrinsic
+			# size of the image, the other one needs to keep the aspect ratio
+			img_style.append(("height" if node.hasAttribute("width") else "width", "auto"))
 		if node.hasAttribute("render"):
 			img_style.append(("image-rendering", node.getAttribute("render")))
 
 		create_filldiv = XMLTools.get_bool_attr(node, "fill", default_value = True)
 
 		img_node = node.ownerDocument.createElement("img")
-		img_node.setAttribute("src", uri)
+		img_node.setAttribute("src", srcset[-1][0])
 		img_node.setAttribute("class", "fill")
+		cls._set_img_srcset(rendered_presentation, img_node, srcset)
+		cls._set_img_loading(rendered_presentation, img_node, rendered_image.data.get("width"), rendered_image.data.get("height"))
 		if len(img_style) > 0:
 			img_node.setAttribute("style", ";".join("%s:%s" %  (key, value) for (key, value) in img_style))
 
+		if len(source_srcsets) > 0:
+			# Re-encoded image with the original as fallback
+			image_node = node.ownerDocument.createElement("picture")
+			for (source, source_srcset) in zip(rendered_image.data["sources"], source_srcsets):
+				source_node = image_node.appendChild(node.ownerDocument.createElement("source"))
+				if len(source_srcset) == 1:
+					source_node.setAttribute("srcset", source_srcset[0][0])
+				else:
+					cls._set_img_srcset(rendered_presentation, source_node, source_srcset)
+				source_node.setAttribute("type", source["mimetype"])
+			image_node.appendChild(img_node)
+		else:
+			image_node = img_node
+
 		if create_filldiv:
 			replacement_node = node.ownerDocument.createElement("div")
 			replacement_node.setAttribute("class", "fillimg")
-			replacement_node.appendChild(img_node)
+			replacement_node.appendChild(image_node)
 		else:
-			replacement_node = img_node
+			replacement_node = image_node
 
-		rendered_presentation.add_file(local_filename, rendered_image.data["img_data"])
 		return ReplacementFragment(replacement = replacement_node, continue_descent = False)
@@ -24,6 +24,7 @@ from pyradium.xmlhooks.XMLHookRegistry import BaseHook, XMLHookRegistry, Replace
 @XMLHookRegistry.register_hook
 class LinkHook(BaseHook):
 	_TAG_NAME = "link"
+	_LAYOUT_DESCENT = False
 
 	@classmethod
 	def handle(cls, rendered_presentation, node):
@@ -26,23 +26,42 @@ class PlotHook(BaseHook):
 	_TAG_NAME = "plot"
 
 	@classmethod
-	def handle(cls, rendered_presentation, node):
-		properties = {
+	def _properties(cls, rendered_presentation, node):
+		return {
 			"src":				rendered_presentation.renderer.lookup_include(node.getAttribute("src")),
 			"max_dimension":	rendered_presentation.renderer.rendering_params.image_max_dimension,
 		}
+
+	@classmethod
+	def _rendition_properties(cls, properties, max_dimension):
+		# Smaller renditions scale the font so that they look like the full
+		# size plot
+		return dict(properties, max_dimension = max_dimension, reference_dimension = properties["max_dimension"])
+
+	@classmethod
+	def renderer_jobs(cls, rendered_presentation, node):
+		properties = cls._properties(rendered_presentation, node)
+		return [ ("plot", properties) ] + [ ("plot", rendition_properties) for rendition_properties in cls._srcset_properties(rendered_presentation, properties) ]
+
+	@classmethod
+	def handle(cls, rendered_presentation, node):
+		properties = cls._properties(rendered_presentation, node)
 		plot_renderer = rendered_presentation.renderer.get_custom_renderer("plot")
 		rendered_plot = plot_renderer.render(properties)
-		local_filename = "imgs/plot/%s.%s" % (rendered_plot.keyhash, rendered_plot.data["extension"])
-		uri = "%simgs/plot/%s.%s" % (rendered_presentation.renderer.rendering_params.resource_uri, rendered_plot.keyhash, rendered_plot.data["extension"])
+		srcset = [ ]
+		for rendition in cls._render_renditions(rendered_presentation, "plot", properties, rendered_plot):
+			local_filename = "imgs/plot/%s.%s" % (rendition.keyhash, rendition.data["extension"])
+			rendered_presentation.add_file(local_filename, rendition.data["img_data"])
+			srcset.append((rendered_presentation.renderer.rendering_params.resource_uri + local_filename, rendition.data.get("width")))
 
 		replacement_node = node.ownerDocument.createElement("div")
 		replacement_node.setAttribute("class", "fillimg")
 
 		img_node = node.ownerDocument.createElement("img")
-		img_node.setAttribute("src", uri)
+		img_node.setAttribute("src", srcset[-1][0])
 		img_node.setAttribute("class", "fill")
+		cls._set_img_srcset(rendered_presentation, img_node, srcset)
+		cls._set_img_loading(rendered_presentation, img_node, rendered_plot.data.get("width"), rendered_plot.data.get("height"))
 		replacement_node.appendChild(img_node)
 
-		rendered_presentation.add_file(local_filename, rendered_plot.data["img_data"])
 		return ReplacementFragment(replacement = replacement_node, continue_descent = False)
@@ -25,6 +25,7 @@ from pyradium.Tools import XMLTools
 @XMLHookRegistry.register_hook
 class QRCodeHook(BaseHook):
 	_TAG_NAME = "qrcode"
+	_LAYOUT_DESCENT = False
 
 	@classmethod
 	def handle(cls, rendered_presentation, node):
@@ -42,9 +42,10 @@ class TexFormula():
 @XMLHookRegistry.register_hook
 class TexHook(BaseHook):
 	_TAG_NAME = "tex"
+	_LAYOUT_DESCENT = False
 
 	@classmethod
-	def handle(cls, rendered_presentation, node):
+	def _parse_formula(cls, node):
 		formula = {
 			"formula":	XMLTools.inner_text(node),
 			"long":		XMLTools.get_bool_attr(node, "long"),
@@ -53,10 +54,22 @@ class TexHook(BaseHook):
 			formula["scale"] = float(node.getAttribute("scale"))
 		if node.hasAttribute("indent"):
 			formula["indent"] = float(node.getAttribute("indent"))
-		formula = TexFormula(**formula)
+		return TexFormula(**formula)
+
+	@classmethod
+	def _render_as_vector(cls, rendered_presentation):
+		return PresentationFeature.MathJax in rendered_presentation.renderer.rendering_params.presentation_features
 
-		render_as_vector = PresentationFeature.MathJax in rendered_presentation.renderer.rendering_params.presentation_features
-		if render_as_vector:
+	@classmethod
+	def renderer_jobs(cls, rendered_presentation, node):
+		if cls._render_as_vector(rendered_presentation):
+			return [ ]
+		return [ ("latex", cls._parse_formula(node).to_dict) ]
+
+	@classmethod
+	def handle(cls, rendered_presentation, node):
+		formula = cls._parse_formula(node)
+		if cls._render_as_vector(rendered_presentation):
 			inner_node = cls._handle_vector_formula(formula, node)
 		else:
 			inner_node = cls._handle_rasterized_formula(formula, node, rendered_presentation)
@@ -103,11 +116,13 @@ class TexHook(BaseHook):
 
 		scale_factor = 0.625 * (formula.scale or 1)
 		width_px = round(rendered_formula.data["info"]["width"] * scale_factor)
+		height_px = round(rendered_formula.data["info"]["height"] * scale_factor)
 		baseline_px = round(rendered_formula.data["info"]["baseline"] * scale_factor)
 
 		img_node = node.ownerDocument.createElement("img")
 		img_node.setAttribute("src", uri)
 		img_node.setAttribute("alt", formula.formula)
+		cls._set_img_loading(rendered_presentation, img_node, width_px, height_px)
 
 		img_style = SVGStyle.from_node(img_node)
 		img_style["width"] = f"{width_px}px"
@@ -27,10 +27,14 @@ class TimeHook(BaseHook):
 	_TAG_NAME = "time"
 
 	@classmethod
-	def handle(cls, rendered_presentation, node):
+	def layout(cls, rendered_presentation, node):
 		abs_string = node.getAttribute("abs") if node.hasAttribute("abs") else None
 		rel_string = node.getAttribute("rel") if node.hasAttribute("rel") else None
 		time_spec = TimeSpecification.parse(abs_string = abs_string, rel_string = rel_string)
 		if rendered_presentation.schedule is not None:
 			rendered_presentation.schedule.set_slide_no(rendered_presentation.current_slide_number, time_spec)
+
+	@classmethod
+	def handle(cls, rendered_presentation, node):
+		cls.layout(rendered_presentation, node)
 		return node
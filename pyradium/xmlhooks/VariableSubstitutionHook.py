@@ -27,6 +27,7 @@ from pyradium.Exceptions import NoSuchVariableException, CodeExecutionFailedExce
 @XMLHookRegistry.register_hook
 class VariableSubstitutionHook(BaseHook):
 	_TAG_NAME = "sub"
+	_LAYOUT_DESCENT = False
 
 	@classmethod
 	def handle(cls, rendered_presentation, node):
@@ -24,6 +24,7 @@ from pyradium.xmlhooks.XMLHookRegistry import BaseHook, XMLHookRegistry, Replace
 @XMLHookRegistry.register_hook
 class VerbatimHook(BaseHook):
 	_TAG_NAME = "verb"
+	_LAYOUT_DESCENT = False
 
 	@classmethod
 	def handle(cls, rendered_presentation, node):
@@ -21,8 +21,9 @@
 
 import logging
 import textwrap
+import importlib
 import dataclasses
-from pyradium.Exceptions import XMLHookRegistryException
+from pyradium.Exceptions import PyRadiumException, XMLHookRegistryException
 from pyradium.Tools import XMLTools
 
 _log = logging.getLogger(__spec__.name)
@@ -31,6 +32,38 @@ class XMLHookRegistry():
 	_HOOKS = { }
 	_SPECIAL = set([ "var", "pause", "content", "param", "format" ])
 
+	# Modules of the built-in hooks by tag name; they are only imported (and
+	# thereby register themselves) once their tag is first encountered
+	_BUILTIN_HOOK_MODULES = {
+		"ac":			"AcronymHook",
+		"agenda":		"AgendaHook",
+		"ar":			"ArrowHook",
+		"bool":			"BoolHook",
+		"circuit":		"CircuitHook",
+		"code":			"CodeHook",
+		"debug":		"DebugHook",
+		"dtg":			"DigitalTimingDiagramHook",
+		"emo":			"EmoHook",
+		"enq":			"QuoteHook",
+		"exec":			"ExecHook",
+		"file":			"FileHook",
+		"graphviz":		"GraphvizHook",
+		"img":			"ImgHook",
+		"link":			"LinkHook",
+		"nlb":			"NoLinebreakHook",
+		"nsc":			"NoSpellcheckHook",
+		"nth":			"NthHook",
+		"plot":			"PlotHook",
+		"qrcode":		"QRCodeHook",
+		"sub":			"VariableSubstitutionHook",
+		"sym":			"SymbolHook",
+		"term":			"TerminalHook",
+		"tex":			"TexHook",
+		"time":			"TimeHook",
+		"tt":			"MonospaceHook",
+		"verb":			"VerbatimHook",
+	}
+
 	@classmethod
 	def register_hook(cls, hook_class):
 		if hook_class._TAG_NAME is None:
@@ -40,6 +73,18 @@ class XMLHookRegistry():
 		cls._HOOKS[hook_class._TAG_NAME] = hook_class
 		return hook_class
 
+	@classmethod
+	def get_hook(cls, hook_name):
+		hook_class = cls._HOOKS.get(hook_name)
+		if (hook_class is None) and (hook_name in cls._BUILTIN_HOOK_MODULES):
+			importlib.import_module(f"{__package__}.{cls._BUILTIN_HOOK_MODULES[hook_name]}")
+			hook_class = cls._HOOKS.get(hook_name)
+		return hook_class
+
+	@classmethod
+	def builtin_hook_names(cls):
+		return cls._BUILTIN_HOOK_MODULES.keys()
+
 	@classmethod
 	def _replace_text(cls, text):
 		text = text.replace("---", "—")
@@ -51,8 +96,8 @@ class XMLHookRegistry():
 		def callback(node):
 			if (node.nodeType == node.ELEMENT_NODE) and (node.nodeName.startswith("s:")):
 				hook_name = node.nodeName[2:]
-				if hook_name in cls._HOOKS:
-					hook_class = cls._HOOKS[hook_name]
+				hook_class = cls.get_hook(hook_name)
+				if hook_class is not None:
 					replace_by = hook_class.handle(rendered_presentation, node)
 					if replace_by is None:
 						# Delete node entirely
@@ -84,6 +129,37 @@ class XMLHookRegistry():
 				XMLTools.remove_node(node)
 		XMLTools.walk(root_node, callback)
 
+	@classmethod
+	def layout(cls, rendered_presentation, root_node):
+		# Only applies the effects that hooks have on the presentation as a
+		# whole (features, timing, used acronyms) without producing any
+		# output; the DOM remains untouched.
+		def callback(node):
+			if node.nodeName.startswith("s:"):
+				hook_class = cls.get_hook(node.nodeName[2:])
+				if hook_class is not None:
+					hook_class.layout(rendered_presentation, node)
+					if not hook_class._LAYOUT_DESCENT:
+						raise XMLTools.CancelDescentException()
+		XMLTools.walk_elements(root_node, callback)
+
+	@classmethod
+	def collect_renderer_jobs(cls, rendered_presentation, root_node):
+		# Determine all (renderer name, property dict) tuples that mangling
+		# the node would cause. Hooks that fail to determine their properties
+		# are skipped; the error will resurface once the node is mangled.
+		jobs = [ ]
+		def callback(node):
+			if node.nodeName.startswith("s:"):
+				hook_class = cls.get_hook(node.nodeName[2:])
+				if hook_class is not None:
+					try:
+						jobs.extend(hook_class.renderer_jobs(rendered_presentation, node))
+					except PyRadiumException as e:
+						_log.trace("Not prerendering %s hook: [%s] %s", node.nodeName, e.__class__.__name__, str(e))
+		XMLTools.walk_elements(root_node, callback)
+		return jobs
+
 
 @dataclasses.dataclass
 class ReplacementFragment():
@@ -99,12 +175,75 @@ class ReplacementFragment():
 
 class BaseHook():
 	_TAG_NAME = None
+	# Hooks which consume their content (instead of keeping the child nodes)
+	# hide nested hooks from having any effect
+	_LAYOUT_DESCENT = True
+
+	@classmethod
+	def renderer_jobs(cls, rendered_presentation, node):
+		return [ ]
+
+	@classmethod
+	def layout(cls, rendered_presentation, node):
+		pass
 
 	@classmethod
 	def handle(cls, rendered_presentation, node):
 		raise NotImplementedError("%s.handle" % (cls.__name__))
 
+	@classmethod
+	def _set_img_loading(cls, rendered_presentation, img_node, width = None, height = None):
+		# The intrinsic size lets the browser reserve the space of an image
+		# before it has loaded it, so that lazy loading causes no layout shift
+		if (width is not None) and (height is not None):
+			img_node.setAttribute("width", str(width))
+			img_node.setAttribute("height", str(height))
+		img_node.setAttribute("loading", rendered_presentation.image_loading())
+		img_node.setAttribute("decoding", "async")
+
+	@classmethod
+	def _rendition_properties(cls, properties, max_dimension):
+		return dict(properties, max_dimension = max_dimension)
+
+	@classmethod
+	def _srcset_properties(cls, rendered_presentation, properties):
+		# Property dicts of the smaller renditions of an image which are
+		# offered to the browser in addition to the full size one; every
+		# rendition is rendered (and cached) on its own
+		rendering_params = rendered_presentation.renderer.rendering_params
+		return [ cls._rendition_properties(properties, max_dimension) for max_dimension in sorted(set(rendering_params.image_srcset)) if max_dimension < rendering_params.image_max_dimension ]
+
+	@classmethod
+	def _render_renditions(cls, rendered_presentation, renderer_name, properties, rendered_image):
+		# Returns all renditions of an image that differ in width, smallest
+		# first and ending with the full size rendered image
+		if "width" not in rendered_image.data:
+			return [ rendered_image ]
+		renderer = rendered_presentation.renderer.get_custom_renderer(renderer_name)
+		renditions = [ ]
+		for rendition_properties in cls._srcset_properties(rendered_presentation, properties):
+			rendition = renderer.render(rendition_properties)
+			if rendition.data.get("width", rendered_image.data["width"]) >= rendered_image.data["width"]:
+				break
+			if (len(renditions) == 0) or (renditions[-1].data["width"] < rendition.data["width"]):
+				renditions.append(rendition)
+		renditions.append(rendered_image)
+		return renditions
+
+	@classmethod
+	def _set_img_srcset(cls, rendered_presentation, node, srcset):
+		# srcset is a list of (URI, width) tuples. Slides are scaled to fit
+		# the viewport, therefore images never show wider than the viewport
+		# or, if the viewport is wider than the slide aspect ratio, than the
+		# slide scaled to the viewport height.
+		if len(srcset) < 2:
+			return
+		(geometry_x, geometry_y) = rendered_presentation.renderer.rendering_params.geometry
+		node.setAttribute("srcset", ", ".join(f"{uri} {width}w" for (uri, width) in srcset))
+		node.setAttribute("sizes", f"(max-aspect-ratio: {geometry_x}/{geometry_y}) 100vw, {100 * geometry_x / geometry_y:.2f}vh")
+
 class ReplacementHook(BaseHook):
+	_LAYOUT_DESCENT = False
 	_REPLACEMENTS = None
 	_SPAN_ATTRIBUTES = None
 
@@ -129,6 +268,8 @@ class ReplacementHook(BaseHook):
 			return ReplacementFragment(replacement_node, continue_descent = False)
 
 class InnerTextHook(BaseHook):
+	_LAYOUT_DESCENT = False
+
 	@classmethod
 	def handle_text(cls, text, rendered_presentation, node):
 		raise NotImplementedError("%s.handle_text" % (cls.__name__))
@@ -19,30 +19,4 @@
 #
 #	Johannes Bauer <JohannesBauer@gmx.de>
 
-from .EmoHook import EmoHook
-from .SymbolHook import SymbolHook
-from .ArrowHook import ArrowHook
-from .QuoteHook import QuoteHook
-from .TexHook import TexHook
-from .TerminalHook import TerminalHook
-from .CodeHook import CodeHook
-from .ImgHook import ImgHook
-from .PlotHook import PlotHook
-from .AcronymHook import AcronymHook
-from .TimeHook import TimeHook
-from .ExecHook import ExecHook
-from .MonospaceHook import MonospaceHook
-from .DebugHook import DebugHook
-from .NthHook import NthHook
-from .LinkHook import LinkHook
-from .NoSpellcheckHook import NoSpellcheckHook
-from .NoLinebreakHook import NoLinebreakHook
-from .VerbatimHook import VerbatimHook
-from .CircuitHook import CircuitHook
-from .GraphvizHook import GraphvizHook
-from .BoolHook import BoolHook
-from .DigitalTimingDiagramHook import DigitalTimingDiagramHook
-from .AgendaHook import AgendaHook
-from .FileHook import FileHook
-from .VariableSubstitutionHook import VariableSubstitutionHook
-from .QRCodeHook import QRCodeHook
+# Hooks are imported on demand by XMLHookRegistry.get_hook()